@@ -2,17 +2,42 @@
 FastAPI backend for Follow the Money.
 Serves the web UI and runs conversations via API.
 """
+import asyncio
 import json
 import os
+from contextlib import asynccontextmanager
+from email.utils import formatdate
 
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from dotenv import load_dotenv
 
 load_dotenv()
 
-app = FastAPI(title="Follow the Money")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Prewarm and refresh demos in the background while the server runs (see src.prewarm)."""
+    from src.prewarm import PREWARM_ENABLED, run_scheduler
+
+    scheduler = None
+    if PREWARM_ENABLED:
+        if os.getenv("ANTHROPIC_API_KEY") and os.getenv("CARTESIA_API_KEY"):
+            scheduler = asyncio.create_task(run_scheduler(_prewarm, _free_job_slots))
+        else:
+            print("  (Demo prewarming off: ANTHROPIC_API_KEY and CARTESIA_API_KEY are needed)")
+    yield
+    if scheduler:
+        scheduler.cancel()
+    if _jobs is not None:
+        await _jobs.stop()
+
+
+app = FastAPI(title="Follow the Money", lifespan=lifespan)
+
+# Live investigations run as deduplicated jobs on a bounded worker pool (see src.jobs)
+_jobs = None
 
 # Ensure directories exist (needed for Railway where gitignored dirs are missing)
 os.makedirs("audio_output", exist_ok=True)
@@ -30,71 +55,248 @@ async def index():
 
 
 @app.get("/api/publications")
-async def get_publications():
-    """Return the list of publications."""
-    with open("data/publications.json") as f:
-        data = json.load(f)
-    pubs = []
-    for p in data["publications"]:
-        rating = p.get("ground_news_rating", {})
-        pubs.append({
-            "id": p["id"],
-            "name": p["name"],
-            "owner": p["owner"],
-            "bias": rating.get("bias", "Unknown"),
-            "factuality": rating.get("factuality", "Unknown"),
-            "category": rating.get("ownership_category", "Unknown"),
-        })
-    return pubs
+async def get_publications(request: Request):
+    """Return the list of publications (304 if the browser's copy is current)."""
+    from src.publications import etag_matches, summaries_json
+
+    body, etag = summaries_json()
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @app.get("/api/demo/{pub_id}")
-async def get_demo_conversation(pub_id: str):
-    """Return a pre-baked demo conversation if available."""
-    path = f"demo/{pub_id}_conversation.json"
-    if not os.path.exists(path):
+async def get_demo_conversation(pub_id: str, request: Request):
+    """
+    Return a pre-baked demo conversation if available.
+
+    Served from memory, precompressed (brotli or gzip), with an ETag (304 if the
+    browser's copy is current). Audio files are linked by their immutable
+    content-hash URLs ("audio_url"). Last-Modified is when the demo was generated;
+    X-Demo-Stale is "false" or why it is due for regeneration (which happens in
+    the background -- this copy is served meanwhile).
+    """
+    from src.assets import get_demo, negotiate_encoding
+    from src.prewarm import demo_freshness
+    from src.publications import etag_matches
+
+    pub = _find_publication(pub_id)
+    # A changed demo is re-hashed and recompressed (brotli q11): keep that off the event loop
+    demo = await asyncio.to_thread(get_demo, pub["id"])
+    if demo is None:
         raise HTTPException(status_code=404, detail="No demo available for this publication")
-    with open(path) as f:
-        return json.load(f)
+    headers = {"ETag": demo["etag"], "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    freshness = demo_freshness(pub, demo)
+    headers["Last-Modified"] = formatdate(freshness["generated_at"], usegmt=True)
+    headers["X-Demo-Stale"] = freshness["reason"] or "false"
+    if etag_matches(request.headers.get("if-none-match"), demo["etag"]):
+        return Response(status_code=304, headers=headers)
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=demo["bodies"][encoding], media_type="application/json", headers=headers)
+
+
+@app.api_route("/assets/audio/{name}", methods=["GET", "HEAD"])
+async def get_audio_asset(name: str, request: Request):
+    """
+    Serve an audio file by its content-hash name, cacheable forever.
+
+    Supports range requests (including If-Range) for seeking and streaming.
+    """
+    from src.assets import IMMUTABLE_CACHE_CONTROL, resolve_audio_asset
+    from src.publications import etag_matches
 
+    asset = await asyncio.to_thread(resolve_audio_asset, name)  # may hash files or load demos
+    if asset is None:
+        raise HTTPException(status_code=404, detail="Unknown audio asset")
+    path, etag = asset
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, headers=headers)
 
-@app.post("/api/investigate/{pub_id}")
-async def investigate(pub_id: str):
-    """Run a new conversation about a publication (live generation)."""
-    from src.orchestrator import load_publications, run_conversation
-    from src.cartesia_client import generate_conversation_audio
 
-    data = load_publications()
-    pub = next((p for p in data["publications"] if p["id"] == pub_id), None)
+def _find_publication(pub_id: str) -> dict:
+    """Look up a publication (or a comparison id like "fox_vs_wsj") or raise a 404."""
+    from src.comparison import COMPARE_SEPARATOR, comparison_publication, is_comparison_id
+    from src.publications import get_publication
+
+    if is_comparison_id(pub_id):
+        try:
+            return comparison_publication(pub_id.split(COMPARE_SEPARATOR))
+        except ValueError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+    pub = get_publication(pub_id)
     if not pub:
         raise HTTPException(status_code=404, detail=f"Publication '{pub_id}' not found")
+    return pub
+
+
+def _resolve_run_id(run_id: str | None) -> str:
+    """Validate a run id to resume, or start a new one."""
+    from src.run_state import new_run_id, valid_run_id
+
+    if run_id is None:
+        return new_run_id()
+    if not valid_run_id(run_id):
+        raise HTTPException(status_code=400, detail=f"Invalid run id: {run_id!r}")
+    return run_id
+
+
+async def _run_investigation(job) -> dict:
+    """Job runner: generate a conversation with audio and swap it in as the demo."""
+    from src.assets import get_demo
+    from src.prewarm import aregenerate_demo
+
+    pub = _find_publication(job.params["pub_id"])
+
+    # Conversation with web search, synthesizing audio as each turn finishes
+    output = await aregenerate_demo(pub, job.params["run_id"], on_event=job.emit)
+    demo = await asyncio.to_thread(get_demo, pub["id"])  # the saved copy, with content-hash audio URLs
+    return demo["data"] if demo else output
+
+
+def _get_jobs():
+    """The investigation job queue (created on first use)."""
+    global _jobs
+    if _jobs is None:
+        from src.jobs import JobQueue
+
+        _jobs = JobQueue(_run_investigation)
+    return _jobs
+
+
+def _submit_investigation(pub_id: str, run_id: str | None):
+    """
+    Queue an investigation, or join the one already in flight for this publication.
+
+    Joining means a run_id to resume is ignored -- the running job is already doing the work.
+    """
+    pub_id = _find_publication(pub_id)["id"]  # comparisons in any order share one job
+    run_id = _resolve_run_id(run_id)
+    return _get_jobs().submit(pub_id, pub_id=pub_id, run_id=run_id)
+
+
+def _prewarm(pub_id: str):
+    """Queue a background demo regeneration (joins a live investigation of the same publication)."""
+    return _submit_investigation(pub_id, None)
+
+
+def _free_job_slots() -> int:
+    stats = _get_jobs().stats()
+    return stats["workers"] - stats["running"] - stats["queued"]
+
+
+@app.post("/api/investigate/{pub_id}", status_code=202)
+async def investigate(pub_id: str, run_id: str | None = None):
+    """
+    Queue a new conversation about a publication (live generation).
+
+    Returns the job to poll at /api/jobs/{job_id} or follow at /api/jobs/{job_id}/events.
+    If this publication is already being investigated, that job is returned instead.
+    Pass the run_id from a failed job's error to resume it instead of starting over.
+    """
+    job, created = _submit_investigation(pub_id, run_id)
+    return JSONResponse(
+        {**job.to_dict(), "coalesced": not created},
+        status_code=202,
+        headers={"Location": f"/api/jobs/{job.id}"},
+    )
+
+
+def _comparison_id(pubs: str) -> str:
+    """Canonical comparison id for a comma-separated list of publication ids, or a 400."""
+    from src.comparison import comparison_publication
+
+    try:
+        return comparison_publication(pubs.split(","))["id"]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/api/compare", status_code=202)
+async def compare(pubs: str, run_id: str | None = None):
+    """
+    Queue one conversation comparing several publications, e.g. ?pubs=fox,wsj,nyt.
+
+    Works like /api/investigate under the comparison's id ("fox_vs_nyt_vs_wsj", the
+    same for any order), which also serves as its demo id at /api/demo/{id}.
+    """
+    return await investigate(_comparison_id(pubs), run_id)
+
+
+@app.get("/api/compare/stream")
+async def compare_stream(pubs: str, run_id: str | None = None):
+    """Queue (or join) a comparison and follow it as a Server-Sent Events stream (see investigate_stream)."""
+    return await investigate_stream(_comparison_id(pubs), run_id)
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Job status; includes the saved conversation once it is done, or the error."""
+    job = _get_jobs().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return job.to_dict()
+
+
+@app.get("/api/status")
+async def status():
+    """Upstream rate limiter queue depths and wait times, the investigation job queue and demo freshness."""
+    from src.prewarm import demo_freshness
+    from src.publications import get_dataset
+    from src.rate_limits import get_limiter_stats
+
+    demos = {pub["id"]: demo_freshness(pub) for pub in get_dataset()["publications"]}
+    return {"upstreams": get_limiter_stats(), "jobs": _get_jobs().stats(), "demos": demos}
+
+
+def _sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _event_stream(job) -> StreamingResponse:
+    """
+    A job's events as Server-Sent Events, from the start, until it finishes.
+
+    If the client disconnects, the job keeps going and still saves the demo.
+    """
+    async def stream():
+        async for event, data in job.subscribe():
+            yield _sse(event, data)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/api/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """Follow a job as a Server-Sent Events stream (see investigate_stream for the events)."""
+    job = _get_jobs().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return _event_stream(job)
+
+
+@app.get("/api/investigate/{pub_id}/stream")
+async def investigate_stream(pub_id: str, run_id: str | None = None):
+    """
+    Queue (or join) a conversation and follow it as a Server-Sent Events stream.
 
-    # Run conversation with web search
-    conversation = run_conversation(pub, num_exchanges=2, use_web_search=True)
-
-    # Generate audio
-    output_dir = f"demo/audio/{pub_id}"
-    results = generate_conversation_audio(conversation, output_dir=output_dir)
-
-    # Build response
-    turns = []
-    for r in results:
-        turns.append({
-            "agent": r["agent"],
-            "text": r["text"],
-            "audio_path": r["audio_path"],
-        })
-
-    # Save for future demo use
-    output = {
-        "publication": pub["name"],
-        "owner": pub["owner"],
-        "turns": turns,
-    }
-    with open(f"demo/{pub_id}_conversation.json", "w") as f:
-        json.dump(output, f, indent=2)
-
-    return output
+    Emits "queued" and "started" as the job moves through the queue, "delta" events
+    while a turn's text streams in from Claude, "turn" once it is complete, "audio"
+    as soon as its audio file is written, then "done" with the saved conversation (or
+    "error", with the run_id to resume from). A client joining a job in flight gets
+    its earlier events first; so does a resumed run for the turns it already had.
+    """
+    job, _ = _submit_investigation(pub_id, run_id)
+    return _event_stream(job)
 
 
 if __name__ == "__main__":
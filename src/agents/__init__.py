@@ -0,0 +1,62 @@
+"""
+Agent registry.
+Every module in this package that defines an AGENT dict is a conversation
+participant; the orchestrator uses them in "order". To add an agent, add a
+module with its prompt and AGENT entry, and a voice for it in .env.
+
+AGENT keys:
+    agent: Name, as recorded on each turn (e.g. "Insider").
+    title: How other agents' prompts refer to it (e.g. "The Insider").
+    label: Heading printed for its turns in the CLI.
+    prompt: System prompt.
+    voice_env: Env var holding its Cartesia voice id.
+    first_reply / reply: Instruction appended to the turns it is asked to answer
+        (the first time it speaks / afterwards).
+    interrupts: Regexes that let it jump in under the interrupt scheduler.
+    order: Position in the default speaking order.
+"""
+import importlib
+import os
+import pkgutil
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Comma-separated agent names taking part in conversations (default: every agent)
+CONVERSATION_AGENTS = [a.strip() for a in os.getenv("CONVERSATION_AGENTS", "").split(",") if a.strip()]
+
+_registry = None
+
+
+def all_agents() -> dict[str, dict]:
+    """Every AGENT defined in this package, by name, in speaking order."""
+    global _registry
+    if _registry is None:
+        found = []
+        for module in pkgutil.iter_modules(__path__):
+            agent = getattr(importlib.import_module(f"{__name__}.{module.name}"), "AGENT", None)
+            if agent:
+                found.append(agent)
+        _registry = {a["agent"]: a for a in sorted(found, key=lambda a: a["order"])}
+    return _registry
+
+
+def get_agents(names: list[str] | None = None) -> list[dict]:
+    """
+    The agents taking part in a conversation.
+
+    Args:
+        names: Agent names (default: CONVERSATION_AGENTS, or every agent).
+
+    Raises:
+        ValueError: An unknown name, or fewer than two agents.
+    """
+    registry = all_agents()
+    names = names or CONVERSATION_AGENTS or list(registry)
+    unknown = [n for n in names if n not in registry]
+    if unknown:
+        raise ValueError(f"Unknown agent(s): {', '.join(unknown)} (available: {', '.join(registry)})")
+    if len(names) < 2:
+        raise ValueError("A conversation needs at least two agents")
+    return [registry[n] for n in names]
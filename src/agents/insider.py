@@ -32,4 +32,18 @@ CONVERSATION RULES:
 - Feel free to use rhetorical questions, callbacks, and running jokes.
 - Speak in a way that sounds natural when read aloud (this will be converted to speech).
 - Avoid bullet points, asterisks, or markdown formatting. Speak in natural sentences.
-"""
\ No newline at end of file
+"""
+
+AGENT = {
+    "agent": "Insider",
+    "title": "The Insider",
+    "label": "🎭 INSIDER",
+    "prompt": INSIDER_PROMPT,
+    "voice_env": "CARTESIA_VOICE_INSIDER",
+    # How the agent is asked to answer the turns since it last spoke
+    "first_reply": "React to that with your insider perspective.",
+    "reply": "Respond with your insider take.",
+    # The interrupt scheduler lets the agent jump in when the last turn matches one of these
+    "interrupts": [r"\b(?:newsroom|editor|board)s?\b", r"\bMurdoch", r"\blayoffs?\b"],
+    "order": 1,
+}
@@ -33,3 +33,17 @@ CONVERSATION RULES:
 - Speak in a way that sounds natural when read aloud (this will be converted to speech).
 - Avoid bullet points, asterisks, or markdown formatting. Speak in natural sentences.
 """
+
+AGENT = {
+    "agent": "Street Reporter",
+    "title": "The Street Reporter",
+    "label": "🎤 STREET REPORTER",
+    "prompt": STREET_REPORTER_PROMPT,
+    "voice_env": "CARTESIA_VOICE_REPORTER",
+    # How the agent is asked to answer the turns since it last spoke
+    "first_reply": "Respond to that and dig deeper.",
+    "reply": "Respond to that and dig deeper.",
+    # The interrupt scheduler lets the agent jump in when the last turn matches one of these
+    "interrupts": [r"\$\s?\d", r"\b(?:million|billion)\b", r"\b(?:acquisition|deal|paid)\b"],
+    "order": 0,
+}
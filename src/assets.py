@@ -0,0 +1,169 @@
+"""
+Demo and audio asset layer.
+Keeps each saved demo conversation in memory, pre-serialized and precompressed
+(gzip and brotli), and reloads it only when its file's mtime changes. Audio
+files are published under content-hash names (/assets/audio/<hash>.<ext>), so
+they can be cached by browsers forever: new audio always gets a new URL.
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+
+import brotli
+
+DEMO_DIR = "demo"
+AUDIO_ASSET_PREFIX = "/assets/audio"
+# One year: content-hashed URLs never change content
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Preferred first when the client accepts several
+ENCODINGS = ("br", "gzip")
+
+_lock = threading.Lock()
+_demo_lock = threading.Lock()
+_demos = {}  # demo file path -> snapshot, replaced wholesale on reload
+_digests = {}  # path -> (mtime_ns, size, sha256 hex)
+_audio_assets = {}  # content-hash name -> path
+_scanned = {}  # demo dir -> its mtime_ns when load_all_demos last listed it
+
+
+def _file_digest(path: str) -> str | None:
+    """sha256 of a file, recomputed only when its mtime or size changes; None if it's missing."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    cached = _digests.get(path)
+    if cached and cached[:2] == (st.st_mtime_ns, st.st_size):
+        return cached[2]
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            h.update(block)
+    digest = h.hexdigest()
+    _digests[path] = (st.st_mtime_ns, st.st_size, digest)
+    return digest
+
+
+def audio_url(path: str) -> str | None:
+    """
+    Publish an audio file under its content-hash URL.
+
+    Returns:
+        e.g. "/assets/audio/3f9a...c1.mp3", or None if the file doesn't exist.
+    """
+    digest = _file_digest(path)
+    if digest is None:
+        return None
+    name = f"{digest[:32]}{os.path.splitext(path)[1]}"
+    with _lock:
+        _audio_assets[name] = path
+    return f"{AUDIO_ASSET_PREFIX}/{name}"
+
+
+def resolve_audio_asset(name: str) -> tuple[str, str] | None:
+    """
+    Look up a content-hash asset name.
+
+    Returns:
+        (path, etag), or None if the name is unknown or the file no longer has that content.
+    """
+    with _lock:
+        path = _audio_assets.get(name)
+    if path is None and _demo_dir_changed():
+        # Names are registered as demos load; rescan only if a demo was saved since the last
+        # scan, so requests for unknown names can't make every request reload every demo
+        load_all_demos()
+        with _lock:
+            path = _audio_assets.get(name)
+    if path is None:
+        return None
+    digest = _file_digest(path)
+    if digest is None or not name.startswith(digest[:32]):
+        return None
+    return path, f'"{digest[:32]}"'
+
+
+def _build_snapshot(path: str, mtime: int) -> dict:
+    with open(path) as f:
+        data = json.load(f)
+    for item in [*data.get("turns", []), data.get("track") or {}]:
+        if item.get("audio_path"):
+            url = audio_url(item["audio_path"])
+            if url:
+                item["audio_url"] = url
+
+    body = json.dumps(data).encode()
+    return {
+        "mtime": mtime,
+        "data": data,
+        "etag": f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+        "bodies": {
+            "identity": body,
+            "gzip": gzip.compress(body, compresslevel=9, mtime=0),
+            "br": brotli.compress(body, quality=11),
+        },
+    }
+
+
+def get_demo(pub_id: str, demo_dir: str = DEMO_DIR) -> dict | None:
+    """
+    Return a publication's demo conversation from memory, reloading it if the file changed.
+
+    Returns:
+        {"data", "etag", "bodies"} where data is the conversation (each audio file also
+        given an "audio_url") and bodies maps "identity", "gzip" and "br" to the
+        serialized JSON -- or None if there is no demo.
+    """
+    path = f"{demo_dir}/{pub_id}_conversation.json"
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        _demos.pop(path, None)
+        return None
+    snapshot = _demos.get(path)
+    if snapshot and snapshot["mtime"] == mtime:
+        return snapshot
+
+    with _demo_lock:
+        snapshot = _demos.get(path)
+        if snapshot and snapshot["mtime"] == mtime:
+            return snapshot
+        snapshot = _build_snapshot(path, mtime)
+        _demos[path] = snapshot
+        return snapshot
+
+
+def _demo_dir_changed(demo_dir: str = DEMO_DIR) -> bool:
+    """Whether demo_dir has changed since load_all_demos last listed it (demos are saved by rename)."""
+    try:
+        mtime = os.stat(demo_dir).st_mtime_ns
+    except FileNotFoundError:
+        return False
+    return _scanned.get(demo_dir) != mtime
+
+
+def load_all_demos(demo_dir: str = DEMO_DIR):
+    """Load (or refresh) every saved demo, registering their audio assets."""
+    suffix = "_conversation.json"
+    # Stat before listing: a demo saved mid-scan leaves the recorded mtime stale, forcing a rescan
+    _scanned[demo_dir] = os.stat(demo_dir).st_mtime_ns
+    for name in os.listdir(demo_dir):
+        if name.endswith(suffix):
+            get_demo(name.removesuffix(suffix), demo_dir)
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str:
+    """Pick "br", "gzip" or "identity" from an Accept-Encoding header."""
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(coding.strip().lower())
+    for encoding in ENCODINGS:
+        if encoding in accepted or "*" in accepted:
+            return encoding
+    return "identity"
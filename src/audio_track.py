@@ -0,0 +1,185 @@
+"""
+Conversation audio tracks.
+Stitches a conversation's per-turn audio files into one file with short gaps
+between turns, plus a timing manifest of where each turn starts and ends, so
+the web player streams a single asset (with HTTP range requests) instead of
+fetching and decoding every turn separately.
+"""
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import wave
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from src.cartesia_client import AUDIO_ENCODING, AUDIO_ENCODINGS, SAMPLE_RATE, AudioWriter
+
+load_dotenv()
+
+# Silence between turns in the stitched track (milliseconds)
+TRACK_GAP_MS = int(os.getenv("AUDIO_TRACK_GAP_MS", "600"))
+# Set AUDIO_TRACK=0 to keep per-turn files only
+TRACK_ENABLED = os.getenv("AUDIO_TRACK", "1").lower() in ("1", "true", "yes")
+
+_MEDIA_TYPES = {encoding["extension"]: encoding["media_type"] for encoding in AUDIO_ENCODINGS.values()}
+
+
+def _run_ffmpeg(args: list[str], tool: str = "ffmpeg") -> bytes:
+    result = subprocess.run([tool, "-hide_banner", "-loglevel", "error", *args], capture_output=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"{tool} failed: {result.stderr.decode(errors='replace').strip()}")
+    return result.stdout
+
+
+def _wav_pcm(path: str) -> bytes | None:
+    """PCM frames of a WAV already in our mono s16le format at SAMPLE_RATE, else None."""
+    with wave.open(path, "rb") as clip:
+        if (clip.getnchannels(), clip.getsampwidth(), clip.getframerate()) != (1, 2, SAMPLE_RATE):
+            return None
+        return clip.readframes(clip.getnframes())
+
+
+def _decode_pcm(path: str) -> bytes:
+    """Any audio file as mono s16le PCM at SAMPLE_RATE."""
+    if path.endswith(".wav"):
+        pcm = _wav_pcm(path)
+        if pcm is not None:
+            return pcm
+    if not shutil.which("ffmpeg"):
+        raise RuntimeError(f"ffmpeg is required to decode {path}")
+    return _run_ffmpeg(["-i", path, "-f", "s16le", "-ar", str(SAMPLE_RATE), "-ac", "1", "pipe:1"])
+
+
+def _duration(path: str) -> float:
+    return float(_run_ffmpeg(
+        ["-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", path], tool="ffprobe",
+    ))
+
+
+def _stitch_pcm(paths: list[str], output_path: str, gap: float) -> list[tuple[float, float]]:
+    """Decode every turn to PCM, join with silence and encode once; returns (start, end) per turn."""
+    silence = b"\x00\x00" * round(gap * SAMPLE_RATE)
+    bytes_per_second = 2 * SAMPLE_RATE
+    spans = []
+    offset = 0
+    writer = AudioWriter(output_path)
+    try:
+        for i, path in enumerate(paths):
+            if i:
+                writer.write(silence)
+                offset += len(silence)
+            pcm = _decode_pcm(path)
+            writer.write(pcm)
+            spans.append((offset / bytes_per_second, (offset + len(pcm)) / bytes_per_second))
+            offset += len(pcm)
+    finally:
+        writer.close()
+    return spans
+
+
+def _stitch_copy(paths: list[str], output_path: str, gap: float) -> list[tuple[float, float]]:
+    """
+    Join compressed turn files by stream copy (no re-encoding), with encoded
+    silence between them; returns (start, end) per turn, measured by ffprobe.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        silence = f"{tmp}/gap.{AUDIO_ENCODING['extension']}"
+        if gap:
+            _run_ffmpeg([
+                "-f", "lavfi", "-i", f"anullsrc=r={SAMPLE_RATE}:cl=mono", "-t", f"{gap:.3f}",
+                *AUDIO_ENCODING["ffmpeg"], silence,
+            ])
+            gap = _duration(silence)
+
+        segments = []
+        for i, path in enumerate(paths):
+            if i and gap:
+                segments.append(silence)
+            segments.append(os.path.abspath(path))
+        listing = f"{tmp}/segments.txt"
+        with open(listing, "w") as f:
+            f.writelines(f"file '{segment}'\n" for segment in segments)
+
+        fmt = AUDIO_ENCODING["ffmpeg"][AUDIO_ENCODING["ffmpeg"].index("-f") + 1]
+        _run_ffmpeg(["-y", "-f", "concat", "-safe", "0", "-i", listing, "-c", "copy", "-f", fmt, output_path])
+
+    spans = []
+    offset = 0.0
+    for i, path in enumerate(paths):
+        if i:
+            offset += gap
+        length = _duration(path)
+        spans.append((offset, offset + length))
+        offset += length
+    return spans
+
+
+def stitch_conversation(results: list[dict], output_path: str, gap_ms: int = TRACK_GAP_MS) -> dict | None:
+    """
+    Stitch a conversation's turn audio into one file and write its timing manifest.
+
+    WAV turns are joined frame by frame and compressed turns by stream copy, so
+    nothing is re-encoded; mixed or mismatched inputs are decoded and encoded
+    once as AUDIO_FORMAT. The manifest is written next to the track, with a
+    .json suffix.
+
+    Args:
+        results: Turns as {"agent", "text", "audio_path"} dicts, in order.
+        output_path: Track path without extension, e.g. "demo/audio/nyt/conversation".
+        gap_ms: Silence between turns, in milliseconds.
+
+    Returns:
+        The manifest, {"audio_path", "media_type", "duration", "gap", "turns"} where
+        turns holds {"index", "agent", "start", "end"} dicts in seconds -- or None if
+        some turn has no audio file or the inputs can't be decoded here.
+    """
+    paths = [r.get("audio_path") for r in results]
+    if not paths or not all(path and os.path.exists(path) for path in paths):
+        return None
+
+    gap = max(0, gap_ms) / 1000
+    extensions = {Path(path).suffix.lstrip(".") for path in paths}
+    copyable = extensions == {AUDIO_ENCODING["extension"]} and AUDIO_ENCODING["ffmpeg"] is not None
+    extension = AUDIO_ENCODING["extension"]
+    track_path = f"{output_path}.{extension}"
+    Path(track_path).parent.mkdir(parents=True, exist_ok=True)
+
+    # Build under a temporary name and rename, so a player never sees a partial track
+    fd, tmp = tempfile.mkstemp(dir=Path(track_path).parent, suffix=f".{extension}")
+    os.close(fd)
+    try:
+        spans = None
+        if copyable and shutil.which("ffmpeg") and shutil.which("ffprobe"):
+            try:
+                spans = _stitch_copy(paths, tmp, gap)
+            except RuntimeError as e:
+                print(f"  (Stream copy failed ({e}), re-encoding the track)")
+        if spans is None:
+            spans = _stitch_pcm(paths, tmp, gap)
+        os.replace(tmp, track_path)
+    except (RuntimeError, OSError, wave.Error) as e:
+        print(f"  (Couldn't stitch {track_path}: {e})")
+        return None
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+    manifest = {
+        "audio_path": track_path,
+        "media_type": _MEDIA_TYPES[extension],
+        "duration": round(spans[-1][1], 3),
+        "gap": gap,
+        "turns": [
+            {"index": i, "agent": r["agent"], "start": round(start, 3), "end": round(end, 3)}
+            for i, (r, (start, end)) in enumerate(zip(results, spans))
+        ],
+    }
+    manifest_path = f"{output_path}.json"
+    fd, tmp = tempfile.mkstemp(dir=Path(manifest_path).parent, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, manifest_path)
+    return manifest
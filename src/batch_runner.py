@@ -0,0 +1,232 @@
+"""
+Batch demo regeneration.
+Advances every publication's conversation in lockstep: turn N of each
+conversation depends on its turn N-1, but turns at the same depth are
+independent across publications, so each round is sent as one Anthropic
+Message Batch (half price, minutes of latency) or as a bounded concurrent
+fan-out. Each conversation is a persisted run (see src.run_state), so an
+interrupted job resumes where it stopped; the demo JSON files are written
+once all conversations are complete.
+
+Usage:
+    python -m src.batch_runner                   # every publication, via the Message Batches API
+    python -m src.batch_runner nyt wsj           # only these publications
+    python -m src.batch_runner --concurrent      # concurrent fan-out instead of batches
+    python -m src.batch_runner --web-search --no-audio --no-cache
+"""
+import asyncio
+import os
+import sys
+
+from dotenv import load_dotenv
+
+from src import run_state
+from src.agents import get_agents
+from src.cartesia_client import MAX_CONCURRENCY as TTS_MAX_CONCURRENCY, asynthesize_turn
+from src.claude_client import arun_message_batch
+from src.orchestrator import (
+    agenerate_turn,
+    aprepare_turn,
+    build_briefing,
+    open_conversation_run,
+    record_turn,
+    restore_conversation,
+    save_demo,
+)
+from src.prewarm import prune_demo_audio
+from src.publications import get_dataset, get_publication
+
+load_dotenv()
+
+# Parallel Claude requests per round in --concurrent mode
+MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "6"))
+# Extra submissions per round for requests that errored or expired
+ROUND_RETRIES = int(os.getenv("BATCH_ROUND_RETRIES", "2"))
+
+
+def _audio_dir_name(run: dict) -> str:
+    """
+    The run's own audio directory under demo/audio/{pub_id}/, so the live demo's
+    files stay untouched until its JSON is replaced (as in prewarm.aregenerate_demo).
+    Batch run ids repeat across regenerations, so the start time is part of the name.
+    """
+    return f"{run['run_id']}-{int(run.get('created_at', 0))}"
+
+
+async def _run_round_batch(states: dict, use_web_search: bool, use_cache: bool) -> dict:
+    """Submit the next turn of every conversation as one Message Batch."""
+    requests = {}
+    for pub_id, state in states.items():
+        speaker, history = await aprepare_turn(state)
+        requests[pub_id] = {
+            "system_prompt": speaker["prompt"],
+            "messages": history.messages(),
+            "use_web_search": use_web_search,
+            "context": state["briefing"],
+        }
+    return await arun_message_batch(requests, use_cache=use_cache)
+
+
+async def _run_round_concurrent(states: dict, use_web_search: bool, use_cache: bool) -> dict:
+    """Generate the next turn of every conversation concurrently (up to MAX_CONCURRENCY at a time)."""
+    semaphore = asyncio.Semaphore(max(1, MAX_CONCURRENCY))
+
+    async def bounded(state: dict) -> tuple[str, dict | None]:
+        speaker, history = await aprepare_turn(state)
+        async with semaphore:
+            return await agenerate_turn(
+                speaker["prompt"], history, state["briefing"], use_web_search, use_cache=use_cache,
+            )
+
+    pub_ids = list(states)
+    outcomes = await asyncio.gather(*(bounded(states[p]) for p in pub_ids), return_exceptions=True)
+
+    results = {}
+    for pub_id, outcome in zip(pub_ids, outcomes):
+        if isinstance(outcome, BaseException):
+            print(f"  ({pub_id} turn failed: {outcome})")
+            continue
+        results[pub_id] = outcome
+    return results
+
+
+async def arun_batch(
+    pub_ids: list[str] | None = None,
+    num_exchanges: int = 2,
+    use_web_search: bool = False,
+    use_batches: bool = True,
+    with_audio: bool = True,
+    use_cache: bool = True,
+    demo_dir: str = "demo",
+) -> dict:
+    """
+    Regenerate demo conversations for many publications at once.
+
+    Each round generates the next turn of every unfinished conversation, so the
+    whole catalog takes about as many rounds as one conversation has turns.
+    Every turn and audio file is persisted to the run "batch-{pub_id}";
+    rerunning with the same settings resumes those runs, which are removed
+    once the demos are written.
+
+    Args:
+        pub_ids: Publications to regenerate (default: all).
+        num_exchanges: Number of rounds (each = one turn per agent).
+        use_web_search: If True, enable Claude web_search for real-time data.
+        use_batches: If True, send each round as a Message Batch; otherwise
+            fan out concurrent requests.
+        with_audio: If True, synthesize every turn into a new directory under
+            {demo_dir}/audio/{pub_id}/; older ones are pruned once the demo is replaced
+            (see prewarm.prune_demo_audio).
+        use_cache: If False, bypass the Claude response cache for every turn.
+        demo_dir: Directory for the {pub_id}_conversation.json files.
+
+    Returns:
+        The saved demo dicts by pub id.
+    """
+    if pub_ids is None:
+        pubs = get_dataset()["publications"]
+    else:
+        pubs = [get_publication(pub_id) for pub_id in pub_ids]
+        unknown = [pub_id for pub_id, pub in zip(pub_ids, pubs) if pub is None]
+        if unknown:
+            raise ValueError(f"Unknown publication ID(s): {', '.join(unknown)}")
+
+    runs = {}
+    states = {}
+    for pub in pubs:
+        runs[pub["id"]] = open_conversation_run(f"batch-{pub['id']}", pub, num_exchanges, use_web_search)
+        briefing = await asyncio.to_thread(build_briefing, pub, use_web_search)
+        states[pub["id"]] = restore_conversation(pub, briefing, runs[pub["id"]]["turns"])
+
+    total_turns = num_exchanges * len(get_agents())
+    run_round = _run_round_batch if use_batches else _run_round_concurrent
+
+    while True:
+        pending = {p: s for p, s in states.items() if len(s["turns"]) < total_turns}
+        if not pending:
+            break
+        depth = min(len(s["turns"]) for s in pending.values())
+        print(f"\n  Round {depth + 1}/{total_turns}: {len(pending)} conversation(s)")
+
+        for attempt in range(ROUND_RETRIES + 1):
+            results = await run_round(pending, use_web_search, use_cache)
+            for pub_id, (text, usage) in results.items():
+                state = pending.pop(pub_id)
+                speaker, _ = await aprepare_turn(state)
+                turn = record_turn(state, speaker["agent"], text, usage)
+                run_state.record_turn(runs[pub_id], len(state["turns"]) - 1, turn)
+            if not pending:
+                break
+            if attempt < ROUND_RETRIES:
+                print(f"  Retrying {len(pending)} failed turn(s)...")
+
+        if pending:
+            raise RuntimeError(f"Turn failed for {', '.join(pending)}; rerun to resume from this round")
+
+    if with_audio:
+        # Every turn's text is known, so all conversations are voiced at once, sharing the TTS limit
+        semaphore = asyncio.Semaphore(max(1, TTS_MAX_CONCURRENCY))
+
+        async def voice(pub_id: str, index: int, turn: dict) -> dict:
+            run = runs[pub_id]
+            audio_path = run_state.completed_audio(run, index)
+            if audio_path:
+                return {"agent": turn["agent"], "text": turn["text"], "audio_path": audio_path}
+            async with semaphore:
+                result = await asynthesize_turn(index, turn, f"{demo_dir}/audio/{pub_id}/{_audio_dir_name(run)}")
+            run_state.record_audio(run, index, result["audio_path"], result["text"])
+            return result
+
+        jobs = [(pub_id, i, turn) for pub_id, state in states.items() for i, turn in enumerate(state["turns"])]
+        voiced = await asyncio.gather(*(voice(*job) for job in jobs))
+        results = {pub_id: [] for pub_id in states}
+        for (pub_id, _, _), result in zip(jobs, voiced):
+            results[pub_id].append(result)
+    else:
+        results = {pub_id: state["turns"] for pub_id, state in states.items()}
+
+    demos = {}
+    for pub_id, state in states.items():
+        # Stitching the single-file track may run ffmpeg, so it happens off the event loop
+        demos[pub_id] = await asyncio.to_thread(save_demo, state["pub"], results[pub_id], demo_dir)
+        print(f"  Saved {demo_dir}/{pub_id}_conversation.json ({len(state['turns'])} turns)")
+        if with_audio:
+            prune_demo_audio(pub_id, keep=_audio_dir_name(runs[pub_id]), demo_dir=demo_dir)
+
+    for run in runs.values():
+        run_state.delete_run(run["run_id"])
+    return demos
+
+
+def run_batch(
+    pub_ids: list[str] | None = None,
+    num_exchanges: int = 2,
+    use_web_search: bool = False,
+    use_batches: bool = True,
+    with_audio: bool = True,
+    use_cache: bool = True,
+    demo_dir: str = "demo",
+) -> dict:
+    """Blocking wrapper around arun_batch, for scripts and the CLI."""
+    return asyncio.run(arun_batch(
+        pub_ids,
+        num_exchanges=num_exchanges,
+        use_web_search=use_web_search,
+        use_batches=use_batches,
+        with_audio=with_audio,
+        use_cache=use_cache,
+        demo_dir=demo_dir,
+    ))
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    flags = {a for a in args if a.startswith("--")}
+    demos = run_batch(
+        [a.lower() for a in args if not a.startswith("--")] or None,
+        use_web_search="--web-search" in flags,
+        use_batches="--concurrent" not in flags,
+        with_audio="--no-audio" not in flags,
+        use_cache="--no-cache" not in flags,
+    )
+    print(f"\n  Regenerated {len(demos)} demo conversation(s)")
@@ -2,108 +2,724 @@
 Cartesia TTS client.
 Converts agent text responses to speech audio.
 """
+import asyncio
+import hashlib
+import io
+import json
 import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Callable, Iterable, Iterator
 
-from cartesia import Cartesia
+from cartesia import AsyncCartesia, Cartesia
 from dotenv import load_dotenv
 
+from src.agents import all_agents
+from src.rate_limits import get_limiter
+from src.resilience import Upstream
+
 load_dotenv()
 
 MODEL = "sonic-2"
-OUTPUT_FORMAT = {
-    "container": "wav",
-    "sample_rate": 44100,
+
+# Speech doesn't need 44.1 kHz; 24 kHz keeps voices clear at about half the data
+SAMPLE_RATE = int(os.getenv("CARTESIA_SAMPLE_RATE", "24000"))
+
+# Encodings for the audio files we write and serve. "cartesia" is the format requested
+# directly from Cartesia (None: not offered, so raw PCM is transcoded); "ffmpeg" holds the
+# encoder arguments used to transcode PCM (the WebSocket only returns raw PCM).
+AUDIO_ENCODINGS = {
+    "wav": {
+        "extension": "wav",
+        "media_type": "audio/wav",
+        "cartesia": {"container": "wav", "sample_rate": SAMPLE_RATE, "encoding": "pcm_s16le"},
+        "ffmpeg": None,
+    },
+    "mp3": {
+        "extension": "mp3",
+        "media_type": "audio/mpeg",
+        "cartesia": {"container": "mp3", "sample_rate": SAMPLE_RATE, "bit_rate": 64000},
+        "ffmpeg": ["-c:a", "libmp3lame", "-b:a", "64k", "-f", "mp3"],
+    },
+    "opus": {
+        "extension": "ogg",
+        "media_type": "audio/ogg",
+        "cartesia": None,
+        "ffmpeg": ["-c:a", "libopus", "-b:a", "32k", "-application", "voip", "-f", "ogg"],
+    },
+}
+
+# Streaming (WebSocket) synthesis returns headerless PCM, which we encode ourselves
+STREAM_OUTPUT_FORMAT = {
+    "container": "raw",
+    "sample_rate": SAMPLE_RATE,
     "encoding": "pcm_s16le",
-    "bit_rate": 128000,
 }
 
-# Voice IDs from Cartesia voice library (https://play.cartesia.ai/voices)
+# Stream turns sentence by sentence over a WebSocket instead of one bytes() call per turn
+STREAM_TTS = os.getenv("CARTESIA_STREAMING", "").lower() in ("1", "true", "yes")
+
+
+def _resolve_audio_format(name: str) -> str:
+    """Validate CARTESIA_AUDIO_FORMAT, falling back to WAV if it needs ffmpeg and there is none."""
+    if name not in AUDIO_ENCODINGS:
+        raise ValueError(f"Unknown CARTESIA_AUDIO_FORMAT '{name}' (use one of: {', '.join(AUDIO_ENCODINGS)})")
+    encoding = AUDIO_ENCODINGS[name]
+    needs_ffmpeg = encoding["ffmpeg"] and (encoding["cartesia"] is None or STREAM_TTS)
+    if needs_ffmpeg and not shutil.which("ffmpeg"):
+        print(f"  (ffmpeg not found -- writing WAV audio instead of {name})")
+        return "wav"
+    return name
+
+
+# Encoding of the audio files we write and serve: "mp3", "opus" (Ogg) or "wav"
+AUDIO_FORMAT = _resolve_audio_format(os.getenv("CARTESIA_AUDIO_FORMAT", "mp3").lower())
+AUDIO_ENCODING = AUDIO_ENCODINGS[AUDIO_FORMAT]
+# One-shot requests ask Cartesia for the final encoding where it offers it, raw PCM otherwise
+OUTPUT_FORMAT = AUDIO_ENCODING["cartesia"] or STREAM_OUTPUT_FORMAT
+# Cache address of one-shot clips, which are stored already encoded
+_CLIP_FORMAT = {"output": OUTPUT_FORMAT, "encoding": AUDIO_FORMAT}
+
+# Parallel Cartesia requests per conversation, and extra attempts per turn
+MAX_CONCURRENCY = int(os.getenv("CARTESIA_MAX_CONCURRENCY", "4"))
+TTS_RETRIES = int(os.getenv("CARTESIA_TTS_RETRIES", "2"))
+# Per-call deadline (seconds), and whether async calls fire a backup request past the p95 latency
+TTS_TIMEOUT = float(os.getenv("CARTESIA_TIMEOUT", "30"))
+TTS_HEDGE = os.getenv("CARTESIA_HEDGE", "1").lower() in ("1", "true", "yes")
+
+# On-disk audio cache, keyed by (voice, model, format, text); least recently used files evicted first
+AUDIO_CACHE_DIR = os.getenv("CARTESIA_CACHE_DIR", ".cache/tts")
+AUDIO_CACHE_MAX_BYTES = int(os.getenv("CARTESIA_CACHE_MAX_MB", "500")) * 1024 * 1024
+
+# Voice IDs from Cartesia voice library (https://play.cartesia.ai/voices), one env var per agent
 # Street Reporter: American, confident, clear
 # Insider: British, witty, conversational
-VOICE_IDS = {
-    "Street Reporter": os.getenv("CARTESIA_VOICE_REPORTER", ""),
-    "Insider": os.getenv("CARTESIA_VOICE_INSIDER", ""),
-}
+VOICE_IDS = {name: os.getenv(agent["voice_env"], "") for name, agent in all_agents().items()}
 
 _client = None
+_async_client = None
+_async_client_loop = None
+_ws_local = threading.local()
+_cache_lock = threading.Lock()
+_cache_stats = {"hits": 0, "misses": 0, "evictions": 0}
+# Shared by every caller in the process; the limiter's "tokens" are transcript characters
+_upstream = Upstream("Cartesia", TTS_RETRIES, TTS_TIMEOUT, limiter=get_limiter("cartesia"))
+
+# Sentence end: terminal punctuation, optional closing quote/bracket, then whitespace
+_SENTENCE_END = re.compile(r"(?<=[.!?])[\"')\]]*\s+")
 
 
 def get_client() -> Cartesia:
     """Get or create the Cartesia client (singleton)."""
     global _client
     if _client is None:
-        _client = Cartesia(api_key=os.getenv("CARTESIA_API_KEY"))
+        _client = Cartesia(api_key=os.getenv("CARTESIA_API_KEY"), timeout=TTS_TIMEOUT)
     return _client
 
 
-def text_to_speech(text: str, agent_name: str, output_path: str | None = None) -> bytes:
+def get_async_client() -> AsyncCartesia:
+    """Get or create the async Cartesia client (one per event loop)."""
+    global _async_client, _async_client_loop
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client_loop is not loop:
+        _async_client = AsyncCartesia(api_key=os.getenv("CARTESIA_API_KEY"), timeout=TTS_TIMEOUT)
+        _async_client_loop = loop
+    return _async_client
+
+
+def _get_websocket():
+    """Get or create this thread's persistent TTS WebSocket (reconnects on send if dropped)."""
+    ws = getattr(_ws_local, "websocket", None)
+    if ws is None:
+        ws = get_client().tts.websocket()
+        _ws_local.websocket = ws
+    return ws
+
+
+def _get_voice_id(agent_name: str) -> str:
+    """Look up the configured voice for an agent, or raise if it's missing."""
+    voice_id = VOICE_IDS.get(agent_name, "")
+    if not voice_id:
+        env = all_agents()[agent_name]["voice_env"] if agent_name in all_agents() else "its voice variable"
+        raise ValueError(f"No voice ID configured for '{agent_name}'. Set {env} in .env")
+    return voice_id
+
+
+def _cache_key(voice_id: str, output_format: dict, text: str) -> str:
+    """Content address for a synthesized clip."""
+    payload = json.dumps(
+        {"voice": voice_id, "model": MODEL, "format": output_format, "text": text},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _cache_path(key: str) -> Path:
+    return Path(AUDIO_CACHE_DIR) / key[:2] / f"{key}.audio"
+
+
+def _cache_files() -> list[Path]:
+    return list(Path(AUDIO_CACHE_DIR).glob("*/*.audio")) if AUDIO_CACHE_DIR else []
+
+
+def _cache_lookup(key: str) -> Path | None:
+    """Return the cached file for key (marking it recently used), or None on a miss."""
+    if not AUDIO_CACHE_DIR:
+        return None
+    path = _cache_path(key)
+    try:
+        os.utime(path)  # bump mtime -- eviction is least-recently-used by mtime
+    except FileNotFoundError:
+        with _cache_lock:
+            _cache_stats["misses"] += 1
+        return None
+    with _cache_lock:
+        _cache_stats["hits"] += 1
+    return path
+
+
+def _cache_store(key: str, data: bytes | None = None, source: str | None = None):
+    """Atomically add bytes (or a copy of an existing file) to the cache, then evict if over budget."""
+    if not AUDIO_CACHE_DIR:
+        return
+    path = _cache_path(key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Write to a temp file in the same directory and rename, so readers never see a partial clip
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            if source:
+                with open(source, "rb") as src:
+                    shutil.copyfileobj(src, f)
+            else:
+                f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+    _cache_evict()
+
+
+def _cache_evict():
+    """Delete least recently used clips until the cache fits AUDIO_CACHE_MAX_BYTES."""
+    with _cache_lock:
+        entries = []
+        for path in _cache_files():
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= AUDIO_CACHE_MAX_BYTES:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            _cache_stats["evictions"] += 1
+
+
+def get_cache_stats() -> dict:
+    """
+    Report audio cache effectiveness.
+
+    Returns:
+        {"hits", "misses", "evictions", "entries", "bytes"} counters for this process/cache dir.
+    """
+    with _cache_lock:
+        stats = dict(_cache_stats)
+    files = _cache_files()
+    stats["entries"] = len(files)
+    stats["bytes"] = sum(f.stat().st_size for f in files if f.exists())
+    return stats
+
+
+def _copy_cached(cached: Path, output_path: str | None):
+    if output_path:
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(cached, output_path)
+
+
+def _ffmpeg_command(output: str) -> list[str]:
+    """ffmpeg reading mono s16le PCM from stdin and writing AUDIO_FORMAT to output (a path or pipe:1)."""
+    return [
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+        "-f", "s16le", "-ar", str(SAMPLE_RATE), "-ac", "1", "-i", "pipe:0",
+        *AUDIO_ENCODING["ffmpeg"], output,
+    ]
+
+
+def _require_ffmpeg():
+    if not shutil.which("ffmpeg"):
+        raise RuntimeError(f"ffmpeg is required to encode PCM audio as {AUDIO_FORMAT}")
+
+
+def _pcm_to_wav(pcm: bytes) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as clip:
+        clip.setnchannels(1)
+        clip.setsampwidth(2)
+        clip.setframerate(SAMPLE_RATE)
+        clip.writeframes(pcm)
+    return buffer.getvalue()
+
+
+def _encode_pcm(pcm: bytes) -> bytes:
+    """Encode a complete PCM clip as AUDIO_FORMAT."""
+    if AUDIO_ENCODING["ffmpeg"] is None:
+        return _pcm_to_wav(pcm)
+    _require_ffmpeg()
+    result = subprocess.run(_ffmpeg_command("pipe:1"), input=pcm, capture_output=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {result.stderr.decode(errors='replace').strip()}")
+    return result.stdout
+
+
+class AudioWriter:
+    """
+    Writes PCM chunks to an audio file as they arrive.
+
+    WAV is written directly; compressed formats are piped through ffmpeg, which
+    encodes while the rest of the turn is still being synthesized.
+    """
+
+    def __init__(self, output_path: str):
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        self._wav = None
+        self._ffmpeg = None
+        if AUDIO_ENCODING["ffmpeg"] is None:
+            self._wav = wave.open(output_path, "wb")
+            self._wav.setnchannels(1)
+            self._wav.setsampwidth(2)
+            self._wav.setframerate(SAMPLE_RATE)
+        else:
+            _require_ffmpeg()
+            self._ffmpeg = subprocess.Popen(
+                _ffmpeg_command(output_path), stdin=subprocess.PIPE, stderr=subprocess.PIPE,
+            )
+
+    def write(self, pcm: bytes):
+        if self._wav:
+            self._wav.writeframes(pcm)  # header sizes are patched on close
+        else:
+            self._ffmpeg.stdin.write(pcm)
+
+    def close(self):
+        if self._wav:
+            self._wav.close()
+            return
+        self._ffmpeg.stdin.close()
+        stderr = self._ffmpeg.stderr.read()
+        if self._ffmpeg.wait() != 0:
+            raise RuntimeError(f"ffmpeg failed: {stderr.decode(errors='replace').strip()}")
+
+
+def iter_sentences(deltas: Iterable[str]) -> Iterator[str]:
+    """
+    Regroup streamed text into complete sentences.
+
+    Args:
+        deltas: Text fragments in order (e.g. Claude text deltas, or a single full string).
+
+    Yields:
+        Sentences with their trailing space, as soon as each one is complete;
+        any unterminated remainder is yielded at the end.
+    """
+    buffer = ""
+    for delta in deltas:
+        buffer += delta
+        while True:
+            match = _SENTENCE_END.search(buffer)
+            if not match:
+                break
+            yield buffer[:match.end()]
+            buffer = buffer[match.end():]
+    if buffer.strip():
+        yield buffer
+
+
+def text_to_speech(
+    text: str,
+    agent_name: str,
+    output_path: str | None = None,
+    retries: int | None = None,
+) -> bytes:
     """
     Convert text to speech audio using the agent's voice.
 
     Args:
         text: The text to speak.
         agent_name: "Street Reporter" or "Insider" -- determines voice.
-        output_path: Optional file path to save the WAV file.
+        output_path: Optional file path to save the audio file.
+        retries: Extra attempts after a transient failure (default: CARTESIA_TTS_RETRIES).
 
     Returns:
-        Raw audio bytes (WAV format).
+        Audio bytes in AUDIO_FORMAT (MP3 by default).
     """
+    voice_id = _get_voice_id(agent_name)
+
+    key = _cache_key(voice_id, _CLIP_FORMAT, text)
+    cached = _cache_lookup(key)
+    if cached:
+        _copy_cached(cached, output_path)
+        return cached.read_bytes()
+
     client = get_client()
-    voice_id = VOICE_IDS.get(agent_name, "")
 
-    if not voice_id:
-        raise ValueError(
-            f"No voice ID configured for '{agent_name}'. "
-            f"Set CARTESIA_VOICE_REPORTER and CARTESIA_VOICE_INSIDER in .env"
-        )
-
-    audio_chunks = client.tts.bytes(
-        model_id=MODEL,
-        transcript=text,
-        voice={"id": voice_id},
-        output_format=OUTPUT_FORMAT,
-        language="en",
-    )
+    def synthesize() -> bytes:
+        return b"".join(client.tts.bytes(
+            model_id=MODEL,
+            transcript=text,
+            voice={"id": voice_id},
+            output_format=OUTPUT_FORMAT,
+            language="en",
+        ))
+
+    audio_data = _upstream.call(synthesize, cost=len(text), retries=retries)
+    if AUDIO_ENCODING["cartesia"] is None:
+        audio_data = _encode_pcm(audio_data)
+    _cache_store(key, audio_data)
+    _write_audio(output_path, audio_data)
+
+    return audio_data
+
+
+async def atext_to_speech(
+    text: str,
+    agent_name: str,
+    output_path: str | None = None,
+    hedge: bool = TTS_HEDGE,
+    retries: int | None = None,
+) -> bytes:
+    """
+    Async version of text_to_speech, on AsyncCartesia. Same arguments and caching.
+
+    With hedge, a second identical request is fired if the first runs past the
+    recent p95 latency, and whichever finishes first wins.
+    """
+    voice_id = _get_voice_id(agent_name)
 
-    audio_data = b"".join(audio_chunks)
+    key = _cache_key(voice_id, _CLIP_FORMAT, text)
+    cached = _cache_lookup(key)
+    if cached:
+        _copy_cached(cached, output_path)
+        return cached.read_bytes()
 
+    client = get_async_client()
+
+    async def synthesize() -> bytes:
+        audio_chunks = []
+        async for chunk in client.tts.bytes(
+            model_id=MODEL,
+            transcript=text,
+            voice={"id": voice_id},
+            output_format=OUTPUT_FORMAT,
+            language="en",
+        ):
+            audio_chunks.append(chunk)
+        return b"".join(audio_chunks)
+
+    audio_data = await _upstream.acall(synthesize, hedge=hedge, cost=len(text), retries=retries)
+    if AUDIO_ENCODING["cartesia"] is None:
+        audio_data = await asyncio.to_thread(_encode_pcm, audio_data)
+    _cache_store(key, audio_data)
+    _write_audio(output_path, audio_data)
+
+    return audio_data
+
+
+def _write_audio(output_path: str | None, audio_data: bytes):
     if output_path:
         Path(output_path).parent.mkdir(parents=True, exist_ok=True)
         with open(output_path, "wb") as f:
             f.write(audio_data)
 
-    return audio_data
+
+def stream_text_to_speech(
+    text: str | Iterable[str],
+    agent_name: str,
+    output_path: str | None = None,
+    on_audio: Callable[[bytes], None] | None = None,
+) -> int:
+    """
+    Convert text to speech over a WebSocket, sentence by sentence.
+
+    Sentences are sent as continuations of one Cartesia context, so the voice
+    and prosody stay consistent across the turn. PCM frames are encoded into the
+    audio file (and passed to on_audio) as they arrive instead of being buffered,
+    so the first audio is ready after the first sentence. The cache keeps the
+    PCM (as WAV), so it can be re-encoded if AUDIO_FORMAT changes.
+
+    Args:
+        text: The full text, or an iterable of text deltas still being generated.
+        agent_name: "Street Reporter" or "Insider" -- determines voice.
+        output_path: Optional file path to save the audio file (in AUDIO_FORMAT).
+        on_audio: Optional callback for each raw PCM (s16le, mono) chunk.
+
+    Returns:
+        Number of PCM bytes generated.
+    """
+    voice_id = _get_voice_id(agent_name)
+
+    if isinstance(text, str):
+        cached = _cache_lookup(_cache_key(voice_id, STREAM_OUTPUT_FORMAT, text))
+        if cached:
+            with wave.open(str(cached), "rb") as clip:
+                pcm = clip.readframes(clip.getnframes())
+            if output_path:
+                _write_audio(output_path, _encode_pcm(pcm))
+            if on_audio:
+                on_audio(pcm)
+            return len(pcm)
+
+    # The full transcript (needed for the cache key) is only known once the deltas end
+    transcript = []
+
+    def record(stream: Iterable[str]) -> Iterator[str]:
+        for delta in stream:
+            transcript.append(delta)
+            yield delta
+
+    deltas = record([text] if isinstance(text, str) else text)
+
+    writer = AudioWriter(output_path) if output_path else None
+    pcm = []
+
+    # A delta stream's length is only known at the end, so it is charged afterwards
+    cost = len(text) if isinstance(text, str) else 0
+    completed = False
+    try:
+        with _upstream.limiter.slot(cost):
+            context = _get_websocket().context()
+            for output in context.send(
+                model_id=MODEL,
+                transcript=iter_sentences(deltas),
+                voice={"id": voice_id},
+                output_format=STREAM_OUTPUT_FORMAT,
+                language="en",
+            ):
+                if not output.audio:
+                    continue
+                pcm.append(output.audio)
+                if writer:
+                    writer.write(output.audio)
+                if on_audio:
+                    on_audio(output.audio)
+        completed = True
+    finally:
+        if writer:
+            try:
+                writer.close()
+            except Exception:
+                if completed:
+                    raise
+        if not cost:
+            _upstream.limiter.adjust(sum(map(len, transcript)))
+
+    pcm = b"".join(pcm)
+    _cache_store(_cache_key(voice_id, STREAM_OUTPUT_FORMAT, "".join(transcript)), _pcm_to_wav(pcm))
+
+    return len(pcm)
+
+
+def turn_audio_path(output_dir: str, index: int, agent_name: str) -> str:
+    """Build the audio path for a conversation turn, e.g. turn_00_street_reporter.mp3."""
+    slug = agent_name.lower().replace(" ", "_")
+    return f"{output_dir}/turn_{index:02d}_{slug}.{AUDIO_ENCODING['extension']}"
+
+
+def _stream_retry_delay(attempt: int, exc: BaseException, retries: int) -> float | None:
+    """
+    Upstream.retry_delay for the WebSocket path.
+
+    The sync WebSocket wraps every failure in RuntimeError("Failed to generate
+    audio. ..."), so the error it wraps is classified instead: dropped
+    connections and timeouts are retried (and counted by the circuit breaker),
+    while error payloads from Cartesia -- a bad key or voice id -- and local
+    errors are raised at once and not counted. A wrapper with no underlying
+    error is treated as a dropped connection.
+    """
+    if isinstance(exc, RuntimeError) and str(exc).startswith("Failed to generate audio"):
+        wrapped = exc.__cause__ or exc.__context__
+        exc = wrapped if wrapped is not None else ConnectionError(str(exc))
+    return _upstream.retry_delay(attempt, exc, retries)
+
+
+def synthesize_turn(
+    index: int,
+    turn: dict,
+    output_dir: str,
+    retries: int = TTS_RETRIES,
+    streaming: bool = STREAM_TTS,
+) -> dict:
+    """
+    Generate the audio file for one conversation turn, retrying on failure.
+
+    Args:
+        index: Position of the turn in the conversation (used in the filename).
+        turn: {"agent": str, "text": str} dict from the orchestrator.
+        output_dir: Directory to save the audio file.
+        retries: Extra attempts after a transient failure (with backoff).
+        streaming: If True, synthesize sentence by sentence over the WebSocket.
+
+    Returns:
+        {"agent": str, "text": str, "audio_path": str} dict.
+    """
+    agent = turn["agent"]
+    filename = turn_audio_path(output_dir, index, agent)
+
+    if not streaming:
+        text_to_speech(turn["text"], agent, output_path=filename, retries=retries)
+    else:
+        attempt = 0
+        while True:
+            _upstream.before_call()
+            try:
+                stream_text_to_speech(turn["text"], agent, output_path=filename)
+                break
+            except Exception as e:
+                delay = _stream_retry_delay(attempt, e, retries)
+                if delay is None:
+                    raise
+                print(f"  Audio for turn {index + 1} failed, retrying...")
+                time.sleep(delay)
+                attempt += 1
+        _upstream.succeeded()
+
+    return {
+        "agent": agent,
+        "text": turn["text"],
+        "audio_path": filename,
+    }
+
+
+def synthesize_turn_from_deltas(
+    index: int,
+    agent_name: str,
+    deltas: Iterable[str],
+    output_dir: str,
+    retries: int = TTS_RETRIES,
+) -> dict:
+    """
+    Generate a turn's audio while its text is still streaming in from Claude.
+
+    A consumed delta stream can't be replayed, so if the WebSocket fails the
+    rest of the text is collected and the turn falls back to synthesize_turn.
+
+    Args:
+        index: Position of the turn in the conversation (used in the filename).
+        agent_name: "Street Reporter" or "Insider" -- determines voice.
+        deltas: Text deltas for the turn; the iterable ends when the turn is complete.
+        output_dir: Directory to save the audio file.
+        retries: Extra attempts for the fallback path.
+
+    Returns:
+        {"agent": str, "text": str, "audio_path": str} dict.
+    """
+    seen = []
+
+    def record(stream: Iterable[str]) -> Iterator[str]:
+        for delta in stream:
+            seen.append(delta)
+            yield delta
+
+    deltas = iter(deltas)
+    filename = turn_audio_path(output_dir, index, agent_name)
+    try:
+        stream_text_to_speech(record(deltas), agent_name, output_path=filename)
+    except ValueError:
+        raise
+    except Exception as e:
+        print(f"  Streaming audio for turn {index + 1} failed ({e}), falling back...")
+        seen.extend(deltas)  # drain whatever Claude is still sending
+        turn = {"agent": agent_name, "text": "".join(seen)}
+        return synthesize_turn(index, turn, output_dir, retries, streaming=False)
+
+    return {
+        "agent": agent_name,
+        "text": "".join(seen),
+        "audio_path": filename,
+    }
+
+
+async def asynthesize_turn(
+    index: int,
+    turn: dict,
+    output_dir: str,
+    retries: int = TTS_RETRIES,
+    streaming: bool = STREAM_TTS,
+) -> dict:
+    """
+    Async version of synthesize_turn.
+
+    The one-shot path runs on AsyncCartesia. The streaming path reuses the
+    per-thread WebSocket in a worker thread, so it never blocks the event loop.
+    """
+    agent = turn["agent"]
+    filename = turn_audio_path(output_dir, index, agent)
+
+    if not streaming:
+        await atext_to_speech(turn["text"], agent, output_path=filename, retries=retries)  # hedged by the resilience layer
+    else:
+        attempt = 0
+        while True:
+            _upstream.before_call()
+            try:
+                await asyncio.to_thread(stream_text_to_speech, turn["text"], agent, filename)
+                break
+            except Exception as e:
+                delay = _stream_retry_delay(attempt, e, retries)
+                if delay is None:
+                    raise
+                print(f"  Audio for turn {index + 1} failed, retrying...")
+                await asyncio.sleep(delay)
+                attempt += 1
+        _upstream.succeeded()
+
+    return {
+        "agent": agent,
+        "text": turn["text"],
+        "audio_path": filename,
+    }
 
 
 def generate_conversation_audio(
     conversation: list[dict],
     output_dir: str = "audio_output",
+    max_concurrency: int = MAX_CONCURRENCY,
+    retries: int = TTS_RETRIES,
 ) -> list[dict]:
     """
     Generate audio files for an entire conversation.
 
+    Every turn's text is already known, so turns are synthesized in parallel
+    (up to max_concurrency at a time). Results come back in turn order.
+
     Args:
         conversation: List of {"agent": str, "text": str} dicts from orchestrator.
-        output_dir: Directory to save WAV files.
+        output_dir: Directory to save audio files.
+        max_concurrency: Maximum number of simultaneous Cartesia requests.
+        retries: Extra attempts per turn before giving up.
 
     Returns:
         List of {"agent": str, "text": str, "audio_path": str} dicts.
     """
-    results = []
-
-    for i, turn in enumerate(conversation):
-        agent = turn["agent"]
-        text = turn["text"]
-        filename = f"{output_dir}/turn_{i:02d}_{agent.lower().replace(' ', '_')}.wav"
-
-        print(f"  Generating audio for turn {i + 1}: {agent}...")
-        text_to_speech(text, agent, output_path=filename)
-
-        results.append({
-            "agent": agent,
-            "text": text,
-            "audio_path": filename,
-        })
+    print(f"  Generating audio for {len(conversation)} turns ({max_concurrency} at a time)...")
 
-    return results
+    with ThreadPoolExecutor(max_workers=max(1, max_concurrency), thread_name_prefix="tts") as pool:
+        futures = [
+            pool.submit(synthesize_turn, i, turn, output_dir, retries)
+            for i, turn in enumerate(conversation)
+        ]
+        return [f.result() for f in futures]
@@ -3,32 +3,202 @@ Claude API client wrapper.
 Handles message creation with system prompts for agent personalities.
 Supports web_search tool for real-time data.
 """
+import asyncio
+import json
 import os
+import threading
+import time
+from typing import AsyncIterator, Callable, Iterator
 
-from anthropic import Anthropic
+from anthropic import Anthropic, AsyncAnthropic
 from dotenv import load_dotenv
 
+from src.context_bundles import estimate_tokens
+from src.rate_limits import get_limiter
+from src.resilience import Upstream
+from src.response_cache import MemoryCache, SQLiteCache, make_key
+
 load_dotenv()
 
 MODEL = "claude-sonnet-4-20250514"
 MAX_TOKENS = 300
 
+# Response cache: persistent if CLAUDE_CACHE_DB is set, otherwise in-memory.
+# Web search answers go stale, so they expire (0 = never cache them).
+CACHE_DB = os.getenv("CLAUDE_CACHE_DB", "")
+WEB_SEARCH_CACHE_TTL = int(os.getenv("CLAUDE_WEB_SEARCH_CACHE_TTL", "3600"))
+
+# Per-call deadline (seconds) and extra attempts on rate limits / server errors.
+# The SDK's own retries are off so every retry goes through the shared resilience layer.
+CLAUDE_TIMEOUT = float(os.getenv("CLAUDE_TIMEOUT", "120"))
+CLAUDE_RETRIES = int(os.getenv("CLAUDE_RETRIES", "3"))
+
+# Shortest prefix the API prompt-caches for MODEL: breakpoints on shorter prefixes are
+# silently ignored (measured: 1.8k-token prompts were never cached, 2k-token ones were)
+CACHE_MIN_TOKENS = int(os.getenv("CLAUDE_CACHE_MIN_TOKENS", "2048"))
+
+# Seconds between status checks while a Message Batch is processing
+BATCH_POLL_INTERVAL = float(os.getenv("CLAUDE_BATCH_POLL_INTERVAL", "10"))
+
 _client = None
+_async_client = None
+_async_client_loop = None
+_cache = None
+_cache_lock = threading.Lock()
+_cache_stats = {"hits": 0, "misses": 0}
+# Shared by every caller in the process, so concurrent investigations stay within CLAUDE_RPM / CLAUDE_TPM
+_upstream = Upstream("Claude", CLAUDE_RETRIES, CLAUDE_TIMEOUT, limiter=get_limiter("claude"))
 
 
 def get_client() -> Anthropic:
     """Get or create the Anthropic client (singleton)."""
     global _client
     if _client is None:
-        _client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+        _client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"), max_retries=0, timeout=CLAUDE_TIMEOUT)
     return _client
 
 
+def get_async_client() -> AsyncAnthropic:
+    """Get or create the async Anthropic client (one per event loop)."""
+    global _async_client, _async_client_loop
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client_loop is not loop:
+        _async_client = AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"), max_retries=0, timeout=CLAUDE_TIMEOUT)
+        _async_client_loop = loop
+    return _async_client
+
+
+def get_response_cache():
+    """Get or create the response cache (singleton)."""
+    global _cache
+    if _cache is None:
+        _cache = SQLiteCache(CACHE_DB) if CACHE_DB else MemoryCache()
+    return _cache
+
+
+def set_response_cache(cache):
+    """
+    Plug in a response cache backend.
+
+    Args:
+        cache: Any object with get(key) -> str | None and set(key, value, ttl=None),
+            e.g. MemoryCache or SQLiteCache from src.response_cache.
+    """
+    global _cache
+    _cache = cache
+
+
+def get_cache_stats() -> dict:
+    """Return response cache {"hits", "misses"} counters for this process."""
+    with _cache_lock:
+        return dict(_cache_stats)
+
+
+def _cache_ttl(use_web_search: bool) -> float | None:
+    """None = cache forever; 0 = don't cache."""
+    return WEB_SEARCH_CACHE_TTL if use_web_search else None
+
+
+def _cached_response(key: str) -> str | None:
+    value = get_response_cache().get(key)
+    with _cache_lock:
+        _cache_stats["hits" if value is not None else "misses"] += 1
+    return value
+
+
+def _store_response(key: str, text: str, use_web_search: bool):
+    ttl = _cache_ttl(use_web_search)
+    if ttl != 0:
+        get_response_cache().set(key, text, ttl=ttl)
+
+
+def _with_cache_breakpoint(message: dict) -> dict:
+    """Copy a message with a cache_control breakpoint on its last content block."""
+    content = message["content"]
+    if isinstance(content, str):
+        content = [{"type": "text", "text": content}]
+    content = [dict(block) for block in content]
+    content[-1]["cache_control"] = {"type": "ephemeral"}
+    return {**message, "content": content}
+
+
+def _build_request(
+    system_prompt: str,
+    messages: list[dict],
+    max_tokens: int,
+    use_web_search: bool,
+    context: str | None = None,
+) -> dict:
+    """
+    Build the messages API kwargs shared by the blocking and streaming calls.
+
+    The system prompt plus shared context is the stable prefix of every turn.
+    It gets its own prompt-caching breakpoint only if it is long enough to be
+    cached on its own (CACHE_MIN_TOKENS); the shipped context bundles are
+    shorter than that. The breakpoint on the last message caches the prefix
+    together with the conversation history once that passes the minimum (a
+    few exchanges in), and lets the agent's next turn reuse both.
+    """
+    system = [{"type": "text", "text": system_prompt}]
+    if context:
+        system.append({"type": "text", "text": context})
+    if estimate_tokens(system_prompt + (context or "")) >= CACHE_MIN_TOKENS:
+        system[-1]["cache_control"] = {"type": "ephemeral"}
+
+    if messages:
+        messages = messages[:-1] + [_with_cache_breakpoint(messages[-1])]
+
+    kwargs = {
+        "model": MODEL,
+        "max_tokens": max_tokens,
+        "system": system,
+        "messages": messages,
+    }
+
+    if use_web_search:
+        kwargs["tools"] = [{"type": "web_search_20250305", "name": "web_search", "max_uses": 3}]
+
+    return kwargs
+
+
+def _usage_dict(usage) -> dict:
+    """Flatten API usage, including prompt cache reads/writes, into a plain dict."""
+    return {
+        "input_tokens": usage.input_tokens,
+        "output_tokens": usage.output_tokens,
+        "cache_read_input_tokens": getattr(usage, "cache_read_input_tokens", None) or 0,
+        "cache_creation_input_tokens": getattr(usage, "cache_creation_input_tokens", None) or 0,
+    }
+
+
+def _estimated_cost(request: dict) -> int:
+    """Tokens to reserve with the rate limiter before a call: rough prompt size plus max output."""
+    return estimate_tokens(json.dumps([request["system"], request["messages"]])) + request["max_tokens"]
+
+
+def _settle_cost(cost: int, usage: dict):
+    """Correct the limiter's reservation to what the call really used (cache reads are free)."""
+    actual = usage["input_tokens"] + usage["cache_creation_input_tokens"] + usage["output_tokens"]
+    _upstream.limiter.adjust(actual - cost)
+
+
+def _extract_text(response) -> str:
+    """Join the text blocks of a response, skipping tool use blocks."""
+    text_parts = []
+    for block in response.content:
+        if block.type == "text":
+            text_parts.append(block.text)
+    return "".join(text_parts)
+
+
 def get_agent_response(
     system_prompt: str,
     messages: list[dict],
     max_tokens: int = MAX_TOKENS,
     use_web_search: bool = False,
+    use_cache: bool = True,
+    context: str | None = None,
+    on_usage: Callable[[dict], None] | None = None,
 ) -> str:
     """
     Get a response from Claude using a specific agent personality.
@@ -38,28 +208,246 @@ def get_agent_response(
         messages: Conversation history in Claude message format.
         max_tokens: Max response length.
         use_web_search: If True, enable Claude's web_search tool.
+        use_cache: If False, bypass the response cache (neither read nor written).
+        context: Optional shared background (e.g. publication data), sent after the
+            system prompt as part of the prompt-cached prefix.
+        on_usage: Optional callback with the call's token usage, including
+            cache_read_input_tokens and cache_creation_input_tokens. Not called
+            when the response comes from the response cache.
 
     Returns:
         The agent's text response.
     """
+    request = _build_request(system_prompt, messages, max_tokens, use_web_search, context)
+    key = make_key(request) if use_cache else None
+    if key:
+        cached = _cached_response(key)
+        if cached is not None:
+            return cached
+
     client = get_client()
+    cost = _estimated_cost(request)
+    response = _upstream.call(client.messages.create, cost=cost, **request)
 
-    kwargs = {
-        "model": MODEL,
-        "max_tokens": max_tokens,
-        "system": system_prompt,
-        "messages": messages,
-    }
+    usage = _usage_dict(response.usage)
+    _settle_cost(cost, usage)
+    if on_usage:
+        on_usage(usage)
 
-    if use_web_search:
-        kwargs["tools"] = [{"type": "web_search_20250305", "name": "web_search", "max_uses": 3}]
+    text = _extract_text(response)
+    if key:
+        _store_response(key, text, use_web_search)
+    return text
 
-    response = client.messages.create(**kwargs)
 
-    # Extract text from response, handling tool use blocks
-    text_parts = []
-    for block in response.content:
-        if block.type == "text":
-            text_parts.append(block.text)
+def stream_agent_response(
+    system_prompt: str,
+    messages: list[dict],
+    max_tokens: int = MAX_TOKENS,
+    use_web_search: bool = False,
+    use_cache: bool = True,
+    context: str | None = None,
+    on_usage: Callable[[dict], None] | None = None,
+) -> Iterator[str]:
+    """
+    Stream a response from Claude as text deltas.
 
-    return "".join(text_parts)
+    Same request as get_agent_response, but yields text as it is generated.
+    web_search tool blocks (server_tool_use / web_search_tool_result) are
+    handled server-side and never yielded -- only text block deltas are, so
+    "".join() of the deltas equals get_agent_response's return value.
+    A cached response is yielded as a single delta.
+
+    Args:
+        system_prompt: The agent's system prompt (personality definition).
+        messages: Conversation history in Claude message format.
+        max_tokens: Max response length.
+        use_web_search: If True, enable Claude's web_search tool.
+        use_cache: If False, bypass the response cache (neither read nor written).
+        context: Optional shared background, sent as part of the prompt-cached prefix.
+        on_usage: Optional callback with the call's token usage once the stream ends.
+
+    Yields:
+        Text deltas, in order.
+    """
+    request = _build_request(system_prompt, messages, max_tokens, use_web_search, context)
+    key = make_key(request) if use_cache else None
+    if key:
+        cached = _cached_response(key)
+        if cached is not None:
+            yield cached
+            return
+
+    client = get_client()
+    cost = _estimated_cost(request)
+    parts = []
+    attempt = 0
+    while True:
+        _upstream.before_call()
+        try:
+            with _upstream.limiter.slot(cost), client.messages.stream(**request) as stream:
+                for delta in stream.text_stream:
+                    parts.append(delta)
+                    yield delta
+                usage = _usage_dict(stream.get_final_message().usage)
+            break
+        except Exception as e:
+            # Once text has been yielded the turn can't be restarted transparently
+            delay = None if parts else _upstream.retry_delay(attempt, e)
+            if delay is None:
+                raise
+            time.sleep(delay)
+            attempt += 1
+    _upstream.succeeded()
+    _settle_cost(cost, usage)
+    if on_usage:
+        on_usage(usage)
+
+    # Only complete responses are cached
+    if key:
+        _store_response(key, "".join(parts), use_web_search)
+
+
+async def aget_agent_response(
+    system_prompt: str,
+    messages: list[dict],
+    max_tokens: int = MAX_TOKENS,
+    use_web_search: bool = False,
+    use_cache: bool = True,
+    context: str | None = None,
+    on_usage: Callable[[dict], None] | None = None,
+) -> str:
+    """Async version of get_agent_response, on AsyncAnthropic. Same arguments and caching."""
+    request = _build_request(system_prompt, messages, max_tokens, use_web_search, context)
+    key = make_key(request) if use_cache else None
+    if key:
+        cached = _cached_response(key)
+        if cached is not None:
+            return cached
+
+    client = get_async_client()
+    cost = _estimated_cost(request)
+    response = await _upstream.acall(client.messages.create, cost=cost, **request)
+
+    usage = _usage_dict(response.usage)
+    _settle_cost(cost, usage)
+    if on_usage:
+        on_usage(usage)
+
+    text = _extract_text(response)
+    if key:
+        _store_response(key, text, use_web_search)
+    return text
+
+
+async def astream_agent_response(
+    system_prompt: str,
+    messages: list[dict],
+    max_tokens: int = MAX_TOKENS,
+    use_web_search: bool = False,
+    use_cache: bool = True,
+    context: str | None = None,
+    on_usage: Callable[[dict], None] | None = None,
+) -> AsyncIterator[str]:
+    """Async version of stream_agent_response, on AsyncAnthropic. Same arguments and caching."""
+    request = _build_request(system_prompt, messages, max_tokens, use_web_search, context)
+    key = make_key(request) if use_cache else None
+    if key:
+        cached = _cached_response(key)
+        if cached is not None:
+            yield cached
+            return
+
+    client = get_async_client()
+    cost = _estimated_cost(request)
+    parts = []
+    attempt = 0
+    while True:
+        _upstream.before_call()
+        try:
+            async with _upstream.limiter.aslot(cost), client.messages.stream(**request) as stream:
+                async for delta in stream.text_stream:
+                    parts.append(delta)
+                    yield delta
+                usage = _usage_dict((await stream.get_final_message()).usage)
+            break
+        except Exception as e:
+            delay = None if parts else _upstream.retry_delay(attempt, e)
+            if delay is None:
+                raise
+            await asyncio.sleep(delay)
+            attempt += 1
+    _upstream.succeeded()
+    _settle_cost(cost, usage)
+    if on_usage:
+        on_usage(usage)
+
+    if key:
+        _store_response(key, "".join(parts), use_web_search)
+
+
+async def arun_message_batch(
+    requests: dict[str, dict],
+    use_cache: bool = True,
+    poll_interval: float = BATCH_POLL_INTERVAL,
+) -> dict[str, tuple[str, dict | None]]:
+    """
+    Run many independent agent requests as one Message Batch.
+
+    Batches are billed at half price but may take minutes to process, so this
+    suits offline jobs. Cached responses are answered locally and never submitted.
+
+    Args:
+        requests: custom_id -> keyword arguments of get_agent_response
+            (system_prompt, messages, and optionally max_tokens, use_web_search, context).
+            custom_ids must match [a-zA-Z0-9_-]{1,64}.
+        use_cache: If False, bypass the response cache (neither read nor written).
+        poll_interval: Seconds between batch status checks.
+
+    Returns:
+        custom_id -> (text, usage) for every request that succeeded; usage is None
+        for cache hits. Errored or expired requests are left out so callers can retry them.
+    """
+    results = {}
+    pending = {}
+    for custom_id, kwargs in requests.items():
+        use_web_search = kwargs.get("use_web_search", False)
+        request = _build_request(
+            kwargs["system_prompt"],
+            kwargs["messages"],
+            kwargs.get("max_tokens", MAX_TOKENS),
+            use_web_search,
+            kwargs.get("context"),
+        )
+        key = make_key(request) if use_cache else None
+        cached = _cached_response(key) if key else None
+        if cached is not None:
+            results[custom_id] = (cached, None)
+        else:
+            pending[custom_id] = (request, key, use_web_search)
+
+    if not pending:
+        return results
+
+    client = get_async_client()
+    batch = await _upstream.acall(client.messages.batches.create, requests=[
+        {"custom_id": custom_id, "params": request} for custom_id, (request, _, _) in pending.items()
+    ])
+    print(f"  Submitted message batch {batch.id} ({len(pending)} requests)")
+
+    while batch.processing_status != "ended":
+        await asyncio.sleep(poll_interval)
+        batch = await _upstream.acall(client.messages.batches.retrieve, batch.id)
+
+    async for entry in await _upstream.acall(client.messages.batches.results, batch.id):
+        if entry.result.type != "succeeded":
+            print(f"  (batch request {entry.custom_id} {entry.result.type})")
+            continue
+        _, key, use_web_search = pending[entry.custom_id]
+        message = entry.result.message
+        text = _extract_text(message)
+        if key:
+            _store_response(key, text, use_web_search)
+        results[entry.custom_id] = (text, _usage_dict(message.usage))
+
+    return results
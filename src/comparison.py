@@ -0,0 +1,127 @@
+"""
+Comparative investigations.
+One conversation over several publications at once, so the agents can
+connect the dots between owners (e.g. Fox, WSJ and the NY Post under the
+Murdochs). The group behaves like a single publication everywhere else --
+runs, jobs, demos -- under an id such as "fox_vs_nyt_vs_wsj".
+
+Each member's context bundle is loaded, and with web search each member is
+researched, concurrently; the results are merged into one byte-stable
+briefing that every turn shares as its prompt-cached prefix. A 3-way
+comparison therefore takes about as long as a single investigation.
+"""
+import asyncio
+import os
+
+from dotenv import load_dotenv
+
+from src.claude_client import aget_agent_response
+from src.context_bundles import get_bundle
+from src.publications import get_publication
+
+load_dotenv()
+
+COMPARE_SEPARATOR = "_vs_"
+# Publications allowed in one comparison
+MAX_COMPARE = int(os.getenv("COMPARE_MAX_PUBLICATIONS", "4"))
+# Max length of each publication's research brief
+RESEARCH_MAX_TOKENS = int(os.getenv("COMPARE_RESEARCH_MAX_TOKENS", "600"))
+
+RESEARCH_PROMPT = """You are the research desk for a media ownership investigation. Using web search, \
+find the most recent ownership developments for the publication in the briefing: deals and sales, \
+lawsuits, leadership and editorial changes, owner conflicts of interest. Reply with at most 8 short \
+factual bullet points, each with a date. No commentary."""
+
+
+def is_comparison_id(pub_id: str) -> bool:
+    return COMPARE_SEPARATOR in pub_id
+
+
+def comparison_id(pub_ids: list[str]) -> str:
+    """Canonical id of a comparison: the same group in any order gets the same id."""
+    return COMPARE_SEPARATOR.join(sorted(set(pub_ids)))
+
+
+def comparison_publication(pub_ids: list[str]) -> dict:
+    """
+    Build the pseudo-publication for a comparison.
+
+    Args:
+        pub_ids: Two or more publication ids, in any order.
+
+    Returns:
+        {"id", "name", "owner", "members"} -- members are the publication dicts,
+        sorted by id so the shared briefing is identical for the same group.
+
+    Raises:
+        ValueError: Fewer than two distinct ids, too many, or an unknown id.
+    """
+    ids = sorted({p.strip().lower() for p in pub_ids if p.strip()})
+    if len(ids) < 2:
+        raise ValueError("A comparison needs at least two different publications")
+    if len(ids) > MAX_COMPARE:
+        raise ValueError(f"A comparison can include at most {MAX_COMPARE} publications")
+    members = []
+    for pub_id in ids:
+        pub = get_publication(pub_id)
+        if not pub:
+            raise ValueError(f"Publication '{pub_id}' not found")
+        members.append(pub)
+
+    return {
+        "id": comparison_id(ids),
+        "name": " vs. ".join(p["name"] for p in members),
+        "owner": "; ".join(f"{p['name']}: {p['owner']}" for p in members),
+        "members": members,
+    }
+
+
+async def aresearch_publication(pub: dict, bundle_text: str, use_cache: bool = True) -> str:
+    """One web-search research call for a publication; returns its brief ("" if it fails)."""
+    try:
+        return await aget_agent_response(
+            RESEARCH_PROMPT,
+            [{"role": "user", "content": f"Research the latest ownership developments for {pub['name']}."}],
+            max_tokens=RESEARCH_MAX_TOKENS,
+            use_web_search=True,
+            use_cache=use_cache,
+            context=bundle_text,
+        )
+    except Exception as e:
+        print(f"  (Research for {pub['name']} failed: {e})")
+        return ""
+
+
+async def abuild_comparison_briefing(group: dict, use_web_search: bool = False, use_cache: bool = True) -> str:
+    """
+    Shared background for a comparison: every member's context, plus fresh research with web search.
+
+    Bundles load and research calls run concurrently across members. The turns
+    themselves then don't need web search, since the research is in the briefing.
+    """
+    members = group["members"]
+    bundles = await asyncio.gather(*(asyncio.to_thread(get_bundle, pub) for pub in members))
+    for pub, bundle in zip(members, bundles):
+        print(f"  Context bundle {bundle['hash'][:12]} for {pub['id']} (~{bundle['tokens']} tokens)")
+
+    research = [""] * len(members)
+    if use_web_search:
+        print(f"  Researching {len(members)} publications in parallel...")
+        research = await asyncio.gather(*(
+            aresearch_publication(pub, bundle["text"], use_cache) for pub, bundle in zip(members, bundles)
+        ))
+
+    sections = []
+    for bundle, brief in zip(bundles, research):
+        section = bundle["text"]
+        if brief:
+            section += f"\n\nLATEST DEVELOPMENTS (web research):\n{brief}"
+        sections.append(section)
+
+    names = ", ".join(p["name"] for p in members)
+    return (
+        f"BRIEFING -- WHAT WE KNOW ABOUT {len(members)} PUBLICATIONS ({names}):\n\n"
+        + "\n\n---\n\n".join(sections)
+        + "\n\nCompare them: shared owners, overlapping business interests, and how each "
+        "owner's conflicts show up in coverage."
+    )
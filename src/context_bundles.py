@@ -0,0 +1,248 @@
+"""
+Precomputed context bundles.
+Each publication's agent context (dataset fields plus Notion enrichment) is
+formatted once, hashed, token-counted and stored on disk. A bundle is rebuilt
+only when its publication entry or its Notion snapshot page changes, so live
+investigations start from a ready-made, byte-stable prefix.
+
+Usage:
+    python -m src.context_bundles           # refresh Notion snapshot, rebuild stale bundles
+    python -m src.context_bundles --exact   # ... and count tokens with the Anthropic API
+"""
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from src.notion_snapshot import MAX_AGE, ensure_fresh, find_publication, format_notion_context, load_snapshot
+from src.publications import get_dataset
+
+load_dotenv()
+
+BUNDLE_PATH = os.getenv("CONTEXT_BUNDLE_PATH", ".cache/context_bundles.json")
+# Bump when the bundle text format changes, so stored bundles are rebuilt
+BUNDLE_VERSION = 1
+
+_lock = threading.Lock()
+_loaded = {"mtime": None, "bundles": None}
+_notion_refresh = {"thread": None}
+_notion_refresh_lock = threading.Lock()
+
+
+def format_publication_context(pub: dict) -> str:
+    """Format a publication's data into a context string for the agents."""
+    rating = pub.get("ground_news_rating", {})
+    angles = pub.get("voice_agent_angles", {})
+
+    conflicts = "\n".join(f"  - {c}" for c in pub.get("conflicts_of_interest", []))
+    controversies = "\n".join(f"  - {c}" for c in pub.get("recent_controversies", []))
+
+    context = f"""PUBLICATION: {pub['name']}
+OWNER: {pub['owner']}
+OWNERSHIP STRUCTURE: {pub.get('ownership_structure', 'Unknown')}
+YEAR ACQUIRED: {pub.get('year_acquired', 'Unknown')}
+PURCHASE PRICE: {pub.get('purchase_price', 'N/A')}
+PARENT COMPANY: {pub.get('parent_company', 'N/A')}
+CONTROLLING FAMILY: {pub.get('controlling_family', 'N/A')}
+KEY FIGURE: {pub.get('key_figure', 'N/A')}
+CURRENT STATUS: {pub.get('current_status', 'Unknown')}
+
+GROUND NEWS RATINGS:
+  Bias: {rating.get('bias', 'Unknown')}
+  Factuality: {rating.get('factuality', 'Unknown')}
+  Ownership Category: {rating.get('ownership_category', 'Unknown')}
+
+CONFLICTS OF INTEREST:
+{conflicts}
+
+RECENT CONTROVERSIES:
+{controversies}
+
+SUGGESTED ANGLES:
+  Street Reporter: {angles.get('street_reporter', '')}
+  Insider: {angles.get('insider', '')}"""
+
+    return context
+
+
+def _digest(value) -> str:
+    canonical = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _sources(pub: dict) -> str:
+    """Fingerprint of everything a bundle is built from."""
+    return _digest([BUNDLE_VERSION, pub, find_publication(pub["name"])])
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token), no API call."""
+    return (len(text) + 3) // 4
+
+
+def count_tokens(text: str) -> int:
+    """Exact input token count of a context block, via the Anthropic count_tokens API."""
+    from src.claude_client import MODEL, get_client
+
+    result = get_client().messages.count_tokens(
+        model=MODEL,
+        system=[{"type": "text", "text": text}],
+        messages=[{"role": "user", "content": "."}],
+    )
+    return result.input_tokens
+
+
+def _load_bundles() -> dict:
+    """Return the stored bundles by pub id, re-reading the file only if it changed."""
+    try:
+        mtime = os.stat(BUNDLE_PATH).st_mtime_ns
+    except FileNotFoundError:
+        return _loaded["bundles"] or {}
+
+    if _loaded["mtime"] != mtime:
+        with open(BUNDLE_PATH) as f:
+            _loaded.update({"mtime": mtime, "bundles": json.load(f)})
+    return _loaded["bundles"]
+
+
+def _write_bundles(bundles: dict):
+    """Atomically replace the bundle file."""
+    path = Path(BUNDLE_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(bundles, f, indent=2)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    _loaded.update({"mtime": os.stat(path).st_mtime_ns, "bundles": bundles})
+
+
+def build_bundle(pub: dict, exact_tokens: bool = False) -> dict:
+    """
+    Build a context bundle from the dataset entry and the local Notion snapshot.
+
+    Args:
+        pub: Publication data dict.
+        exact_tokens: If True, count tokens with the API instead of estimating.
+
+    Returns:
+        {"pub_id", "text", "notion", "hash", "tokens", "tokens_exact", "sources", "built_at"}
+    """
+    text = format_publication_context(pub)
+    try:
+        notion = format_notion_context(pub["name"], max_age=None)
+    except Exception as e:
+        print(f"  (Notion enrichment skipped for {pub['name']}: {e})")
+        notion = ""
+    if notion:
+        text += f"\n\n{notion}"
+
+    tokens = count_tokens(text) if exact_tokens else estimate_tokens(text)
+    return {
+        "pub_id": pub["id"],
+        "text": text,
+        "notion": notion,
+        "hash": hashlib.sha256(text.encode()).hexdigest(),
+        "tokens": tokens,
+        "tokens_exact": exact_tokens,
+        "sources": _sources(pub),
+        "built_at": time.time(),
+    }
+
+
+def _refresh_notion_in_background(max_age: float = MAX_AGE):
+    """Start a snapshot refresh on a daemon thread if it's stale and none is running."""
+    if not (os.getenv("NOTION_API_KEY") and os.getenv("NOTION_DATABASE_ID")):
+        return  # Notion isn't configured: the snapshot can't be refreshed
+    if time.time() - load_snapshot()["refreshed_at"] <= max_age:
+        return
+
+    def refresh():
+        try:
+            ensure_fresh(max_age)
+        except Exception as e:
+            print(f"  (Background Notion refresh failed: {e})")
+
+    # Concurrent get_bundle calls (e.g. a comparison's fan-out) must start only one refresh
+    with _notion_refresh_lock:
+        thread = _notion_refresh["thread"]
+        if thread is not None and thread.is_alive():
+            return
+        thread = threading.Thread(target=refresh, name="notion-refresh", daemon=True)
+        _notion_refresh["thread"] = thread
+        thread.start()
+
+
+def get_bundle(pub: dict) -> dict:
+    """
+    Return the context bundle for a publication, rebuilding it only if stale.
+
+    Never waits on Notion: the bundle uses whatever snapshot is on disk, and a
+    stale snapshot is refreshed in the background -- the bundle picks the new
+    data up on a later call.
+
+    Args:
+        pub: Publication data dict.
+
+    Returns:
+        The bundle dict (see build_bundle).
+    """
+    _refresh_notion_in_background()
+    sources = _sources(pub)
+
+    with _lock:
+        bundles = _load_bundles()
+        bundle = bundles.get(pub["id"])
+        if bundle and bundle["sources"] == sources:
+            return bundle
+
+        bundle = build_bundle(pub)
+        _write_bundles({**bundles, pub["id"]: bundle})
+        return bundle
+
+
+def build_all(exact_tokens: bool = False) -> dict:
+    """
+    Refresh the Notion snapshot (best effort) and rebuild every stale bundle.
+
+    Bundles for publications no longer in the dataset are dropped.
+
+    Args:
+        exact_tokens: If True, count tokens with the API for rebuilt bundles.
+
+    Returns:
+        All bundles by pub id.
+    """
+    try:
+        ensure_fresh(0)
+    except Exception as e:
+        print(f"  (Notion refresh failed, building from the local snapshot: {e})")
+
+    with _lock:
+        bundles = _load_bundles()
+        fresh = {}
+        for pub in get_dataset()["publications"]:
+            bundle = bundles.get(pub["id"])
+            if bundle and bundle["sources"] == _sources(pub) and bundle["tokens_exact"] >= exact_tokens:
+                fresh[pub["id"]] = bundle
+                continue
+            bundle = build_bundle(pub, exact_tokens=exact_tokens)
+            fresh[pub["id"]] = bundle
+            print(f"  Built {pub['id']}: {bundle['tokens']} tokens, hash {bundle['hash'][:12]}")
+        _write_bundles(fresh)
+        return fresh
+
+
+if __name__ == "__main__":
+    bundles = build_all(exact_tokens="--exact" in sys.argv[1:])
+    print(f"  {len(bundles)} context bundle(s) in {BUNDLE_PATH}")
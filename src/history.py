@@ -0,0 +1,174 @@
+"""
+Token-budgeted conversation history.
+Each agent's view of the shared transcript keeps its most recent exchanges
+verbatim and folds older ones into a compact rolling summary once the history
+exceeds a token budget, so long investigations don't resend every earlier turn.
+"""
+import os
+import re
+from typing import Callable
+
+from dotenv import load_dotenv
+
+from src.context_bundles import estimate_tokens
+
+load_dotenv()
+
+# Compact once the verbatim history passes this many (estimated) tokens...
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "2000"))
+# ...keeping at most this many of the latest exchanges (user + assistant pairs) verbatim...
+HISTORY_KEEP_EXCHANGES = int(os.getenv("HISTORY_KEEP_EXCHANGES", "2"))
+# ...and fewer if needed to get down to this fraction of the budget, so the history
+# has room to grow (and its prefix stays cacheable) for a few turns before the next compaction
+HISTORY_COMPACT_TARGET = float(os.getenv("HISTORY_COMPACT_TARGET", "0.5"))
+# Words kept per summarized turn
+SUMMARY_WORDS = 30
+
+
+def _gist(text: str) -> str:
+    """First sentence of a turn, cut to SUMMARY_WORDS words."""
+    first = re.split(r"(?<=[.!?])\s+", text.strip(), maxsplit=1)[0]
+    words = first.split()
+    return " ".join(words[:SUMMARY_WORDS]) + ("..." if len(words) > SUMMARY_WORDS else "")
+
+
+class TranscriptView:
+    """
+    One agent's view of a shared transcript, with a token budget.
+
+    The transcript (a list of {"agent", "text"} turns) is stored once, by the
+    conversation. The view only records which turns each of its messages
+    covers and renders the message text when it is asked for: the agent's own
+    turns become assistant messages, and the turns of everyone who spoke since
+    become one user message (worded by render). Messages alternate
+    user/assistant, starting with user.
+
+    Compaction happens in one step when the budget is exceeded, and goes down
+    to compact_target of the budget rather than just under it, so the message
+    prefix stays stable -- and prompt-cacheable -- for several turns between
+    compactions.
+
+    Args:
+        turns: The conversation's transcript, shared by every view.
+        agent: The agent this view is for.
+        render: render(start, end, first) -> the user message asking the agent to
+            answer turns[start:end]; first is True if it hasn't spoken before.
+    """
+
+    def __init__(
+        self,
+        turns: list[dict],
+        agent: str,
+        render: Callable[[int, int, bool], str],
+        budget_tokens: int = HISTORY_TOKEN_BUDGET,
+        keep_exchanges: int = HISTORY_KEEP_EXCHANGES,
+        compact_target: float = HISTORY_COMPACT_TARGET,
+    ):
+        self.turns = turns
+        self.agent = agent
+        self.render = render
+        self.budget_tokens = budget_tokens
+        self.keep_exchanges = keep_exchanges
+        self.compact_target = compact_target
+        self._window: list[tuple] = []  # ("user", start, end, first) or ("assistant", index)
+        self._summary: list[str] = []
+        self._summarized = 0
+        self._full_tokens = 0
+        self._synced = 0  # turns already folded into the window
+        self._spoken = False
+
+    def _content(self, entry: tuple) -> str:
+        if entry[0] == "assistant":
+            return self.turns[entry[1]]["text"]
+        return self.render(*entry[1:])
+
+    def _notes(self, entry: tuple) -> list[str]:
+        """Summary lines for a message: who said what, one line per turn."""
+        if entry[0] == "assistant":
+            return [f"You: {_gist(self.turns[entry[1]]['text'])}"]
+        _, start, end, _ = entry
+        if start == end:
+            return [f"Producer: {_gist(self._content(entry))}"]
+        return [f"{t['agent']}: {_gist(t['text'])}" for t in self.turns[start:end]]
+
+    def _append(self, entry: tuple):
+        self._window.append(entry)
+        self._full_tokens += estimate_tokens(self._content(entry))
+
+    def _sync(self):
+        """Fold every turn this agent has since taken (and what preceded it) into the window."""
+        for index in range(self._synced, len(self.turns)):
+            if self.turns[index]["agent"] != self.agent:
+                continue
+            self._append(("user", self._synced, index, not self._spoken))
+            self._append(("assistant", index))
+            self._spoken = True
+            self._synced = index + 1
+            self._compact()
+
+    def _window_tokens(self) -> int:
+        return sum(estimate_tokens(self._content(e)) for e in self._window)
+
+    def _compact(self):
+        """
+        If over budget, fold the oldest exchanges into the summary: down to at most
+        keep_exchanges exchanges, and further until the verbatim history is within
+        compact_target of the budget -- even if that leaves no exchange verbatim.
+        """
+        sizes = [estimate_tokens(self._content(e)) for e in self._window]
+        remaining = sum(sizes)
+        if remaining <= self.budget_tokens:
+            return
+        target = self.budget_tokens * self.compact_target
+        drop = 0
+        # The window holds whole exchanges, so entries go in user + assistant pairs
+        while drop < len(sizes) and (len(sizes) - drop > 2 * self.keep_exchanges or remaining > target):
+            remaining -= sizes[drop] + sizes[drop + 1]
+            drop += 2
+        for entry in self._window[:drop]:
+            self._summary.extend(self._notes(entry))
+        self._summarized += drop
+        del self._window[:drop]
+
+        # The summary itself stays within a quarter of the budget
+        while len(self._summary) > 1 and estimate_tokens("\n".join(self._summary)) > self.budget_tokens // 4:
+            self._summary.pop(0)
+
+    def messages(self) -> list[dict]:
+        """
+        The messages to send for this agent's next turn: its history, then a user
+        message with everything said since it last spoke. The summary (if any)
+        leads the first verbatim user message.
+
+        Returns:
+            A new list in Claude message format.
+        """
+        self._sync()
+        pending = ("user", self._synced, len(self.turns), not self._spoken)
+        messages = [
+            {"role": entry[0], "content": self._content(entry)}
+            for entry in [*self._window, pending]
+        ]
+        if self._summary:
+            summary = "\n".join(f"- {line}" for line in self._summary)
+            messages[0]["content"] = (
+                f"EARLIER IN THIS CONVERSATION (summary):\n{summary}\n\n{messages[0]['content']}"
+            )
+        return messages
+
+    def stats(self) -> dict:
+        """
+        Token accounting for the next request.
+
+        Returns:
+            {"history_tokens": estimated tokens actually sent,
+             "full_history_tokens": estimated tokens without windowing,
+             "summarized_turns": messages folded into the summary so far}
+        """
+        messages = self.messages()
+        sent = sum(estimate_tokens(m["content"]) for m in messages)
+        return {
+            "history_tokens": sent,
+            "full_history_tokens": self._full_tokens + estimate_tokens(messages[-1]["content"]),
+            "summarized_turns": self._summarized,
+        }
@@ -0,0 +1,189 @@
+"""
+Investigation job queue.
+Live investigations run as jobs on a bounded pool of asyncio workers instead
+of inside the request that asked for them. Requests for something already
+queued or running (same key, e.g. the same publication) join that job instead
+of starting another generation, so concurrent clients share one set of API
+calls and never race each other writing the same demo files.
+"""
+import asyncio
+import os
+import time
+import uuid
+from typing import AsyncIterator, Awaitable, Callable
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Investigations that run at once; the rest wait in the queue
+INVESTIGATE_WORKERS = int(os.getenv("INVESTIGATE_WORKERS", "2"))
+# Seconds a finished job (and its event log) stays available for polling
+JOB_RETENTION = float(os.getenv("JOB_RETENTION", "3600"))
+
+TERMINAL_EVENTS = ("done", "error")
+
+
+class Job:
+    """One queued or running unit of work, with the events it has emitted so far."""
+
+    def __init__(self, key: str, params: dict):
+        self.id = uuid.uuid4().hex[:12]
+        self.key = key
+        self.params = params
+        self.status = "queued"  # queued -> running -> done | error
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.events: list[tuple[str, dict]] = []
+        self._subscribers: list[asyncio.Queue] = []
+
+    def emit(self, event: str, data: dict):
+        """Record an event and pass it to every subscriber."""
+        self.events.append((event, data))
+        for subscriber in self._subscribers:
+            subscriber.put_nowait((event, data))
+
+    async def subscribe(self) -> AsyncIterator[tuple[str, dict]]:
+        """
+        Yield the job's events from the start, then live ones, until it finishes.
+
+        Yields:
+            (event, data) tuples; the last one is ("done", result) or ("error", {...}).
+        """
+        subscriber: asyncio.Queue = asyncio.Queue()
+        backlog = list(self.events)
+        if not (backlog and backlog[-1][0] in TERMINAL_EVENTS):
+            self._subscribers.append(subscriber)
+        try:
+            for event, data in backlog:
+                yield event, data
+                if event in TERMINAL_EVENTS:
+                    return
+            while True:
+                event, data = await subscriber.get()
+                yield event, data
+                if event in TERMINAL_EVENTS:
+                    return
+        finally:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+    def public_params(self) -> dict:
+        """The job's plain (JSON-safe scalar) parameters, e.g. pub_id and run_id."""
+        return {k: v for k, v in self.params.items() if isinstance(v, (str, int, float, bool))}
+
+    def to_dict(self) -> dict:
+        """Status summary for the API (the result only once the job is done)."""
+        summary = {
+            "job_id": self.id,
+            "key": self.key,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            **self.public_params(),
+        }
+        if self.status == "done":
+            summary["result"] = self.result
+        if self.status == "error":
+            summary["error"] = self.error
+        return summary
+
+
+class JobQueue:
+    """
+    Bounded worker pool over an asyncio queue, with in-flight deduplication.
+
+    Args:
+        runner: Coroutine function called as runner(job) by a worker; it may call
+            job.emit() for progress and returns the job's result.
+        workers: Number of jobs run at once.
+        retention: Seconds finished jobs are kept for lookups.
+    """
+
+    def __init__(
+        self,
+        runner: Callable[[Job], Awaitable[dict]],
+        workers: int = INVESTIGATE_WORKERS,
+        retention: float = JOB_RETENTION,
+    ):
+        self.runner = runner
+        self.workers = max(1, workers)
+        self.retention = retention
+        self._queue: asyncio.Queue | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._jobs: dict[str, Job] = {}
+        self._in_flight: dict[str, Job] = {}  # key -> queued or running job
+
+    def start(self):
+        """Start the workers on the running event loop."""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._work(), name=f"job-worker-{i}") for i in range(self.workers)]
+
+    async def stop(self):
+        """Cancel the workers (running jobs are interrupted; persisted runs can resume them)."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, key: str, **params) -> tuple[Job, bool]:
+        """
+        Enqueue a job, or join the in-flight job with the same key.
+
+        Returns:
+            (job, created) -- created is False when an existing job was reused.
+        """
+        self._prune()
+        job = self._in_flight.get(key)
+        if job is not None:
+            return job, False
+
+        self.start()
+        job = Job(key, params)
+        self._jobs[job.id] = job
+        self._in_flight[key] = job
+        self._queue.put_nowait(job)
+        job.emit("queued", {"job_id": job.id, "position": self._queue.qsize()})
+        return job, True
+
+    def get(self, job_id: str) -> Job | None:
+        """Look up a job by id (finished jobs are kept for the retention period)."""
+        return self._jobs.get(job_id)
+
+    def stats(self) -> dict:
+        """{"queued", "running", "workers"} counts."""
+        running = sum(1 for job in self._in_flight.values() if job.status == "running")
+        return {"queued": len(self._in_flight) - running, "running": running, "workers": self.workers}
+
+    async def _work(self):
+        while True:
+            job = await self._queue.get()
+            job.status = "running"
+            job.started_at = time.time()
+            job.emit("started", {"job_id": job.id})
+            try:
+                job.result = await self.runner(job)
+                job.status = "done"
+            except Exception as e:
+                job.error = {"detail": str(e), "job_id": job.id, **job.public_params()}
+                job.status = "error"
+            finally:
+                job.finished_at = time.time()
+                self._in_flight.pop(job.key, None)
+                self._queue.task_done()
+            if job.status == "done":
+                job.emit("done", job.result)
+            else:
+                job.emit("error", job.error)
+
+    def _prune(self):
+        cutoff = time.time() - self.retention
+        for job_id, job in list(self._jobs.items()):
+            if job.finished_at is not None and job.finished_at < cutoff:
+                del self._jobs[job_id]
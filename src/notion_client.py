@@ -7,31 +7,50 @@ import os
 import httpx
 from dotenv import load_dotenv
 
+from src.rate_limits import get_limiter
+
 load_dotenv()
 
 NOTION_VERSION = "2022-06-28"
 
+# Block children are followed this many levels deep (toggles, nested bullets)
+MAX_BLOCK_DEPTH = 3
+
 _client = None
 
 
+def _headers() -> dict:
+    api_key = os.getenv("NOTION_API_KEY")
+    if not api_key:
+        raise ValueError("NOTION_API_KEY not set in .env")
+    return {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+        "Notion-Version": NOTION_VERSION,
+    }
+
+
 def _get_client() -> httpx.Client:
     """Get or create the HTTP client with Notion headers."""
     global _client
     if _client is None:
-        api_key = os.getenv("NOTION_API_KEY")
-        if not api_key:
-            raise ValueError("NOTION_API_KEY not set in .env")
-        _client = httpx.Client(
-            timeout=30.0,
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json",
-                "Notion-Version": NOTION_VERSION,
-            },
-        )
+        _client = httpx.Client(timeout=30.0, headers=_headers())
     return _client
 
 
+def _request(method: str, url: str, **kwargs) -> httpx.Response:
+    """Send a Notion API request through the shared rate limiter (NOTION_RPM)."""
+    with get_limiter("notion").slot():
+        return _get_client().request(method, url, **kwargs)
+
+
+def _database_id() -> str:
+    db_id = os.getenv("NOTION_DATABASE_ID")
+    if not db_id:
+        raise ValueError("NOTION_DATABASE_ID not set in .env")
+    return db_id
+
+
 def _extract_text(prop: dict) -> str:
     """Extract plain text from a Notion property value."""
     prop_type = prop.get("type", "")
@@ -49,32 +68,49 @@ def _extract_text(prop: dict) -> str:
         return ""
 
 
-def query_publications() -> list[dict]:
+def query_pages(edited_since: str | None = None) -> list[dict]:
     """
-    Query all publications from the Notion database.
+    Query every page in the Notion database, following pagination cursors.
+
+    Args:
+        edited_since: Optional ISO timestamp; only pages edited on or after it are returned.
 
     Returns:
-        List of publication dicts with flattened properties.
+        Raw Notion page objects.
     """
-    client = _get_client()
-    db_id = os.getenv("NOTION_DATABASE_ID")
-    if not db_id:
-        raise ValueError("NOTION_DATABASE_ID not set in .env")
+    body = {"page_size": 100}
+    if edited_since:
+        body["filter"] = {"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": edited_since}}
+
+    pages = []
+    while True:
+        r = _request("POST", f"https://api.notion.com/v1/databases/{_database_id()}/query", json=body)
+        if r.status_code != 200:
+            raise RuntimeError(f"Notion query failed: {r.status_code} {r.json().get('message', '')}")
+        data = r.json()
+        pages.extend(data.get("results", []))
+        if not data.get("has_more"):
+            return pages
+        body["start_cursor"] = data["next_cursor"]
+
+
+def flatten_page(page: dict) -> dict:
+    """Flatten a Notion page's properties into a publication dict (plus page_id)."""
+    pub = {}
+    for name, value in page.get("properties", {}).items():
+        pub[name] = _extract_text(value)
+    pub["page_id"] = page["id"]
+    return pub
 
-    r = client.post(f"https://api.notion.com/v1/databases/{db_id}/query", json={})
-    if r.status_code != 200:
-        raise RuntimeError(f"Notion query failed: {r.status_code} {r.json().get('message', '')}")
 
-    results = []
-    for page in r.json().get("results", []):
-        props = page.get("properties", {})
-        pub = {}
-        for name, value in props.items():
-            pub[name] = _extract_text(value)
-        pub["page_id"] = page["id"]
-        results.append(pub)
+def query_publications() -> list[dict]:
+    """
+    Query all publications from the Notion database.
 
-    return results
+    Returns:
+        List of publication dicts with flattened properties.
+    """
+    return [flatten_page(page) for page in query_pages()]
 
 
 def query_publication_by_name(name: str) -> dict | None:
@@ -87,9 +123,8 @@ def query_publication_by_name(name: str) -> dict | None:
     Returns:
         Publication dict or None if not found.
     """
-    pubs = query_publications()
     name_lower = name.lower()
-    for pub in pubs:
+    for pub in query_publications():
         if name_lower in pub.get("Publication", "").lower():
             return pub
     return None
@@ -99,57 +134,84 @@ def get_publication_details(page_id: str) -> dict:
     """
     Get full page content (blocks) for a publication.
 
+    Follows pagination and nested block children up to MAX_BLOCK_DEPTH.
+
     Args:
         page_id: The Notion page ID.
 
     Returns:
-        Dict with page properties and body content.
+        Dict with body content: {"blocks": [{"type", "text", "depth"}, ...]}.
     """
-    client = _get_client()
+    return {"blocks": _get_blocks(page_id, depth=0)}
 
-    # Get page blocks (body content)
-    r = client.get(f"https://api.notion.com/v1/blocks/{page_id}/children")
-    if r.status_code != 200:
-        return {"blocks": []}
 
+def _get_blocks(block_id: str, depth: int) -> list[dict]:
+    params = {"page_size": 100}
     blocks = []
-    for block in r.json().get("results", []):
-        block_type = block.get("type", "")
-        content = block.get(block_type, {})
-        texts = content.get("rich_text", [])
-        text = "".join(t.get("plain_text", "") for t in texts)
-        if text:
-            blocks.append({"type": block_type, "text": text})
 
-    return {"blocks": blocks}
+    while True:
+        r = _request("GET", f"https://api.notion.com/v1/blocks/{block_id}/children", params=params)
+        if r.status_code != 200:
+            return blocks
+        data = r.json()
 
+        for block in data.get("results", []):
+            block_type = block.get("type", "")
+            content = block.get(block_type, {})
+            texts = content.get("rich_text", [])
+            text = "".join(t.get("plain_text", "") for t in texts)
+            if text:
+                blocks.append({"type": block_type, "text": text, "depth": depth})
+            if block.get("has_children") and depth + 1 < MAX_BLOCK_DEPTH:
+                blocks.extend(_get_blocks(block["id"], depth + 1))
 
-def format_notion_context(pub_name: str) -> str:
+        if not data.get("has_more"):
+            return blocks
+        params["start_cursor"] = data["next_cursor"]
+
+
+def format_context(pub: dict, details: dict) -> str:
     """
-    Format Notion data for a publication into a context string for agents.
+    Render a Notion row plus its page blocks as agent context.
 
     Args:
-        pub_name: Publication name to look up.
+        pub: Flattened publication dict (from flatten_page).
+        details: {"blocks": [...]} from get_publication_details.
 
     Returns:
-        Formatted string with Notion data, or empty string if not found.
+        Formatted string with Notion data.
     """
-    pub = query_publication_by_name(pub_name)
-    if not pub:
-        return ""
-
     lines = ["DATA FROM NOTION DATABASE:"]
     for key, value in pub.items():
         if key == "page_id" or not value:
             continue
         lines.append(f"  {key}: {value}")
 
-    # Get detailed page content
-    details = get_publication_details(pub["page_id"])
+    # Detailed page content
     if details.get("blocks"):
         lines.append("\nDETAILED NOTES:")
         for block in details["blocks"]:
-            prefix = "  - " if block["type"] == "bulleted_list_item" else "  "
+            indent = "  " * (block.get("depth", 0) + 1)
+            prefix = f"{indent}- " if block["type"] == "bulleted_list_item" else indent
             lines.append(f"{prefix}{block['text']}")
 
     return "\n".join(lines)
+
+
+def format_notion_context(pub_name: str) -> str:
+    """
+    Format Notion data for a publication into a context string for agents.
+
+    Queries Notion live; the orchestrator uses the local snapshot in
+    src.notion_snapshot instead.
+
+    Args:
+        pub_name: Publication name to look up.
+
+    Returns:
+        Formatted string with Notion data, or empty string if not found.
+    """
+    pub = query_publication_by_name(pub_name)
+    if not pub:
+        return ""
+    return format_context(pub, get_publication_details(pub["page_id"]))
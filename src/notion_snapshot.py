@@ -0,0 +1,176 @@
+"""
+Local snapshot of the Notion ownership database.
+Pages through the whole database once, stores rows and page blocks on disk
+with a name/id index, and refreshes incrementally by last_edited_time.
+Lookups during a conversation are local -- no Notion round trips.
+
+Usage:
+    python -m src.notion_snapshot          # incremental refresh
+    python -m src.notion_snapshot --full   # rebuild from scratch (drops deleted pages)
+"""
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from src.notion_client import flatten_page, format_context, get_publication_details, query_pages
+
+load_dotenv()
+
+SNAPSHOT_PATH = os.getenv("NOTION_SNAPSHOT_PATH", ".cache/notion_snapshot.json")
+# Refresh (incrementally) when the snapshot is older than this many seconds
+MAX_AGE = int(os.getenv("NOTION_SNAPSHOT_MAX_AGE", "3600"))
+
+_lock = threading.Lock()
+_loaded = {"mtime": None, "snapshot": None, "by_name": {}}
+
+
+def _empty_snapshot() -> dict:
+    return {"refreshed_at": 0, "last_edited_time": None, "pages": {}}
+
+
+def _write_snapshot(snapshot: dict):
+    """Atomically replace the snapshot file."""
+    path = Path(SNAPSHOT_PATH)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(snapshot, f, indent=2)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def load_snapshot() -> dict:
+    """
+    Return the on-disk snapshot, re-reading it only if the file changed.
+
+    Returns:
+        {"refreshed_at": float, "last_edited_time": str | None,
+         "pages": {page_id: {"pub": dict, "blocks": list, "last_edited_time": str}}}
+    """
+    try:
+        mtime = os.stat(SNAPSHOT_PATH).st_mtime_ns
+    except FileNotFoundError:
+        return _empty_snapshot()
+
+    with _lock:
+        if _loaded["mtime"] != mtime:
+            with open(SNAPSHOT_PATH) as f:
+                snapshot = json.load(f)
+            _loaded.update({
+                "mtime": mtime,
+                "snapshot": snapshot,
+                "by_name": {
+                    page["pub"].get("Publication", "").lower(): page_id
+                    for page_id, page in snapshot["pages"].items()
+                },
+            })
+        return _loaded["snapshot"]
+
+
+def refresh_snapshot(full: bool = False) -> dict:
+    """
+    Update the snapshot from Notion.
+
+    An incremental refresh only asks for pages edited since the newest
+    last_edited_time already stored, and refetches blocks for those pages.
+    Notion's edit filter has minute granularity, so the boundary minute is
+    re-fetched rather than missed.
+
+    Args:
+        full: If True, rebuild from scratch (also drops pages deleted in Notion).
+
+    Returns:
+        The new snapshot.
+    """
+    snapshot = _empty_snapshot() if full else json.loads(json.dumps(load_snapshot()))
+    since = snapshot["last_edited_time"]
+
+    pages = query_pages(edited_since=since)
+    for page in pages:
+        snapshot["pages"][page["id"]] = {
+            "pub": flatten_page(page),
+            "blocks": get_publication_details(page["id"])["blocks"],
+            "last_edited_time": page.get("last_edited_time"),
+        }
+
+    edited = [p["last_edited_time"] for p in snapshot["pages"].values() if p.get("last_edited_time")]
+    snapshot["last_edited_time"] = max(edited) if edited else None
+    snapshot["refreshed_at"] = time.time()
+
+    _write_snapshot(snapshot)
+    print(f"  Notion snapshot: {len(pages)} page(s) updated, {len(snapshot['pages'])} total")
+    return snapshot
+
+
+def ensure_fresh(max_age: float = MAX_AGE) -> dict:
+    """
+    Return the snapshot, refreshing it first if it's missing or older than max_age.
+
+    A stale snapshot is still served if Notion can't be reached.
+    """
+    snapshot = load_snapshot()
+    if time.time() - snapshot["refreshed_at"] <= max_age:
+        return snapshot
+    try:
+        return refresh_snapshot()
+    except Exception as e:
+        if not snapshot["pages"]:
+            raise
+        print(f"  (Notion refresh failed, using snapshot from "
+              f"{datetime.fromtimestamp(snapshot['refreshed_at'], timezone.utc):%Y-%m-%d %H:%M} UTC: {e})")
+        return snapshot
+
+
+def find_publication(name: str) -> dict | None:
+    """
+    Find a publication in the snapshot by name.
+
+    Args:
+        name: Publication name (exact match first, then partial match).
+
+    Returns:
+        {"pub": dict, "blocks": list, "last_edited_time": str} or None.
+    """
+    snapshot = load_snapshot()
+    by_name = _loaded["by_name"]
+    name_lower = name.lower()
+
+    page_id = by_name.get(name_lower)
+    if page_id is None:
+        page_id = next((pid for pub_name, pid in by_name.items() if name_lower in pub_name), None)
+    return snapshot["pages"].get(page_id) if page_id else None
+
+
+def format_notion_context(pub_name: str, max_age: float | None = MAX_AGE) -> str:
+    """
+    Format Notion data for a publication from the local snapshot.
+
+    Args:
+        pub_name: Publication name to look up.
+        max_age: Refresh the snapshot first if it's older than this (seconds).
+            None = never touch Notion, use whatever is on disk.
+
+    Returns:
+        Formatted string with Notion data, or empty string if not found.
+    """
+    if max_age is not None:
+        ensure_fresh(max_age)
+    page = find_publication(pub_name)
+    if not page:
+        return ""
+    return format_context(page["pub"], {"blocks": page["blocks"]})
+
+
+if __name__ == "__main__":
+    refresh_snapshot(full="--full" in sys.argv[1:])
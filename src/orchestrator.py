@@ -1,157 +1,616 @@
 """
 Conversation orchestrator.
-Coordinates turn-taking between The Street Reporter and The Insider.
+Runs conversations between the agents in src/agents (by default The Street
+Reporter and The Insider). The transcript is stored once per conversation;
+each agent sees it through a lazily built, token-budgeted view, and a
+pluggable scheduler (src.schedulers) decides who speaks next.
 """
+import asyncio
 import json
 import os
+import queue
 import sys
-
-from src.agents.street_reporter import STREET_REPORTER_PROMPT
-from src.agents.insider import INSIDER_PROMPT
-from src.claude_client import get_agent_response
-from src.cartesia_client import generate_conversation_audio
-from src.notion_client import format_notion_context
+import tempfile
+import time
+from typing import Callable
+
+from dotenv import load_dotenv
+
+from src.agents import all_agents, get_agents
+from src.audio_track import TRACK_ENABLED, stitch_conversation
+from src.claude_client import aget_agent_response, astream_agent_response
+from src.cartesia_client import (
+    MAX_CONCURRENCY,
+    STREAM_TTS,
+    asynthesize_turn,
+    get_cache_stats,
+    synthesize_turn_from_deltas,
+)
+from src.comparison import abuild_comparison_briefing, comparison_publication
+from src.context_bundles import get_bundle
+from src.history import TranscriptView
+from src.publications import get_dataset, get_publication, publication_version
+from src.schedulers import get_scheduler
+from src import run_state
+
+load_dotenv()
+
+# Speculative opening: while the opener's turn is generated, the other agents prepare in parallel
+SPECULATIVE_OPENING = os.getenv("CONVERSATION_SPECULATIVE", "0").lower() in ("1", "true", "yes")
+# Max length of each agent's groundwork notes
+GROUNDWORK_MAX_TOKENS = int(os.getenv("CONVERSATION_GROUNDWORK_MAX_TOKENS", "150"))
+
+GROUNDWORK_PROMPT = (
+    "We're about to discuss the ownership of {name}, and someone else opens. Before they do, "
+    "jot down the two or three points from the briefing you'll most want to bring in, as short notes. "
+    "No full sentences, no intro."
+)
 
 
 def load_publications() -> dict:
-    """Load publications dataset."""
-    data_path = os.path.join(os.path.dirname(__file__), "..", "data", "publications.json")
-    with open(data_path) as f:
-        return json.load(f)
+    """Load publications dataset (served from the in-memory registry)."""
+    return get_dataset()
+
+
+async def agenerate_turn(
+    system_prompt: str,
+    history: TranscriptView,
+    context: str,
+    use_web_search: bool,
+    on_delta: Callable[[str], None] | None = None,
+    use_cache: bool = True,
+) -> tuple[str, dict | None]:
+    """
+    Get one agent response, streaming text deltas to on_delta if given.
+
+    Returns:
+        (text, usage) -- usage is None when the response came from the response cache;
+        otherwise it also carries the history token stats for the request.
+    """
+    messages = history.messages()
+    stats = history.stats()
+    print(
+        f"  (history: {stats['history_tokens']} tokens sent, {stats['full_history_tokens']} unwindowed, "
+        f"{stats['summarized_turns']} turns summarized)"
+    )
 
+    usage = {}
+    kwargs = {
+        "use_web_search": use_web_search,
+        "use_cache": use_cache,
+        "context": context,
+        "on_usage": usage.update,
+    }
 
-def format_publication_context(pub: dict) -> str:
-    """Format a publication's data into a context string for the agents."""
-    rating = pub.get("ground_news_rating", {})
-    angles = pub.get("voice_agent_angles", {})
+    if on_delta is None:
+        text = await aget_agent_response(system_prompt, messages, **kwargs)
+    else:
+        parts = []
+        async for delta in astream_agent_response(system_prompt, messages, **kwargs):
+            parts.append(delta)
+            on_delta(delta)
+        text = "".join(parts)
+
+    if usage:
+        print(
+            f"  (tokens: {usage['input_tokens']} in, {usage['cache_read_input_tokens']} cache read, "
+            f"{usage['cache_creation_input_tokens']} cache write, {usage['output_tokens']} out)"
+        )
+        usage.update(stats)
+    return text, usage or None
+
+
+def build_briefing(pub: dict, use_web_search: bool = False) -> str:
+    """
+    Shared background both agents see.
+
+    It's sent right after each agent's system prompt (not inside the messages),
+    so that prefix is prompt-cached and reused on every turn instead of being
+    re-processed. Built from the precomputed context bundle, which is only
+    rebuilt when its sources change.
+    """
+    bundle = get_bundle(pub)
+    print(f"  Context bundle {bundle['hash'][:12]} (~{bundle['tokens']} tokens)")
 
-    conflicts = "\n".join(f"  - {c}" for c in pub.get("conflicts_of_interest", []))
-    controversies = "\n".join(f"  - {c}" for c in pub.get("recent_controversies", []))
+    web_search_note = (
+        "\n\nYou have access to web search. Use it to find the latest ownership "
+        "developments if the data above seems outdated or if you want to verify facts."
+        if use_web_search else ""
+    )
+    return f"BRIEFING -- WHAT WE KNOW:\n\n{bundle['text']}{web_search_note}"
 
-    context = f"""PUBLICATION: {pub['name']}
-OWNER: {pub['owner']}
-OWNERSHIP STRUCTURE: {pub.get('ownership_structure', 'Unknown')}
-YEAR ACQUIRED: {pub.get('year_acquired', 'Unknown')}
-PURCHASE PRICE: {pub.get('purchase_price', 'N/A')}
-PARENT COMPANY: {pub.get('parent_company', 'N/A')}
-CONTROLLING FAMILY: {pub.get('controlling_family', 'N/A')}
-KEY FIGURE: {pub.get('key_figure', 'N/A')}
-CURRENT STATUS: {pub.get('current_status', 'Unknown')}
 
-GROUND NEWS RATINGS:
-  Bias: {rating.get('bias', 'Unknown')}
-  Factuality: {rating.get('factuality', 'Unknown')}
-  Ownership Category: {rating.get('ownership_category', 'Unknown')}
+def new_conversation(
+    pub: dict,
+    briefing: str,
+    agents: list[str] | None = None,
+    scheduler: str | None = None,
+) -> dict:
+    """
+    Start an empty conversation state, advanced with aprepare_turn / record_turn.
 
-CONFLICTS OF INTEREST:
-{conflicts}
+    The transcript ("turns") is the only copy of the conversation. Each agent
+    sees it through its own TranscriptView, created the first time it speaks:
+    its own turns as assistant messages and everything said in between as one
+    user message. Older exchanges are folded into a rolling summary once over
+    the token budget.
 
-RECENT CONTROVERSIES:
-{controversies}
+    Args:
+        pub: Publication data dict (or a comparison group).
+        briefing: Shared background, sent as every agent's cached context.
+        agents: Agent names taking part (default: see src.agents.get_agents).
+        scheduler: Scheduler name (default: see src.schedulers.get_scheduler).
+    """
+    return {
+        "pub": pub,
+        "briefing": briefing,
+        "turns": [],
+        "agents": get_agents(agents),
+        "scheduler": get_scheduler(scheduler),
+        "views": {},
+        "prepared": None,
+        "groundwork": {},  # agent name -> notes drafted before its first turn (speculative mode)
+    }
+
+
+def _render_prompt(state: dict, agent: dict, start: int, end: int, first: bool) -> str:
+    """The user message asking agent to answer turns[start:end] (see TranscriptView)."""
+    turns = state["turns"][start:end]
+    pub = state["pub"]
+    if not turns and start == 0:
+        if "members" in pub:
+            # First turn of a comparison: the opener lays out every owner
+            names = ", ".join(p["name"] for p in pub["members"])
+            return (
+                f"Let's compare the ownership of {names}. "
+                f"Start by breaking down who really owns each of them and where their owners' interests overlap."
+            )
+        # First turn: the opener starts the investigation
+        return (
+            f"Let's discuss the ownership of {pub['name']}. "
+            f"Start by breaking down who really owns this publication and what that means."
+        )
+    if not turns:
+        return "Keep going -- what else should listeners know?"
+
+    # Everything said since the agent last spoke, each turn quoted with its speaker
+    registry = all_agents()
+    quoted = "\n\n".join(
+        f"{registry[t['agent']]['title'] if t['agent'] in registry else t['agent']} just said: \"{t['text']}\""
+        for t in turns
+    )
+    intro = f"We're discussing the ownership of {pub['name']}. " if first else ""
+    notes = state["groundwork"].get(agent["agent"]) if first else None
+    prep = f"Your notes from before the show (use what fits):\n{notes}\n\n" if notes else ""
+    return f"{intro}{quoted}\n\n{prep}{agent['first_reply' if first else 'reply']}"
 
-SUGGESTED ANGLES:
-  Street Reporter: {angles.get('street_reporter', '')}
-  Insider: {angles.get('insider', '')}"""
 
-    return context
+def _view(state: dict, agent: dict) -> TranscriptView:
+    """An agent's view of the transcript, created on first use."""
+    name = agent["agent"]
+    if name not in state["views"]:
+        state["views"][name] = TranscriptView(
+            state["turns"], name, lambda start, end, first: _render_prompt(state, agent, start, end, first),
+        )
+    return state["views"][name]
 
 
-def run_conversation(pub: dict, num_exchanges: int = 4, use_web_search: bool = False) -> list[dict]:
+async def aprepare_turn(state: dict) -> tuple[dict, TranscriptView]:
     """
-    Run a conversation between the two agents about a publication.
+    Pick the next speaker with the conversation's scheduler.
 
-    Args:
-        pub: Publication data dict.
-        num_exchanges: Number of back-and-forth exchanges (each = 2 turns).
-        use_web_search: If True, enable Claude web_search for real-time data.
+    Safe to call again if the turn failed: the speaker is only picked once per turn.
+
+    Returns:
+        (speaker, view) -- the agent (see src.agents) and its view of the transcript to send.
+    """
+    index = len(state["turns"])
+    if state["prepared"] is None or state["prepared"][0] != index:
+        speaker = await state["scheduler"].next_speaker(state)
+        state["prepared"] = (index, speaker)
+    speaker = state["prepared"][1]
+    return speaker, _view(state, speaker)
+
+
+def record_turn(state: dict, agent: str, text: str, usage: dict | None = None) -> dict:
+    """Append a finished turn to the conversation state and return it."""
+    turn = {"agent": agent, "text": text, "usage": usage}
+    state["turns"].append(turn)
+    return turn
+
+
+def restore_conversation(
+    pub: dict,
+    briefing: str,
+    turns: list[dict],
+    agents: list[str] | None = None,
+    scheduler: str | None = None,
+) -> dict:
+    """Rebuild a conversation state from previously completed turns (views catch up lazily)."""
+    state = new_conversation(pub, briefing, agents, scheduler)
+    for turn in turns:
+        record_turn(state, turn["agent"], turn["text"], turn.get("usage"))
+    return state
+
+
+def _start_groundwork(state: dict, opener: str, use_cache: bool) -> dict:
+    """
+    Speculatively prepare every agent but the opener for its first turn.
+
+    Each agent drafts short notes from the briefing alone, concurrently with the
+    opening turn. Web search stays off, so the calls are cheap and quick enough
+    to finish before the opening turn does.
 
     Returns:
-        List of conversation turns: [{"agent": str, "text": str}, ...]
+        Agent name -> task resolving to its notes.
     """
-    context = format_publication_context(pub)
+    prompt = GROUNDWORK_PROMPT.format(name=state["pub"]["name"])
+    return {
+        agent["agent"]: asyncio.create_task(aget_agent_response(
+            agent["prompt"],
+            [{"role": "user", "content": prompt}],
+            max_tokens=GROUNDWORK_MAX_TOKENS,
+            use_cache=use_cache,
+            context=state["briefing"],
+        ))
+        for agent in state["agents"]
+        if agent["agent"] != opener
+    }
+
+
+def _settle_groundwork(state: dict, groundwork: dict, agent: str):
+    """
+    Reconcile an agent's speculative groundwork just before its first turn.
+
+    Notes that are ready join its first prompt; notes still being drafted are
+    dropped rather than waited for, so speculation never delays a turn.
+    """
+    task = groundwork.pop(agent, None)
+    if task is None:
+        return
+    if not task.done():
+        task.cancel()
+        print(f"  (Groundwork for {agent} not ready, skipped)")
+    elif task.exception() is not None:
+        print(f"  (Groundwork for {agent} failed: {task.exception()})")
+    elif task.result().strip():
+        state["groundwork"][agent] = task.result().strip()
+
+
+def open_conversation_run(run_id: str, pub: dict, num_exchanges: int, use_web_search: bool) -> dict:
+    """Resume or start the persisted run for a conversation (see src.run_state)."""
+    # Turns depend on who takes part and who picks the speakers, so a run resumes only with the same ones
+    settings = {
+        "num_exchanges": num_exchanges,
+        "use_web_search": use_web_search,
+        "agents": [a["agent"] for a in get_agents()],
+        "scheduler": get_scheduler().name,
+    }
+    return run_state.open_run(run_id, pub["id"], settings)
+
+
+async def _arun_conversation(
+    pub: dict,
+    num_exchanges: int,
+    use_web_search: bool,
+    on_turn: Callable[[int, dict], None] | None,
+    on_delta: Callable[[int, str, str], None] | None,
+    use_cache: bool,
+    run: dict | None,
+    speculative: bool = False,
+) -> list[dict]:
+    """arun_conversation on an already opened run (or None to persist nothing)."""
+    def deltas_for(index: int, agent: str):
+        if on_delta is None:
+            return None
+        return lambda delta: on_delta(index, agent, delta)
+
+    if "members" in pub:
+        # Comparison: members are researched up front, in parallel, so turns skip web search
+        briefing = await abuild_comparison_briefing(pub, use_web_search, use_cache)
+        use_web_search = False
+    else:
+        briefing = await asyncio.to_thread(build_briefing, pub, use_web_search)
+    state = restore_conversation(pub, briefing, run["turns"] if run else [])
+
+    # Completed turns from an earlier attempt are replayed to on_turn, not regenerated
+    for index, turn in enumerate(state["turns"]):
+        if on_turn:
+            on_turn(index, turn)
+
+    # Only a fresh conversation speculates; a resumed one is already past its opening
+    groundwork = {}
+    if speculative and not state["turns"]:
+        opener, _ = await aprepare_turn(state)
+        groundwork = _start_groundwork(state, opener["agent"], use_cache)
 
-    # Try to enrich with Notion data
     try:
-        notion_context = format_notion_context(pub["name"])
-        if notion_context:
-            context += f"\n\n{notion_context}"
-    except Exception as e:
-        print(f"  (Notion lookup skipped: {e})")
+        while len(state["turns"]) < num_exchanges * len(state["agents"]):
+            speaker, history = await aprepare_turn(state)
+            _settle_groundwork(state, groundwork, speaker["agent"])
+            index = len(state["turns"])
+            text, usage = await agenerate_turn(
+                speaker["prompt"], history, briefing, use_web_search,
+                deltas_for(index, speaker["agent"]), use_cache,
+            )
+            turn = record_turn(state, speaker["agent"], text, usage)
+            if run:
+                run_state.record_turn(run, index, turn)
+
+            print(f"\n{speaker['label']}:\n{text}")
+            if on_turn:
+                on_turn(index, turn)
+    finally:
+        # Groundwork for agents that never got to speak
+        for task in groundwork.values():
+            task.cancel()
+
+    return state["turns"]
+
+
+async def arun_conversation(
+    pub: dict,
+    num_exchanges: int = 4,
+    use_web_search: bool = False,
+    on_turn: Callable[[int, dict], None] | None = None,
+    on_delta: Callable[[int, str, str], None] | None = None,
+    use_cache: bool = True,
+    run_id: str | None = None,
+    speculative: bool = SPECULATIVE_OPENING,
+) -> list[dict]:
+    """
+    Run a conversation between the agents (see src.agents) about a publication.
 
-    conversation_log = []
+    Async-native: Claude and Notion calls run on their async clients, so many
+    investigations can share one event loop.
 
-    # Build the opening prompt that both agents will see
-    web_search_note = (
-        "\n\nYou have access to web search. Use it to find the latest ownership "
-        "developments if the data above seems outdated or if you want to verify facts."
-        if use_web_search else ""
-    )
+    Args:
+        pub: Publication data dict, or a group from comparison_publication to compare
+            several publications in one conversation.
+        num_exchanges: Number of rounds (each = one turn per agent).
+        use_web_search: If True, enable Claude web_search for real-time data (for a
+            comparison: research every publication in parallel before the first turn).
+        on_turn: Optional callback, called with (index, turn) as soon as each
+            turn is finished -- before the next turn is generated.
+        on_delta: Optional callback, called with (index, agent, text_delta) while a
+            turn is still being generated. Switches Claude calls to streaming.
+        use_cache: If False, bypass the Claude response cache for every turn.
+        run_id: Optional run id. Each completed turn is persisted under it, and
+            calling again with the same id resumes after the last completed turn.
+        speculative: If True, the other agents draft groundwork notes from the
+            briefing (without web search) while the opening turn is generated;
+            notes ready in time join their first prompts.
 
-    opening = (
-        f"Let's discuss the ownership of {pub['name']}. "
-        f"Here's what we know:\n\n{context}\n\n"
-        f"Start by breaking down who really owns this publication and what that means."
-        f"{web_search_note}"
+    Returns:
+        List of conversation turns: [{"agent": str, "text": str, "usage": dict | None}, ...]
+        where usage holds the turn's token counts, including prompt cache reads/writes.
+    """
+    run = open_conversation_run(run_id, pub, num_exchanges, use_web_search) if run_id else None
+    return await _arun_conversation(
+        pub, num_exchanges, use_web_search, on_turn, on_delta, use_cache, run, speculative,
     )
 
-    # Track messages for each agent's perspective
-    # Street Reporter sees: user prompts + their own responses + Insider's responses
-    # Insider sees: the same conversation but from their perspective
-    reporter_messages = []
-    insider_messages = []
-
-    for i in range(num_exchanges):
-        # --- Street Reporter's turn ---
-        if i == 0:
-            # First turn: Reporter opens with the investigation
-            reporter_messages.append({"role": "user", "content": opening})
-        else:
-            # Subsequent turns: Reporter responds to Insider's last comment
-            reporter_messages.append({
-                "role": "user",
-                "content": f"The Insider just said: \"{conversation_log[-1]['text']}\"\n\nRespond to that and dig deeper.",
-            })
-
-        reporter_response = get_agent_response(STREET_REPORTER_PROMPT, reporter_messages, use_web_search=use_web_search)
-        reporter_messages.append({"role": "assistant", "content": reporter_response})
-
-        conversation_log.append({
-            "agent": "Street Reporter",
-            "text": reporter_response,
-        })
 
-        print(f"\n🎤 STREET REPORTER:\n{reporter_response}")
-
-        # --- Insider's turn ---
-        if i == 0:
-            # First turn: Insider reacts to Reporter's opening
-            insider_messages.append({
-                "role": "user",
-                "content": (
-                    f"We're discussing the ownership of {pub['name']}. "
-                    f"Here's the background:\n\n{context}\n\n"
-                    f"The Street Reporter just said: \"{reporter_response}\"\n\n"
-                    f"React to that with your insider perspective."
-                ),
-            })
+def run_conversation(
+    pub: dict,
+    num_exchanges: int = 4,
+    use_web_search: bool = False,
+    on_turn: Callable[[int, dict], None] | None = None,
+    on_delta: Callable[[int, str, str], None] | None = None,
+    use_cache: bool = True,
+    run_id: str | None = None,
+    speculative: bool = SPECULATIVE_OPENING,
+) -> list[dict]:
+    """Blocking wrapper around arun_conversation, for scripts and the CLI."""
+    return asyncio.run(arun_conversation(
+        pub,
+        num_exchanges=num_exchanges,
+        use_web_search=use_web_search,
+        on_turn=on_turn,
+        on_delta=on_delta,
+        use_cache=use_cache,
+        run_id=run_id,
+        speculative=speculative,
+    ))
+
+
+async def arun_conversation_with_audio(
+    pub: dict,
+    num_exchanges: int = 4,
+    use_web_search: bool = False,
+    output_dir: str = "audio_output",
+    on_event: Callable[[str, dict], None] | None = None,
+    stream_audio: bool = STREAM_TTS,
+    use_cache: bool = True,
+    run_id: str | None = None,
+    speculative: bool = SPECULATIVE_OPENING,
+) -> list[dict]:
+    """
+    Run a conversation and synthesize audio while it is being generated.
+
+    Each finished turn is handed to a TTS task right away, so
+    Cartesia works on turn N while Claude generates turn N+1. Total time
+    is roughly max(LLM time, TTS time) instead of their sum. With
+    stream_audio, synthesis starts on a turn's first sentence while Claude
+    is still writing the rest of it.
+
+    Args:
+        pub: Publication data dict, or a comparison group (see arun_conversation).
+        num_exchanges: Number of rounds (each = one turn per agent).
+        use_web_search: If True, enable Claude web_search for real-time data.
+        output_dir: Directory to save audio files.
+        on_event: Optional callback for progress, called on the event loop with
+            ("delta", {index, agent, text}) while a turn streams in, ("turn", {index, agent, text})
+            when its text is complete and ("audio", {index, agent, audio_path}) when its
+            audio file is written.
+        stream_audio: If True, feed Claude's text deltas straight into sentence-chunked
+            WebSocket synthesis.
+        use_cache: If False, bypass the Claude response cache for every turn.
+        run_id: Optional run id. Completed turns and audio files are persisted under
+            it, and calling again with the same id only redoes the missing steps.
+        speculative: If True, the other agents draft groundwork notes during the
+            opening turn (see arun_conversation).
+
+    Returns:
+        List of {"agent": str, "text": str, "audio_path": str} dicts, in turn order.
+    """
+    run = open_conversation_run(run_id, pub, num_exchanges, use_web_search) if run_id else None
+    tasks = {}
+    feeds = {}  # turn index -> queue of text deltas, for turns already being voiced
+    finished = set()  # turn indexes whose text is complete
+    semaphore = asyncio.Semaphore(max(1, MAX_CONCURRENCY))
+
+    async def bounded(synthesize_fn, *args) -> dict:
+        async with semaphore:
+            return await synthesize_fn(*args)
+
+    def audio_done(index: int, task: asyncio.Task):
+        if not task.cancelled() and not task.exception():
+            result = task.result()
+            if run:
+                run_state.record_audio(run, index, result["audio_path"], result["text"])
+            if on_event:
+                on_event("audio", {"index": index, "agent": result["agent"], "audio_path": result["audio_path"]})
+
+    def track(index: int, task: asyncio.Task):
+        task.add_done_callback(lambda t: audio_done(index, t))
+        tasks[index] = task
+
+    def delta(index: int, agent: str, text: str):
+        if on_event:
+            on_event("delta", {"index": index, "agent": agent, "text": text})
+        if stream_audio:
+            if index not in feeds:
+                # The WebSocket path is blocking, so it consumes deltas in a worker thread
+                feeds[index] = queue.Queue()
+                deltas = iter(feeds[index].get, None)
+                track(index, asyncio.create_task(bounded(
+                    asyncio.to_thread, synthesize_turn_from_deltas, index, agent, deltas, output_dir,
+                )))
+            feeds[index].put(text)
+
+    def synthesize(index: int, turn: dict):
+        finished.add(index)
+        if on_event:
+            on_event("turn", {"index": index, "agent": turn["agent"], "text": turn["text"]})
+        if index in feeds:
+            feeds[index].put(None)  # end of turn
+        elif run and run_state.completed_audio(run, index):
+            # Voiced by an earlier attempt of this run
+            done = asyncio.get_running_loop().create_future()
+            done.set_result({"agent": turn["agent"], "text": turn["text"], "audio_path": run["audio"][str(index)]})
+            track(index, done)
+            return
         else:
-            # Subsequent turns: Insider responds to Reporter's latest
-            insider_messages.append({
-                "role": "user",
-                "content": f"The Street Reporter just said: \"{reporter_response}\"\n\nRespond with your insider take.",
-            })
-
-        insider_response = get_agent_response(INSIDER_PROMPT, insider_messages, use_web_search=use_web_search)
-        insider_messages.append({"role": "assistant", "content": insider_response})
-
-        conversation_log.append({
-            "agent": "Insider",
-            "text": insider_response,
+            track(index, asyncio.create_task(bounded(asynthesize_turn, index, turn, output_dir)))
+        print(f"  Queued audio for turn {index + 1}: {turn['agent']}")
+
+    try:
+        await _arun_conversation(
+            pub,
+            num_exchanges,
+            use_web_search,
+            on_turn=synthesize,
+            on_delta=delta if (on_event or stream_audio) else None,
+            use_cache=use_cache,
+            run=run,
+            speculative=speculative,
+        )
+    except (asyncio.CancelledError, KeyboardInterrupt):
+        for task in tasks.values():
+            task.cancel()
+        raise
+    except Exception:
+        # A later turn failed: let the finished turns' audio complete, so it is
+        # recorded and a resumed run doesn't synthesize it again
+        for index, task in tasks.items():
+            if index not in finished:
+                task.cancel()
+        for feed in feeds.values():
+            feed.put(None)
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        raise
+    finally:
+        # Never leave a TTS worker waiting on a turn that won't finish
+        for feed in feeds.values():
+            feed.put(None)
+
+    # Re-raises any TTS failure
+    return list(await asyncio.gather(*(tasks[i] for i in sorted(tasks))))
+
+
+def run_conversation_with_audio(
+    pub: dict,
+    num_exchanges: int = 4,
+    use_web_search: bool = False,
+    output_dir: str = "audio_output",
+    on_event: Callable[[str, dict], None] | None = None,
+    stream_audio: bool = STREAM_TTS,
+    use_cache: bool = True,
+    run_id: str | None = None,
+    speculative: bool = SPECULATIVE_OPENING,
+) -> list[dict]:
+    """Blocking wrapper around arun_conversation_with_audio, for scripts and the CLI."""
+    return asyncio.run(arun_conversation_with_audio(
+        pub,
+        num_exchanges=num_exchanges,
+        use_web_search=use_web_search,
+        output_dir=output_dir,
+        on_event=on_event,
+        stream_audio=stream_audio,
+        use_cache=use_cache,
+        run_id=run_id,
+        speculative=speculative,
+    ))
+
+
+def save_demo(pub: dict, results: list[dict], demo_dir: str = "demo", stitch: bool = TRACK_ENABLED) -> dict:
+    """
+    Save a finished conversation as the publication's demo.
+
+    Args:
+        pub: Publication data dict.
+        results: Turns as {"agent", "text", "audio_path"} dicts; audio_path may be missing.
+        demo_dir: Directory for {pub_id}_conversation.json.
+        stitch: If True and every turn has audio, also write the single-file track
+            (conversation.<ext> next to the turn files) and its timing manifest.
+
+    Returns:
+        The saved {"publication", "owner", "generated_at", "pub_version", "turns"} dict,
+        plus "track" (see audio_track.stitch_conversation) when a track was written.
+        The file is replaced atomically, so readers see the old demo or the new one.
+    """
+    turns = []
+    for r in results:
+        turns.append({
+            "agent": r["agent"],
+            "text": r["text"],
+            "audio_path": r.get("audio_path"),
         })
 
-        print(f"\n🎭 INSIDER:\n{insider_response}")
+    output = {
+        "publication": pub["name"],
+        "owner": pub["owner"],
+        "generated_at": time.time(),
+        "pub_version": publication_version(pub),
+        "turns": turns,
+    }
+    if stitch and turns and all(t["audio_path"] for t in turns):
+        audio_dir = os.path.dirname(turns[0]["audio_path"])
+        track = stitch_conversation(turns, f"{audio_dir}/conversation")
+        if track:
+            output["track"] = track
+    fd, tmp = tempfile.mkstemp(dir=demo_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(output, f, indent=2)
+        os.replace(tmp, f"{demo_dir}/{pub['id']}_conversation.json")
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
 
-    return conversation_log
+    return output
 
 
 def select_publication(publications: list[dict]) -> dict:
@@ -187,6 +646,8 @@ def main(pub_id: str | None = None, with_audio: bool = False):
     # Check for command-line argument or passed pub_id (for non-interactive mode)
     cli_args = sys.argv[1:]
     use_web_search = False
+    use_cache = True
+    speculative = SPECULATIVE_OPENING
 
     if "--audio" in cli_args:
         with_audio = True
@@ -194,10 +655,36 @@ def main(pub_id: str | None = None, with_audio: bool = False):
     if "--web-search" in cli_args:
         use_web_search = True
         cli_args.remove("--web-search")
+    if "--no-cache" in cli_args:
+        use_cache = False
+        cli_args.remove("--no-cache")
+    if "--speculative" in cli_args:
+        speculative = True
+        cli_args.remove("--speculative")
+    # --compare a b c: one conversation about several publications
+    compare = "--compare" in cli_args
+    if compare:
+        cli_args.remove("--compare")
+    # --resume <run id> continues a failed run; otherwise every run gets a new id
+    run_id = None
+    if "--resume" in cli_args:
+        i = cli_args.index("--resume")
+        run_id = cli_args[i + 1] if i + 1 < len(cli_args) else None
+        del cli_args[i:i + 2]
+        if not run_id:
+            print("--resume needs a run id")
+            sys.exit(1)
 
     pub_id = pub_id or (cli_args[0].lower() if cli_args else None)
-    if pub_id:
-        pub = next((p for p in publications if p["id"] == pub_id), None)
+    if compare:
+        try:
+            pub = comparison_publication(cli_args)
+        except ValueError as e:
+            print(e)
+            print(f"Available: {', '.join(p['id'] for p in publications)}")
+            sys.exit(1)
+    elif pub_id:
+        pub = get_publication(pub_id)
         if not pub:
             print(f"Unknown publication ID: {pub_id}")
             print(f"Available: {', '.join(p['id'] for p in publications)}")
@@ -209,8 +696,9 @@ def main(pub_id: str | None = None, with_audio: bool = False):
     print(f"  Investigating: {pub['name']}")
     print(f"  Owner: {pub['owner']}")
     rating = pub.get("ground_news_rating", {})
-    print(f"  Ground News Bias Rating: {rating.get('bias', 'Unknown')}")
-    print(f"  Ground News Factuality: {rating.get('factuality', 'Unknown')}")
+    if rating:
+        print(f"  Ground News Bias Rating: {rating.get('bias', 'Unknown')}")
+        print(f"  Ground News Factuality: {rating.get('factuality', 'Unknown')}")
     print(f"{'=' * 60}")
 
     num_exchanges = 4
@@ -219,22 +707,42 @@ def main(pub_id: str | None = None, with_audio: bool = False):
     if use_web_search:
         print("  Web search: ENABLED")
 
-    conversation = run_conversation(pub, num_exchanges=num_exchanges, use_web_search=use_web_search)
+    run_id = run_id or run_state.new_run_id()
+    print(f"  Run id: {run_id} (resume with --resume {run_id})")
 
-    print(f"\n{'=' * 60}")
-    print(f"  Conversation complete: {len(conversation)} turns")
-    print(f"{'=' * 60}")
-
-    # Generate audio if requested
+    # Generate audio if requested, pipelined with the conversation itself
     if with_audio:
-        print(f"\n  Generating audio for {len(conversation)} turns...")
         output_dir = f"audio_output/{pub['id']}"
-        results = generate_conversation_audio(conversation, output_dir=output_dir)
+        results = run_conversation_with_audio(
+            pub,
+            num_exchanges=num_exchanges,
+            use_web_search=use_web_search,
+            output_dir=output_dir,
+            use_cache=use_cache,
+            run_id=run_id,
+            speculative=speculative,
+        )
+        print(f"\n{'=' * 60}")
+        print(f"  Conversation complete: {len(results)} turns")
+        print(f"{'=' * 60}")
         print(f"\n  Audio saved to {output_dir}/")
         for r in results:
             print(f"    {r['audio_path']}")
+        stats = get_cache_stats()
+        print(f"  Audio cache: {stats['hits']} hits / {stats['misses']} misses")
+        run_state.delete_run(run_id)
         return results
 
+    conversation = run_conversation(
+        pub, num_exchanges=num_exchanges, use_web_search=use_web_search, use_cache=use_cache, run_id=run_id,
+        speculative=speculative,
+    )
+
+    print(f"\n{'=' * 60}")
+    print(f"  Conversation complete: {len(conversation)} turns")
+    print(f"{'=' * 60}")
+
+    run_state.delete_run(run_id)
     return conversation
 
 
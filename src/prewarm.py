@@ -0,0 +1,196 @@
+"""
+Demo prewarming and refresh.
+Keeps a prebuilt demo for every publication: missing demos are generated at
+startup, and demos are regenerated when their publication's data changes or
+(optionally) once they reach DEMO_MAX_AGE. Each generation writes its audio
+to a new directory and then replaces the demo JSON atomically, so visitors
+always get a complete demo -- the old one until the new one is ready.
+
+In the server, run_scheduler() feeds stale publications into the
+investigation job queue. It can also be run by hand:
+
+Usage:
+    python -m src.prewarm             # regenerate every missing or stale demo (rerun to finish after a failure)
+    python -m src.prewarm --check     # only report freshness
+    python -m src.prewarm nyt wsj     # only these publications
+"""
+import asyncio
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+from dotenv import load_dotenv
+
+from src import run_state
+from src.assets import DEMO_DIR, get_demo
+from src.publications import get_dataset, get_publication, publication_version
+
+load_dotenv()
+
+# Generate missing and stale demos in the background while the server runs
+PREWARM_ENABLED = os.getenv("DEMO_PREWARM", "1").lower() in ("1", "true", "yes")
+# Regenerate demos older than this many seconds (0 = only when missing or the publication changed)
+DEMO_MAX_AGE = float(os.getenv("DEMO_MAX_AGE", "0"))
+# How often the scheduler looks for stale demos, and how long it waits before retrying a failed one
+CHECK_INTERVAL = float(os.getenv("DEMO_CHECK_INTERVAL", "60"))
+RETRY_INTERVAL = float(os.getenv("DEMO_RETRY_INTERVAL", "3600"))
+# Superseded audio directories are kept this long for visitors still playing the old demo
+AUDIO_GRACE_PERIOD = float(os.getenv("DEMO_AUDIO_GRACE", "3600"))
+
+_attempts = {}  # pub_id -> time the scheduler last queued it
+
+
+def demo_freshness(pub: dict, demo: dict | None = None) -> dict:
+    """
+    Report how current a publication's demo is.
+
+    Args:
+        pub: Publication data dict.
+        demo: The demo snapshot from assets.get_demo (looked up if not given).
+
+    Returns:
+        {"generated_at", "age", "stale", "reason"} -- reason is "missing",
+        "publication changed", "expired" or None; times are in seconds.
+    """
+    demo = demo or get_demo(pub["id"])
+    if demo is None:
+        return {"generated_at": None, "age": None, "stale": True, "reason": "missing"}
+
+    # Demos saved before generated_at existed fall back to the file's mtime
+    generated_at = demo["data"].get("generated_at") or demo["mtime"] / 1e9
+    age = time.time() - generated_at
+    reason = None
+    saved_version = demo["data"].get("pub_version")
+    if saved_version and saved_version != publication_version(pub):
+        reason = "publication changed"
+    elif DEMO_MAX_AGE and age > DEMO_MAX_AGE:
+        reason = "expired"
+    return {"generated_at": generated_at, "age": age, "stale": reason is not None, "reason": reason}
+
+
+def stale_publications(pub_ids: list[str] | None = None) -> list[tuple[dict, dict]]:
+    """(publication, freshness) for every publication whose demo is missing or stale."""
+    pubs = [get_publication(p) for p in pub_ids] if pub_ids else get_dataset()["publications"]
+    stale = []
+    for pub in pubs:
+        if pub is None:
+            continue
+        freshness = demo_freshness(pub)
+        if freshness["stale"]:
+            stale.append((pub, freshness))
+    return stale
+
+
+def prune_demo_audio(pub_id: str, keep: str, demo_dir: str = DEMO_DIR, grace: float = AUDIO_GRACE_PERIOD):
+    """Delete a publication's superseded audio directories once they are older than grace seconds."""
+    audio_dir = Path(f"{demo_dir}/audio/{pub_id}")
+    if not audio_dir.is_dir():
+        return
+    cutoff = time.time() - grace
+    for path in audio_dir.iterdir():
+        if path.is_dir() and path.name != keep and path.stat().st_mtime < cutoff:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+async def aregenerate_demo(
+    pub: dict,
+    run_id: str,
+    on_event: Callable[[str, dict], None] | None = None,
+    demo_dir: str = DEMO_DIR,
+) -> dict:
+    """
+    Generate a publication's conversation with audio and swap it in as its demo.
+
+    Audio goes to {demo_dir}/audio/{pub_id}/{run_id}/, so the current demo's files
+    are untouched until the new demo JSON replaces it.
+
+    Args:
+        pub: Publication data dict.
+        run_id: Run id to persist progress under (resumable after a failure).
+        on_event: Optional progress callback (see arun_conversation_with_audio).
+        demo_dir: Demo directory.
+
+    Returns:
+        The saved demo dict (see orchestrator.save_demo).
+    """
+    from src.orchestrator import arun_conversation_with_audio, save_demo
+
+    results = await arun_conversation_with_audio(
+        pub,
+        num_exchanges=2,
+        use_web_search=True,
+        output_dir=f"{demo_dir}/audio/{pub['id']}/{run_id}",
+        on_event=on_event,
+        run_id=run_id,
+    )
+    # Stitching the single-file track may run ffmpeg, so it happens off the event loop
+    output = await asyncio.to_thread(save_demo, pub, results, demo_dir)
+    run_state.delete_run(run_id)
+    prune_demo_audio(pub["id"], keep=run_id, demo_dir=demo_dir)
+    return output
+
+
+async def run_scheduler(submit: Callable[[str], object], free_slots: Callable[[], int], interval: float = CHECK_INTERVAL):
+    """
+    Keep demos fresh from inside the server, forever.
+
+    Every interval, queue stale publications (missing demos first) through
+    submit(pub_id) -- the investigation job queue, so a visitor clicking a
+    publication being regenerated joins that job. Only free worker slots are
+    used, so live investigations never wait behind a backlog of refreshes, and
+    a failed publication is retried after RETRY_INTERVAL.
+
+    Args:
+        submit: Queues a regeneration job for a publication id.
+        free_slots: Number of jobs that can start right away.
+        interval: Seconds between checks.
+    """
+    while True:
+        try:
+            now = time.time()
+            stale = stale_publications()
+            stale.sort(key=lambda item: item[1]["reason"] != "missing")
+            slots = free_slots()
+            for pub, freshness in stale:
+                if slots <= 0:
+                    break
+                if now - _attempts.get(pub["id"], 0) < RETRY_INTERVAL:
+                    continue
+                print(f"  Prewarming demo for {pub['id']} ({freshness['reason']})")
+                _attempts[pub["id"]] = now
+                submit(pub["id"])
+                slots -= 1
+        except Exception as e:
+            print(f"  (Demo prewarm check failed: {e})")
+        await asyncio.sleep(interval)
+
+
+def main():
+    """Report demo freshness and regenerate missing or stale demos."""
+    cli_args = sys.argv[1:]
+    check_only = "--check" in cli_args
+    pub_ids = [a.lower() for a in cli_args if not a.startswith("--")] or None
+
+    stale = stale_publications(pub_ids)
+    for pub in ([get_publication(p) for p in pub_ids] if pub_ids else get_dataset()["publications"]):
+        if pub is None:
+            continue
+        freshness = demo_freshness(pub)
+        age = f"{freshness['age'] / 3600:.1f}h old" if freshness["age"] is not None else "no demo"
+        print(f"  {pub['id']:<8} {age:<12} {freshness['reason'] or 'fresh'}")
+    if check_only or not stale:
+        return
+
+    print(f"\n  Regenerating {len(stale)} demo(s)...")
+    for pub, _ in stale:
+        # A fresh id per generation, so the new audio never overwrites the demo being replaced
+        run_id = f"prewarm-{pub['id']}-{run_state.new_run_id()}"
+        asyncio.run(aregenerate_demo(pub, run_id))
+        print(f"  Saved {DEMO_DIR}/{pub['id']}_conversation.json")
+
+
+if __name__ == "__main__":
+    main()
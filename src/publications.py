@@ -0,0 +1,88 @@
+"""
+Publication registry.
+Loads data/publications.json once into an id-keyed index and reloads it
+automatically when the file changes on disk.
+"""
+import hashlib
+import json
+import os
+import threading
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "publications.json")
+
+_lock = threading.Lock()
+_snapshot = None  # replaced wholesale on reload, so readers always see a consistent version
+
+
+def _summary(pub: dict) -> dict:
+    """The projection served by GET /api/publications."""
+    rating = pub.get("ground_news_rating", {})
+    return {
+        "id": pub["id"],
+        "name": pub["name"],
+        "owner": pub["owner"],
+        "bias": rating.get("bias", "Unknown"),
+        "factuality": rating.get("factuality", "Unknown"),
+        "category": rating.get("ownership_category", "Unknown"),
+    }
+
+
+def _refresh() -> dict:
+    """Return the current snapshot, reloading first if the file's mtime changed."""
+    global _snapshot
+    mtime = os.stat(DATA_PATH).st_mtime_ns
+    snapshot = _snapshot
+    if snapshot and snapshot["mtime"] == mtime:
+        return snapshot
+
+    with _lock:
+        if _snapshot and _snapshot["mtime"] == mtime:
+            return _snapshot
+        with open(DATA_PATH) as f:
+            data = json.load(f)
+        summaries = [_summary(p) for p in data["publications"]]
+        summaries_json = json.dumps(summaries).encode()
+        digest = hashlib.sha256(summaries_json).hexdigest()
+
+        _snapshot = {
+            "mtime": mtime,
+            "data": data,
+            "by_id": {p["id"]: p for p in data["publications"]},
+            "summaries_json": summaries_json,
+            "etag": f'"{digest[:32]}"',
+        }
+        return _snapshot
+
+
+def get_dataset() -> dict:
+    """Return the full dataset ({"publications": [...]}), reloading if the file changed."""
+    return _refresh()["data"]
+
+
+def get_publication(pub_id: str) -> dict | None:
+    """Look up a publication by id, or None if it doesn't exist."""
+    return _refresh()["by_id"].get(pub_id)
+
+
+def summaries_json() -> tuple[bytes, str]:
+    """
+    Return the summaries pre-serialized as JSON, with their ETag.
+
+    Returns:
+        (body, etag) -- ready to send without re-encoding on every request.
+    """
+    snapshot = _refresh()
+    return snapshot["summaries_json"], snapshot["etag"]
+
+
+def publication_version(pub: dict) -> str:
+    """Short hash of a publication's data, to tell whether content generated from it is outdated."""
+    return hashlib.sha256(json.dumps(pub, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Check an If-None-Match header (possibly a list, possibly weak) against an ETag."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
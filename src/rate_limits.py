@@ -0,0 +1,211 @@
+"""
+Process-wide rate limits for upstream APIs.
+One RateLimiter per upstream (Claude, Cartesia, Notion), shared by every
+investigation, batch job and worker thread in the process. Each enforces a
+requests/min and a tokens/min token bucket plus a cap on calls in flight, so
+concurrent users saturate the quota without triggering a storm of 429s.
+Waiting callers are counted, so queue depth and wait times can be monitored.
+"""
+import asyncio
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# How often a caller waiting only for a concurrency slot re-checks
+_SLOT_POLL_INTERVAL = 0.05
+
+
+def _limit(name: str) -> float:
+    return float(os.getenv(name, "0") or 0)
+
+
+# 0 = unlimited. Claude tokens are input + output tokens; Cartesia "tokens" are characters.
+LIMITS = {
+    "claude": {
+        "requests_per_min": _limit("CLAUDE_RPM"),
+        "tokens_per_min": _limit("CLAUDE_TPM"),
+        "max_concurrency": _limit("CLAUDE_MAX_INFLIGHT"),
+    },
+    "cartesia": {
+        "requests_per_min": _limit("CARTESIA_RPM"),
+        "tokens_per_min": _limit("CARTESIA_CHARS_PER_MIN"),
+        "max_concurrency": _limit("CARTESIA_MAX_INFLIGHT"),
+    },
+    "notion": {
+        # Notion allows an average of 3 requests/second per integration
+        "requests_per_min": float(os.getenv("NOTION_RPM", "180") or 0),
+        "tokens_per_min": 0,
+        "max_concurrency": _limit("NOTION_MAX_INFLIGHT"),
+    },
+}
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+class _Bucket:
+    """Token bucket refilled continuously at per_min / 60 per second, holding at most per_min."""
+
+    def __init__(self, per_min: float):
+        self.capacity = per_min
+        self.level = per_min
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.capacity / 60)
+        self.updated = now
+
+    def wait_for(self, amount: float) -> float:
+        """Seconds until amount is available (amounts over capacity only need a full bucket)."""
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing * 60 / self.capacity)
+
+
+class RateLimiter:
+    """
+    Requests/min and tokens/min buckets plus a concurrency cap for one upstream.
+
+    Works from threads (slot) and from the event loop (aslot) at the same time.
+    Token counts that are only known after a call can be corrected with adjust().
+
+    Args:
+        name: Label used in stats, e.g. "claude".
+        requests_per_min: Request budget (0 = unlimited).
+        tokens_per_min: Token budget (0 = unlimited).
+        max_concurrency: Calls allowed in flight at once (0 = unlimited).
+    """
+
+    def __init__(self, name: str, requests_per_min: float = 0, tokens_per_min: float = 0, max_concurrency: float = 0):
+        self.name = name
+        self.max_concurrency = int(max_concurrency)
+        self._requests = _Bucket(requests_per_min) if requests_per_min > 0 else None
+        self._tokens = _Bucket(tokens_per_min) if tokens_per_min > 0 else None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._waiting = 0
+        self._acquired = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _try_acquire(self, tokens: float) -> float:
+        """Take a slot and return 0, or return how long to wait before trying again."""
+        with self._lock:
+            now = time.monotonic()
+            wait = 0.0
+            for bucket, amount in ((self._requests, 1), (self._tokens, tokens)):
+                if bucket is not None:
+                    bucket.refill(now)
+                    wait = max(wait, bucket.wait_for(amount))
+            if self.max_concurrency and self._in_flight >= self.max_concurrency:
+                wait = max(wait, _SLOT_POLL_INTERVAL)
+            if wait > 0:
+                return wait
+
+            if self._requests is not None:
+                self._requests.level -= 1
+            if self._tokens is not None:
+                self._tokens.level -= tokens
+            self._in_flight += 1
+            return 0.0
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def _record_wait(self, waited: float):
+        with self._lock:
+            self._acquired += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+
+    def _begin_wait(self, delta: int):
+        with self._lock:
+            self._waiting += delta
+
+    @contextmanager
+    def slot(self, tokens: float = 0):
+        """Block the current thread until a call may start; hold its concurrency slot inside."""
+        start = time.monotonic()
+        self._begin_wait(1)
+        try:
+            while (wait := self._try_acquire(tokens)) > 0:
+                time.sleep(wait)
+        finally:
+            self._begin_wait(-1)
+        self._record_wait(time.monotonic() - start)
+        try:
+            yield self
+        finally:
+            self._release()
+
+    @asynccontextmanager
+    async def aslot(self, tokens: float = 0):
+        """Async version of slot: waits without blocking the event loop."""
+        start = time.monotonic()
+        self._begin_wait(1)
+        try:
+            while (wait := self._try_acquire(tokens)) > 0:
+                await asyncio.sleep(wait)
+        finally:
+            self._begin_wait(-1)
+        self._record_wait(time.monotonic() - start)
+        try:
+            yield self
+        finally:
+            self._release()
+
+    def adjust(self, tokens: float):
+        """Charge (or refund, if negative) tokens once a call's real usage is known."""
+        if self._tokens is None or not tokens:
+            return
+        with self._lock:
+            self._tokens.refill(time.monotonic())
+            self._tokens.level = min(self._tokens.capacity, self._tokens.level - tokens)
+
+    def stats(self) -> dict:
+        """
+        Current queue depth and wait times.
+
+        Returns:
+            {"name", "waiting", "in_flight", "acquired", "avg_wait", "max_wait",
+             "requests_available", "tokens_available"} -- waits in seconds; availability
+            is None for unlimited buckets.
+        """
+        with self._lock:
+            now = time.monotonic()
+            available = {}
+            for key, bucket in (("requests_available", self._requests), ("tokens_available", self._tokens)):
+                if bucket is not None:
+                    bucket.refill(now)
+                    available[key] = round(bucket.level)
+                else:
+                    available[key] = None
+            return {
+                "name": self.name,
+                "waiting": self._waiting,
+                "in_flight": self._in_flight,
+                "acquired": self._acquired,
+                "avg_wait": self._total_wait / self._acquired if self._acquired else 0.0,
+                "max_wait": self._max_wait,
+                **available,
+            }
+
+
+def get_limiter(name: str) -> RateLimiter:
+    """The shared limiter for an upstream ("claude", "cartesia" or "notion")."""
+    with _limiters_lock:
+        if name not in _limiters:
+            _limiters[name] = RateLimiter(name, **LIMITS.get(name, {}))
+        return _limiters[name]
+
+
+def get_limiter_stats() -> dict:
+    """Stats of every upstream's limiter, by upstream name."""
+    with _limiters_lock:
+        names = set(LIMITS) | set(_limiters)
+    return {name: get_limiter(name).stats() for name in sorted(names)}
@@ -0,0 +1,297 @@
+"""
+Resilience layer for upstream API calls (Claude, Cartesia).
+Retries with jittered exponential backoff that honors Retry-After, per-call
+deadlines, a circuit breaker per upstream, and optional hedged requests that
+fire a second attempt once a call runs past the upstream's p95 latency.
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, TypeVar
+
+import httpx
+from anthropic import APIConnectionError
+from dotenv import load_dotenv
+from websockets.exceptions import WebSocketException
+
+from src.rate_limits import RateLimiter
+
+load_dotenv()
+
+T = TypeVar("T")
+
+# Backoff: full jitter over base * 2^attempt seconds, capped
+BACKOFF_BASE = float(os.getenv("UPSTREAM_BACKOFF_BASE", "0.5"))
+BACKOFF_MAX = float(os.getenv("UPSTREAM_BACKOFF_MAX", "30"))
+
+# Circuit breaker: open after this many consecutive failures, probe again after the cooldown
+BREAKER_FAILURES = int(os.getenv("UPSTREAM_BREAKER_FAILURES", "5"))
+BREAKER_COOLDOWN = float(os.getenv("UPSTREAM_BREAKER_COOLDOWN", "30"))
+
+# Hedging: latency percentile that triggers the second attempt, and samples needed first
+HEDGE_PERCENTILE = float(os.getenv("UPSTREAM_HEDGE_PERCENTILE", "0.95"))
+HEDGE_MIN_SAMPLES = int(os.getenv("UPSTREAM_HEDGE_MIN_SAMPLES", "20"))
+
+# 408 timeout, 409 conflict/lock, 429 rate limited, 5xx server errors, 529 overloaded
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504, 529}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling an upstream whose circuit breaker is open."""
+
+
+def _status_code(exc: BaseException) -> int | None:
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Rate limits, server errors, timeouts and dropped connections are worth retrying."""
+    status = _status_code(exc)
+    if status is not None:
+        # e.g. a WebSocket handshake rejected with 401 is a bad key, not a dropped connection
+        return status in RETRYABLE_STATUS
+    transient = (TimeoutError, ConnectionError, httpx.TransportError, APIConnectionError, WebSocketException)
+    return isinstance(exc, transient)
+
+
+def retry_after_seconds(exc: BaseException) -> float | None:
+    """Seconds the upstream asked us to wait (Retry-After header), if any."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after")
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None  # HTTP-date form; fall back to our own backoff
+
+
+def backoff_delay(attempt: int, retry_after: float | None = None) -> float:
+    """
+    Delay before retry number attempt + 1.
+
+    Args:
+        attempt: Zero-based number of the attempt that just failed.
+        retry_after: Server-requested delay; used as-is (capped) when given.
+
+    Returns:
+        Seconds to wait.
+    """
+    if retry_after is not None:
+        return min(retry_after, BACKOFF_MAX)
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After failure_threshold failures in a row, calls fail fast with
+    CircuitOpenError for cooldown seconds. Then one probe call is let through:
+    success closes the circuit, failure re-opens it.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = BREAKER_FAILURES, cooldown: float = BREAKER_COOLDOWN):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at = None
+        self._lock = threading.Lock()
+
+    def check(self):
+        """Raise CircuitOpenError if calls should not go out right now."""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            remaining = self._opened_at + self.cooldown - time.monotonic()
+            if remaining > 0:
+                raise CircuitOpenError(f"{self.name} circuit open (retry in {remaining:.0f}s)")
+            # Half-open: this caller is the probe; others fail fast until it reports back
+            self._opened_at = time.monotonic()
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    print(f"  ({self.name} circuit opened after {self._failures} consecutive failures)")
+                self._opened_at = time.monotonic()
+
+
+class LatencyTracker:
+    """Recent successful call latencies, for percentile-based hedging."""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, p: float, min_samples: int = HEDGE_MIN_SAMPLES) -> float | None:
+        """The p-th latency percentile (0-1), or None until min_samples are recorded."""
+        with self._lock:
+            if len(self._samples) < max(1, min_samples):
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+class Upstream:
+    """
+    Retry, deadline, circuit breaker and hedging policy for one upstream API.
+
+    Args:
+        name: Label used in logs and errors, e.g. "Claude".
+        retries: Extra attempts after the first failure.
+        timeout: Per-attempt deadline in seconds for async calls (sync calls rely
+            on the SDK client's own timeout, which should be set to the same value).
+        limiter: Shared rate limiter every attempt (including hedges) waits on;
+            the deadline and latency stats only cover the call itself.
+    """
+
+    def __init__(self, name: str, retries: int, timeout: float, limiter: RateLimiter | None = None):
+        self.name = name
+        self.retries = retries
+        self.timeout = timeout
+        self.limiter = limiter or RateLimiter(name)
+        self.breaker = CircuitBreaker(name)
+        self.latency = LatencyTracker()
+
+    def before_call(self):
+        """Fail fast if the circuit is open."""
+        self.breaker.check()
+
+    def succeeded(self, seconds: float | None = None):
+        """Report a successful call (and its latency, if measured)."""
+        if seconds is not None:
+            self.latency.add(seconds)
+        self.breaker.record_success()
+
+    def retry_delay(self, attempt: int, exc: BaseException, retries: int | None = None) -> float | None:
+        """
+        Report a failed attempt and decide whether to retry it.
+
+        Args:
+            attempt: Zero-based number of the attempt that failed.
+            exc: The error it raised.
+            retries: Override for the number of extra attempts allowed.
+
+        Returns:
+            Seconds to wait before retrying, or None if the error should be raised.
+        """
+        if not is_retryable(exc):
+            return None
+        self.breaker.record_failure()
+        if attempt >= (self.retries if retries is None else retries):
+            return None
+        delay = backoff_delay(attempt, retry_after_seconds(exc))
+        print(f"  ({self.name} call failed: {exc}; retry {attempt + 1} in {delay:.1f}s)")
+        return delay
+
+    def call(self, fn: Callable[..., T], *args, cost: float = 0, retries: int | None = None, **kwargs) -> T:
+        """
+        Call fn(*args, **kwargs) with rate limiting, retries and the circuit breaker.
+
+        Args:
+            cost: Tokens the call is expected to use, charged to the limiter.
+            retries: Override for the number of extra attempts allowed.
+        """
+        attempt = 0
+        while True:
+            self.before_call()
+            try:
+                with self.limiter.slot(cost):
+                    start = time.monotonic()
+                    result = fn(*args, **kwargs)
+            except Exception as e:
+                delay = self.retry_delay(attempt, e, retries)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            self.succeeded(time.monotonic() - start)
+            return result
+
+    async def acall(
+        self,
+        fn: Callable[..., Awaitable[T]],
+        *args,
+        hedge: bool = False,
+        cost: float = 0,
+        retries: int | None = None,
+        **kwargs,
+    ) -> T:
+        """
+        Await fn(*args, **kwargs) with rate limiting, retries, the per-attempt deadline
+        and the circuit breaker.
+
+        Args:
+            fn: Coroutine function to call; must be safe to run twice at once if hedge is set.
+            hedge: If True, start a second attempt when the first runs past the p95 latency.
+            cost: Tokens the call is expected to use, charged to the limiter (per attempt).
+            retries: Override for the number of extra attempts allowed.
+        """
+        attempt = 0
+        while True:
+            self.before_call()
+            try:
+                if hedge:
+                    result, elapsed = await self._hedged(fn, args, kwargs, cost)
+                else:
+                    result, elapsed = await self._attempt(fn, args, kwargs, cost)
+            except Exception as e:
+                delay = self.retry_delay(attempt, e, retries)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            self.succeeded(elapsed)
+            return result
+
+    async def _attempt(self, fn: Callable[..., Awaitable[T]], args: tuple, kwargs: dict, cost: float):
+        """One rate-limited attempt under the deadline; returns (result, seconds it took)."""
+        async with self.limiter.aslot(cost):
+            start = time.monotonic()
+            result = await asyncio.wait_for(fn(*args, **kwargs), self.timeout)
+            return result, time.monotonic() - start
+
+    async def _hedged(self, fn: Callable[..., Awaitable[T]], args: tuple, kwargs: dict, cost: float):
+        """First successful attempt of fn, with a backup attempt fired after the p95 latency."""
+        hedge_after = self.latency.percentile(HEDGE_PERCENTILE)
+        tasks = [asyncio.create_task(self._attempt(fn, args, kwargs, cost))]
+        try:
+            if hedge_after is not None and hedge_after < self.timeout:
+                done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+                if not done:
+                    print(f"  ({self.name} call past p95 ({hedge_after:.1f}s), hedging)")
+                    tasks.append(asyncio.create_task(self._attempt(fn, args, kwargs, cost)))
+
+            # Each attempt has its own deadline, so this always ends
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
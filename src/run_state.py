@@ -0,0 +1,144 @@
+"""
+Persisted conversation runs.
+Each run is a small JSON file under RUN_STATE_DIR, named by its run id. It
+records every completed turn and the audio file written for it, so a run
+that fails partway can resume from its last completed step instead of paying
+for the same Claude and Cartesia calls again.
+"""
+import json
+import os
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+RUN_STATE_DIR = os.getenv("RUN_STATE_DIR", ".cache/runs")
+# Runs untouched for this many seconds are deleted when a new run starts
+RUN_STATE_MAX_AGE = float(os.getenv("RUN_STATE_MAX_AGE", str(7 * 24 * 3600)))
+
+
+def new_run_id() -> str:
+    """A fresh, filename-safe run id."""
+    return uuid.uuid4().hex[:12]
+
+
+def valid_run_id(run_id: str) -> bool:
+    """Run ids are used as filenames: letters, digits, "-" and "_" only."""
+    return bool(run_id) and len(run_id) <= 64 and all(c.isascii() and (c.isalnum() or c in "-_") for c in run_id)
+
+
+def _run_path(run_id: str) -> Path:
+    if not valid_run_id(run_id):
+        raise ValueError(f"Invalid run id: {run_id!r}")
+    return Path(RUN_STATE_DIR) / f"{run_id}.json"
+
+
+def load_run(run_id: str) -> dict | None:
+    """Return a saved run, or None if there is none."""
+    try:
+        with open(_run_path(run_id)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_run(run: dict):
+    """Atomically write a run to disk."""
+    run["updated_at"] = time.time()
+    path = _run_path(run["run_id"])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(run, f, indent=2)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def delete_run(run_id: str):
+    """Remove a run's file, if any."""
+    try:
+        os.remove(_run_path(run_id))
+    except FileNotFoundError:
+        pass
+
+
+def prune_runs(max_age: float = RUN_STATE_MAX_AGE):
+    """Delete runs that haven't been updated in max_age seconds."""
+    cutoff = time.time() - max_age
+    for path in Path(RUN_STATE_DIR).glob("*.json"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def open_run(run_id: str, pub_id: str, settings: dict) -> dict:
+    """
+    Resume a run, or start it if it doesn't exist yet.
+
+    A saved run for another publication or with other settings can't be
+    continued, so it is replaced by a fresh one.
+
+    Args:
+        run_id: Run id (letters, digits, "-" and "_").
+        pub_id: Publication the run is about.
+        settings: Everything the turns depend on, e.g. {"num_exchanges", "use_web_search"}.
+
+    Returns:
+        {"run_id", "pub_id", "settings", "turns", "audio", "created_at", "updated_at"} where turns
+        holds {"agent", "text", "usage"} dicts and audio maps str(turn index) -> audio path.
+    """
+    run = load_run(run_id)
+    if run is not None:
+        if run["pub_id"] == pub_id and run["settings"] == settings:
+            print(f"  Resuming run {run_id}: {len(run['turns'])} turn(s), {len(run['audio'])} audio file(s) done")
+            return run
+        print(f"  (Run {run_id} was started with different settings, starting over)")
+    else:
+        prune_runs()
+
+    run = {
+        "run_id": run_id,
+        "pub_id": pub_id,
+        "settings": settings,
+        "turns": [],
+        "audio": {},
+        "created_at": time.time(),
+    }
+    save_run(run)
+    return run
+
+
+def record_turn(run: dict, index: int, turn: dict):
+    """Persist a completed turn (replacing it and anything after it, if already recorded)."""
+    del run["turns"][index:]
+    run["audio"] = {i: path for i, path in run["audio"].items() if int(i) < index}
+    run["turns"].append({"agent": turn["agent"], "text": turn["text"], "usage": turn.get("usage")})
+    save_run(run)
+
+
+def record_audio(run: dict, index: int, audio_path: str, text: str):
+    """
+    Persist the audio file written for a turn.
+
+    Ignored unless text is the turn's recorded text, so audio streamed for a
+    turn that never completed isn't reused when it is regenerated.
+    """
+    if index < len(run["turns"]) and run["turns"][index]["text"] == text:
+        run["audio"][str(index)] = audio_path
+        save_run(run)
+
+
+def completed_audio(run: dict, index: int) -> str | None:
+    """The turn's recorded audio path, if that file still exists."""
+    path = run["audio"].get(str(index))
+    return path if path and os.path.exists(path) else None
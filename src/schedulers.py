@@ -0,0 +1,107 @@
+"""
+Turn schedulers.
+Decide which agent speaks next in a conversation. A scheduler only looks at
+the conversation state (its agents and transcript), so a conversation can be
+resumed from its saved turns without replaying any scheduling decisions.
+
+Schedulers:
+    round_robin: Agents take turns in order (the default).
+    moderator: A short Claude call picks whoever should answer the last turn.
+    interrupt: An agent whose interrupt patterns match the last turn jumps in;
+        otherwise round robin.
+"""
+import os
+import re
+
+from dotenv import load_dotenv
+
+from src.claude_client import aget_agent_response
+
+load_dotenv()
+
+# Which scheduler conversations use: round_robin, moderator or interrupt
+CONVERSATION_SCHEDULER = os.getenv("CONVERSATION_SCHEDULER", "round_robin")
+
+MODERATOR_PROMPT = """You are the producer of a podcast about media ownership. Given the latest \
+turn of the conversation, pick who should speak next so the conversation stays lively and on the \
+money trail. Reply with the speaker's name only, exactly as listed."""
+
+
+class RoundRobin:
+    """Agents speak in order; the first agent opens."""
+
+    name = "round_robin"
+
+    def _after(self, state: dict, agent: str) -> dict:
+        names = [a["agent"] for a in state["agents"]]
+        index = names.index(agent) + 1 if agent in names else 0
+        return state["agents"][index % len(names)]
+
+    async def next_speaker(self, state: dict) -> dict:
+        """The agent to speak next (an entry of state["agents"])."""
+        if not state["turns"]:
+            return state["agents"][0]
+        return self._after(state, state["turns"][-1]["agent"])
+
+
+class Moderator(RoundRobin):
+    """A short Claude call chooses who answers the last turn; round robin if it fails or answers badly."""
+
+    name = "moderator"
+
+    async def next_speaker(self, state: dict) -> dict:
+        turns = state["turns"]
+        if not turns:
+            return state["agents"][0]
+        last = turns[-1]
+        candidates = [a for a in state["agents"] if a["agent"] != last["agent"]]
+        if len(candidates) == 1:
+            return candidates[0]
+
+        names = ", ".join(a["agent"] for a in candidates)
+        prompt = f"{last['agent']} just said: \"{last['text']}\"\n\nWho speaks next? Choose one of: {names}."
+        try:
+            choice = await aget_agent_response(
+                MODERATOR_PROMPT, [{"role": "user", "content": prompt}], max_tokens=10,
+            )
+        except Exception as e:
+            print(f"  (Moderator failed: {e})")
+            choice = ""
+        for agent in candidates:
+            if agent["agent"].lower() in choice.lower():
+                return agent
+        return self._after(state, last["agent"])
+
+
+class Interrupt(RoundRobin):
+    """Another agent jumps in when the last turn touches its subject (its "interrupts" patterns)."""
+
+    name = "interrupt"
+
+    async def next_speaker(self, state: dict) -> dict:
+        turns = state["turns"]
+        if not turns:
+            return state["agents"][0]
+        last = turns[-1]
+        for agent in state["agents"]:
+            if agent["agent"] == last["agent"]:
+                continue
+            if any(re.search(pattern, last["text"], re.IGNORECASE) for pattern in agent.get("interrupts", [])):
+                return agent
+        return self._after(state, last["agent"])
+
+
+SCHEDULERS = {s.name: s for s in (RoundRobin, Moderator, Interrupt)}
+
+
+def get_scheduler(name: str | None = None):
+    """
+    A scheduler instance by name (default: CONVERSATION_SCHEDULER).
+
+    Raises:
+        ValueError: An unknown scheduler name.
+    """
+    name = name or CONVERSATION_SCHEDULER
+    if name not in SCHEDULERS:
+        raise ValueError(f"Unknown scheduler: {name} (available: {', '.join(SCHEDULERS)})")
+    return SCHEDULERS[name]()
@@ -0,0 +1,106 @@
+"""Demo snapshots, content-hash audio assets and encoding negotiation."""
+import gzip
+import json
+import os
+
+import brotli
+import pytest
+
+from src import assets
+
+
+@pytest.fixture
+def demo_dir(tmp_path, monkeypatch):
+    """An empty demo/ directory as the working directory's, with fresh asset caches."""
+    monkeypatch.chdir(tmp_path)
+    for cache in ("_demos", "_digests", "_audio_assets", "_scanned"):
+        monkeypatch.setattr(assets, cache, {})
+    (tmp_path / "demo").mkdir()
+    return tmp_path / "demo"
+
+
+def _save_demo(demo_dir, pub_id, turns, mtime_ns=None):
+    path = demo_dir / f"{pub_id}_conversation.json"
+    tmp = demo_dir / "save.tmp"
+    tmp.write_text(json.dumps({"publication": pub_id, "turns": turns}))
+    os.replace(tmp, path)  # like save_demo, so the directory's mtime moves too
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return path
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, "identity"),
+    ("", "identity"),
+    ("gzip, deflate, br", "br"),
+    ("gzip", "gzip"),
+    ("GZIP;q=0.5", "gzip"),
+    ("br;q=0, gzip", "gzip"),
+    ("br; q=0.0, gzip;q=0", "identity"),
+    ("*", "br"),
+    ("deflate", "identity"),
+])
+def test_negotiate_encoding(header, expected):
+    assert assets.negotiate_encoding(header) == expected
+
+
+def test_snapshot_bodies_and_etag(demo_dir):
+    _save_demo(demo_dir, "wsj", [{"agent": "Insider", "text": "Hello"}])
+    demo = assets.get_demo("wsj")
+
+    identity = demo["bodies"]["identity"]
+    assert json.loads(identity) == demo["data"]
+    assert gzip.decompress(demo["bodies"]["gzip"]) == identity
+    assert brotli.decompress(demo["bodies"]["br"]) == identity
+    assert demo["etag"].startswith('"') and demo["etag"].endswith('"')
+    assert assets.get_demo("wsj") is demo  # served from memory while unchanged
+    assert assets.get_demo("missing") is None
+
+
+def test_snapshot_reloads_when_the_file_changes(demo_dir):
+    _save_demo(demo_dir, "wsj", [{"agent": "Insider", "text": "Hello"}], mtime_ns=1_000_000_000)
+    before = assets.get_demo("wsj")
+    _save_demo(demo_dir, "wsj", [{"agent": "Insider", "text": "Goodbye"}], mtime_ns=2_000_000_000)
+    after = assets.get_demo("wsj")
+
+    assert after["data"]["turns"][0]["text"] == "Goodbye"
+    assert after["etag"] != before["etag"]
+
+
+def test_audio_is_published_under_its_content_hash(demo_dir):
+    audio = demo_dir / "turn_0.mp3"
+    audio.write_bytes(b"first take")
+    _save_demo(demo_dir, "wsj", [{"agent": "Insider", "text": "Hi", "audio_path": str(audio)}])
+
+    url = assets.get_demo("wsj")["data"]["turns"][0]["audio_url"]
+    name = url.removeprefix(assets.AUDIO_ASSET_PREFIX + "/")
+    assert name.endswith(".mp3")
+    path, etag = assets.resolve_audio_asset(name)
+    assert path == str(audio)
+    assert etag == f'"{name.removesuffix(".mp3")}"'
+
+    # Same URL, different content: the old name no longer resolves
+    audio.write_bytes(b"second take, longer")
+    assert assets.resolve_audio_asset(name) is None
+
+
+def test_unknown_assets_rescan_only_after_a_demo_is_saved(demo_dir, monkeypatch):
+    audio = demo_dir / "turn_0.mp3"
+    audio.write_bytes(b"audio")
+    _save_demo(demo_dir, "wsj", [{"agent": "Insider", "text": "Hi", "audio_path": str(audio)}])
+    scans = []
+    load_all_demos = assets.load_all_demos
+    monkeypatch.setattr(assets, "load_all_demos", lambda: scans.append(1) or load_all_demos())
+
+    # After a restart the name is unknown until the demos are scanned once
+    name = f"{assets._file_digest(str(audio))[:32]}.mp3"
+    assert assets.resolve_audio_asset(name) is not None
+    assert len(scans) == 1
+
+    for _ in range(3):
+        assert assets.resolve_audio_asset("0" * 32 + ".mp3") is None
+    assert len(scans) == 1
+
+    os.utime(demo_dir, ns=(1, 1))  # e.g. another demo saved
+    assert assets.resolve_audio_asset("0" * 32 + ".mp3") is None
+    assert len(scans) == 2
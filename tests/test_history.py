@@ -0,0 +1,74 @@
+"""TranscriptView windowing and compaction."""
+from src.history import TranscriptView
+
+
+def _render(turns):
+    def render(start, end, first):
+        quoted = " ".join(t["text"] for t in turns[start:end])
+        return f"Reply to: {quoted}" if quoted else "Open the show."
+    return render
+
+
+def _converse(view, turns, exchanges, words=40):
+    """Alternate turns between the view's agent and another; yield after each of the agent's turns."""
+    for i in range(exchanges):
+        turns.append({"agent": view.agent, "text": f"Turn {i} from me. " + "word " * words})
+        view.messages()  # syncs and compacts
+        yield i
+        turns.append({"agent": "Other", "text": f"Turn {i} from the other side. " + "word " * words})
+
+
+def test_short_history_is_sent_verbatim():
+    turns = []
+    view = TranscriptView(turns, "Me", _render(turns), budget_tokens=10_000)
+    list(_converse(view, turns, 3))
+
+    messages = view.messages()
+    assert [m["role"] for m in messages] == ["user", "assistant"] * 3 + ["user"]
+    assert messages[0]["content"] == "Open the show."
+    assert messages[1]["content"] == turns[0]["text"]
+    assert messages[-1]["content"].startswith("Reply to: Turn 2 from the other side.")
+    assert view.stats()["summarized_turns"] == 0
+
+
+def test_compaction_has_hysteresis():
+    turns = []
+    view = TranscriptView(turns, "Me", _render(turns), budget_tokens=600, keep_exchanges=2)
+    compactions = []
+    first_messages = []
+    summarized = 0
+    # Two exchanges (~500 tokens) fit the budget, three don't
+    for i in _converse(view, turns, 12, words=90):
+        if view.stats()["summarized_turns"] != summarized:
+            summarized = view.stats()["summarized_turns"]
+            compactions.append(i)
+        first_messages.append(view.messages()[0]["content"])
+
+    assert len(compactions) >= 2
+    # Never compacted on two exchanges in a row...
+    assert all(b - a >= 2 for a, b in zip(compactions, compactions[1:]))
+    # ...so the first message (which carries the summary) is reused in between
+    assert any(a == b for a, b in zip(first_messages, first_messages[1:]))
+    assert first_messages[-1].startswith("EARLIER IN THIS CONVERSATION (summary):\n- ")
+
+
+def test_budget_wins_over_keep_exchanges():
+    turns = []
+    budget = 600
+    view = TranscriptView(turns, "Me", _render(turns), budget_tokens=budget, keep_exchanges=4)
+    for _ in _converse(view, turns, 8, words=250):  # one exchange is over half the budget
+        assert view._window_tokens() <= budget
+        stats = view.stats()
+        pending = (len(view.messages()[-1]["content"]) + 3) // 4
+        assert stats["history_tokens"] <= budget + budget // 4 + pending + 50
+    assert view.stats()["full_history_tokens"] > 3 * budget
+
+
+def test_summary_names_speakers():
+    turns = []
+    view = TranscriptView(turns, "Me", _render(turns), budget_tokens=200, keep_exchanges=1)
+    list(_converse(view, turns, 4))
+    summary = view.messages()[0]["content"]
+    assert "- Producer: Open the show." in summary
+    assert "- You: Turn 0 from me." in summary
+    assert "- Other: Turn 0 from the other side." in summary
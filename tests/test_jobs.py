@@ -0,0 +1,137 @@
+"""Job queue deduplication, worker bound, event replay and retention."""
+import asyncio
+
+import pytest
+
+from src.jobs import JobQueue
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def _collect(job):
+    return [event async for event in job.subscribe()]
+
+
+def test_duplicate_submissions_join_the_in_flight_job():
+    async def main():
+        calls = []
+        release = asyncio.Event()
+
+        async def runner(job):
+            calls.append(job.key)
+            await release.wait()
+            return {"pub_id": job.params["pub_id"]}
+
+        queue = JobQueue(runner, workers=2)
+        first, created = queue.submit("wsj", pub_id="wsj")
+        again, created_again = queue.submit("wsj", pub_id="wsj")
+        other, _ = queue.submit("fox", pub_id="fox")
+        await asyncio.sleep(0)
+        assert created and not created_again and again is first
+        assert other is not first
+
+        release.set()
+        await asyncio.gather(_collect(first), _collect(other))
+        # Once the job finished, the same key starts a new one
+        later, created_later = queue.submit("wsj", pub_id="wsj")
+        assert created_later and later is not first
+        release.set()
+        await _collect(later)
+        await queue.stop()
+        return calls
+
+    assert run(main()) == ["wsj", "fox", "wsj"]
+
+
+def test_workers_bound_concurrency():
+    async def main():
+        running = 0
+        peak = 0
+
+        async def runner(job):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return {}
+
+        queue = JobQueue(runner, workers=2)
+        jobs = [queue.submit(f"pub{i}")[0] for i in range(5)]
+        await asyncio.sleep(0)
+        assert queue.stats() == {"queued": 3, "running": 2, "workers": 2}
+        await asyncio.gather(*(_collect(job) for job in jobs))
+        assert queue.stats() == {"queued": 0, "running": 0, "workers": 2}
+        await queue.stop()
+        return peak
+
+    assert run(main()) == 2
+
+
+def test_late_subscribers_replay_events_from_the_start():
+    async def main():
+        step = asyncio.Event()
+
+        async def runner(job):
+            job.emit("turn", {"index": 0})
+            await step.wait()
+            job.emit("turn", {"index": 1})
+            return {"turns": 2}
+
+        queue = JobQueue(runner, workers=1)
+        job, _ = queue.submit("wsj", pub_id="wsj", on_event=print)
+        early = asyncio.create_task(_collect(job))
+        await asyncio.sleep(0.01)
+
+        # Joins mid-run: sees what already happened, then the live events
+        middle = asyncio.create_task(_collect(job))
+        await asyncio.sleep(0)
+        step.set()
+        early, middle = await asyncio.gather(early, middle)
+        after = await _collect(job)  # after the job finished: the full log, then stops
+        await queue.stop()
+        return job, early, middle, after
+
+    job, early, middle, after = run(main())
+    names = [event for event, _ in early]
+    assert names == ["queued", "started", "turn", "turn", "done"]
+    assert middle == early == after
+    assert early[-1] == ("done", {"turns": 2})
+    assert job.status == "done" and not job._subscribers
+    # Non-scalar params (callbacks) stay out of the API summary
+    assert job.to_dict()["pub_id"] == "wsj" and "on_event" not in job.to_dict()
+
+
+def test_failed_jobs_report_an_error_event():
+    async def main():
+        async def runner(job):
+            raise RuntimeError("upstream down")
+
+        queue = JobQueue(runner, workers=1)
+        job, _ = queue.submit("wsj", pub_id="wsj")
+        events = await _collect(job)
+        await queue.stop()
+        return job, events
+
+    job, events = run(main())
+    assert events[-1] == ("error", {"detail": "upstream down", "job_id": job.id, "pub_id": "wsj"})
+    assert job.to_dict()["status"] == "error"
+    assert "result" not in job.to_dict()
+
+
+@pytest.mark.parametrize("retention, kept", [(3600, True), (-1, False)])
+def test_finished_jobs_are_kept_for_the_retention_period(retention, kept):
+    async def main():
+        async def runner(job):
+            return {}
+
+        queue = JobQueue(runner, workers=1, retention=retention)
+        job, _ = queue.submit("wsj")
+        await _collect(job)
+        queue.submit("fox")  # submitting prunes expired jobs
+        await queue.stop()
+        return queue.get(job.id) is job
+
+    assert run(main()) is kept
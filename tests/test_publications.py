@@ -0,0 +1,89 @@
+"""Publication registry reloads and ETag handling."""
+import json
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src import publications
+
+
+def _pub(pub_id, owner="Owner"):
+    return {
+        "id": pub_id,
+        "name": pub_id.upper(),
+        "owner": owner,
+        "ground_news_rating": {"bias": "Center", "factuality": "High", "ownership_category": "Media Conglomerate"},
+    }
+
+
+@pytest.fixture
+def data_file(tmp_path, monkeypatch):
+    path = tmp_path / "publications.json"
+    monkeypatch.setattr(publications, "DATA_PATH", str(path))
+    monkeypatch.setattr(publications, "_snapshot", None)
+
+    def write(*pubs, mtime_ns):
+        path.write_text(json.dumps({"publications": list(pubs)}))
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return write
+
+
+@pytest.mark.parametrize("header, matches", [
+    (None, False),
+    ("", False),
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"xyz", "abc"', True),
+    ('"xyz",W/"abc"', True),
+    ("*", True),
+    ('"abcd"', False),
+    ("abc", False),
+])
+def test_etag_matches(header, matches):
+    assert publications.etag_matches(header, '"abc"') is matches
+
+
+def test_summaries_are_served_pre_serialized_with_a_stable_etag(data_file):
+    data_file(_pub("wsj"), _pub("fox"), mtime_ns=1_000_000_000)
+    body, etag = publications.summaries_json()
+    assert json.loads(body) == [
+        {"id": "wsj", "name": "WSJ", "owner": "Owner", "bias": "Center", "factuality": "High",
+         "category": "Media Conglomerate"},
+        {"id": "fox", "name": "FOX", "owner": "Owner", "bias": "Center", "factuality": "High",
+         "category": "Media Conglomerate"},
+    ]
+    assert publications.summaries_json() == (body, etag)
+    assert publications.summaries_json()[0] is body  # not re-encoded per request
+
+
+def test_registry_reloads_when_the_file_changes(data_file):
+    data_file(_pub("wsj"), mtime_ns=1_000_000_000)
+    _, etag = publications.summaries_json()
+    assert publications.get_publication("fox") is None
+
+    data_file(_pub("wsj"), _pub("fox"), mtime_ns=2_000_000_000)
+    _, new_etag = publications.summaries_json()
+    assert new_etag != etag
+    assert publications.get_publication("fox")["name"] == "FOX"
+
+
+def test_publication_version_tracks_content_only():
+    pub = _pub("wsj")
+    reordered = dict(reversed(list(pub.items())))
+    assert publications.publication_version(pub) == publications.publication_version(reordered)
+    assert publications.publication_version(pub) != publications.publication_version(_pub("wsj", owner="Other"))
+
+
+def test_publications_endpoint_answers_304_for_the_current_etag():
+    import server
+
+    client = TestClient(server.app)
+    first = client.get("/api/publications")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    cached = client.get("/api/publications", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    assert client.get("/api/publications", headers={"If-None-Match": '"stale"'}).status_code == 200
@@ -0,0 +1,127 @@
+"""Token buckets, concurrency caps and stats of the upstream rate limiters."""
+import asyncio
+
+import pytest
+
+from src import rate_limits
+from src.rate_limits import RateLimiter, _Bucket
+
+
+class FakeTime:
+    """Stands in for the time module: sleeping just advances the clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeTime()
+    monkeypatch.setattr(rate_limits, "time", clock)
+    return clock
+
+
+def test_bucket_refills_continuously_up_to_capacity(clock):
+    bucket = _Bucket(60)
+    bucket.level = 0
+    bucket.refill(clock.now + 10)
+    assert bucket.level == pytest.approx(10)
+    bucket.refill(clock.now + 1000)
+    assert bucket.level == 60
+
+
+def test_bucket_wait_for():
+    bucket = _Bucket(60)
+    assert bucket.wait_for(60) == 0
+    bucket.level = 30
+    assert bucket.wait_for(45) == pytest.approx(15)
+    # More than the bucket can ever hold only needs a full bucket
+    assert bucket.wait_for(600) == pytest.approx(30)
+
+
+def test_requests_per_min(clock):
+    limiter = RateLimiter("test", requests_per_min=60)
+    for _ in range(60):
+        with limiter.slot():
+            pass
+    assert clock.slept == []
+
+    with limiter.slot():
+        pass
+    assert sum(clock.slept) == pytest.approx(1)
+    assert limiter.stats()["max_wait"] == pytest.approx(1)
+
+
+def test_tokens_per_min_and_adjust(clock):
+    limiter = RateLimiter("test", tokens_per_min=600)
+    with limiter.slot(tokens=500):
+        pass
+    assert limiter.stats()["tokens_available"] == 100
+
+    # The call used 100 tokens more than estimated
+    limiter.adjust(100)
+    assert limiter.stats()["tokens_available"] == 0
+    # Refunds never overfill the bucket
+    limiter.adjust(-10_000)
+    assert limiter.stats()["tokens_available"] == 600
+
+    limiter.adjust(550)
+    with limiter.slot(tokens=200):
+        pass
+    assert sum(clock.slept) == pytest.approx(15)  # 150 tokens short at 10/s
+
+
+def test_unlimited_limiter_never_waits(clock):
+    limiter = RateLimiter("test")
+    for _ in range(1000):
+        with limiter.slot(tokens=10_000):
+            pass
+    assert clock.slept == []
+    stats = limiter.stats()
+    assert stats["acquired"] == 1000
+    assert stats["requests_available"] is None and stats["tokens_available"] is None
+
+
+def test_concurrency_cap():
+    limiter = RateLimiter("test", max_concurrency=2)
+    in_flight = []
+
+    async def call():
+        async with limiter.aslot():
+            in_flight.append(limiter.stats()["in_flight"])
+            await asyncio.sleep(0.01)
+
+    async def main():
+        await asyncio.gather(*(call() for _ in range(5)))
+
+    asyncio.run(main())
+    assert max(in_flight) == 2
+    stats = limiter.stats()
+    assert stats["in_flight"] == 0 and stats["waiting"] == 0 and stats["acquired"] == 5
+    assert stats["max_wait"] > 0
+
+
+def test_slot_is_released_on_error(clock):
+    limiter = RateLimiter("test", max_concurrency=1)
+    with pytest.raises(RuntimeError):
+        with limiter.slot():
+            raise RuntimeError("upstream failed")
+    assert limiter.stats()["in_flight"] == 0
+    with limiter.slot():
+        pass
+    assert clock.slept == []
+
+
+def test_limiters_are_shared_per_upstream(monkeypatch):
+    monkeypatch.setattr(rate_limits, "_limiters", {})
+    assert rate_limits.get_limiter("claude") is rate_limits.get_limiter("claude")
+    assert rate_limits.get_limiter("notion").stats()["name"] == "notion"
+    assert set(rate_limits.get_limiter_stats()) >= {"claude", "cartesia", "notion"}
@@ -0,0 +1,254 @@
+"""Retry classification, backoff, the circuit breaker and Upstream retries."""
+import asyncio
+
+import httpx
+import pytest
+from websockets.datastructures import Headers
+from websockets.exceptions import ConnectionClosedError, InvalidStatus
+from websockets.http11 import Response
+
+from src import cartesia_client, resilience
+from src.resilience import CircuitBreaker, CircuitOpenError, LatencyTracker, Upstream
+
+
+class FakeTime:
+    """Stands in for the time module: sleeping just advances the clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeTime()
+    monkeypatch.setattr(resilience, "time", clock)
+    return clock
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def _http_error(status, headers=None):
+    request = httpx.Request("POST", "https://api.example.com")
+    response = httpx.Response(status, headers=headers, request=request)
+    return httpx.HTTPStatusError(f"HTTP {status}", request=request, response=response)
+
+
+def _handshake_rejected(status):
+    return InvalidStatus(Response(status, "rejected", Headers()))
+
+
+@pytest.mark.parametrize("exc, retryable", [
+    (StatusError(429), True),
+    (StatusError(529), True),
+    (StatusError(503), True),
+    (StatusError(400), False),
+    (StatusError(401), False),
+    (_http_error(502), True),
+    (_http_error(404), False),
+    (TimeoutError(), True),
+    (asyncio.TimeoutError(), True),
+    (ConnectionResetError(), True),
+    (httpx.ConnectError("refused"), True),
+    (ConnectionClosedError(None, None), True),
+    (_handshake_rejected(503), True),
+    (_handshake_rejected(401), False),
+    (ValueError("bad voice id"), False),
+    (RuntimeError("boom"), False),
+])
+def test_is_retryable(exc, retryable):
+    assert resilience.is_retryable(exc) is retryable
+
+
+def test_retry_after_seconds():
+    assert resilience.retry_after_seconds(_http_error(429, {"retry-after": "7"})) == 7
+    assert resilience.retry_after_seconds(_http_error(429, {"retry-after": "Wed, 21 Oct 2026 07:28:00 GMT"})) is None
+    assert resilience.retry_after_seconds(_http_error(429)) is None
+    assert resilience.retry_after_seconds(TimeoutError()) is None
+
+
+def test_backoff_delay(monkeypatch):
+    monkeypatch.setattr(resilience, "BACKOFF_BASE", 0.5)
+    monkeypatch.setattr(resilience, "BACKOFF_MAX", 30)
+    for attempt in range(10):
+        for _ in range(20):
+            assert 0 <= resilience.backoff_delay(attempt) <= min(30, 0.5 * 2 ** attempt)
+    assert resilience.backoff_delay(0, retry_after=12) == 12
+    assert resilience.backoff_delay(0, retry_after=600) == 30
+
+
+def test_breaker_opens_half_opens_and_closes(clock):
+    breaker = CircuitBreaker("test", failure_threshold=3, cooldown=30)
+    for _ in range(2):
+        breaker.record_failure()
+        breaker.check()
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+    clock.now += 30
+    breaker.check()  # half-open: this call is the probe...
+    with pytest.raises(CircuitOpenError):
+        breaker.check()  # ...and everyone else still fails fast
+
+    breaker.record_failure()  # the probe failed: open for another cooldown
+    clock.now += 29
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    clock.now += 1
+    breaker.check()
+    breaker.record_success()
+    breaker.check()
+    breaker.check()
+
+
+def test_breaker_counts_consecutive_failures_only():
+    breaker = CircuitBreaker("test", failure_threshold=3, cooldown=30)
+    for _ in range(5):
+        breaker.record_failure()
+        breaker.record_failure()
+        breaker.record_success()
+    breaker.check()
+
+
+def test_latency_percentile():
+    tracker = LatencyTracker(window=100)
+    assert tracker.percentile(0.95, min_samples=1) is None
+    for ms in range(1, 101):
+        tracker.add(ms / 1000)
+    assert tracker.percentile(0.95, min_samples=1) == pytest.approx(0.096)
+    assert tracker.percentile(0.95, min_samples=101) is None
+
+
+def _flaky(*errors, result="ok"):
+    """A function raising errors in turn, then returning result; .calls counts the attempts."""
+    errors = list(errors)
+
+    def fn():
+        fn.calls += 1
+        if errors:
+            raise errors.pop(0)
+        return result
+    fn.calls = 0
+    return fn
+
+
+def test_call_retries_transient_errors(clock):
+    upstream = Upstream("test", retries=2, timeout=10)
+    fn = _flaky(TimeoutError(), StatusError(529))
+    assert upstream.call(fn) == "ok"
+    assert fn.calls == 3
+    assert len(clock.slept) == 2
+    assert upstream.breaker._failures == 0  # reset by the success
+
+
+def test_call_gives_up_after_retries(clock):
+    upstream = Upstream("test", retries=2, timeout=10)
+    fn = _flaky(*[TimeoutError()] * 5)
+    with pytest.raises(TimeoutError):
+        upstream.call(fn)
+    assert fn.calls == 3
+    assert upstream.breaker._failures == 3
+
+    fn = _flaky(*[TimeoutError()] * 5)
+    with pytest.raises(TimeoutError):
+        upstream.call(fn, retries=0)
+    assert fn.calls == 1
+
+
+@pytest.mark.parametrize("error", [StatusError(400), ValueError("bad input")])
+def test_call_raises_permanent_errors_at_once(clock, error):
+    upstream = Upstream("test", retries=2, timeout=10)
+    fn = _flaky(error)
+    with pytest.raises(type(error)):
+        upstream.call(fn)
+    assert fn.calls == 1
+    assert upstream.breaker._failures == 0
+
+
+def test_call_fails_fast_while_the_circuit_is_open(clock):
+    upstream = Upstream("test", retries=0, timeout=10)
+    upstream.breaker.failure_threshold = 2
+    for _ in range(2):
+        with pytest.raises(TimeoutError):
+            upstream.call(_flaky(TimeoutError()))
+    fn = _flaky()
+    with pytest.raises(CircuitOpenError):
+        upstream.call(fn)
+    assert fn.calls == 0
+
+
+def test_acall_deadline_is_retried(monkeypatch):
+    monkeypatch.setattr(resilience, "backoff_delay", lambda attempt, retry_after=None: 0)
+    upstream = Upstream("test", retries=1, timeout=0.05)
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        if len(calls) == 1:
+            await asyncio.sleep(1)
+        return "ok"
+
+    assert asyncio.run(upstream.acall(fn)) == "ok"
+    assert len(calls) == 2
+
+
+def test_acall_hedges_slow_calls():
+    upstream = Upstream("test", retries=0, timeout=5)
+    for _ in range(resilience.HEDGE_MIN_SAMPLES):
+        upstream.latency.add(0.01)
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        if len(calls) == 1:
+            await asyncio.sleep(5)
+            return "slow"
+        return "hedge"
+
+    async def main():
+        start = asyncio.get_running_loop().time()
+        result = await upstream.acall(fn, hedge=True)
+        return result, asyncio.get_running_loop().time() - start
+
+    result, elapsed = asyncio.run(main())
+    assert result == "hedge"
+    assert elapsed < 1
+
+
+def _wrapped(cause):
+    """The sync Cartesia WebSocket's RuntimeError around the real failure."""
+    try:
+        try:
+            raise cause
+        except Exception as e:
+            raise RuntimeError(f"Failed to generate audio. {e}")
+    except RuntimeError as wrapper:
+        return wrapper
+
+
+@pytest.mark.parametrize("exc, retried, counted", [
+    (_wrapped(TimeoutError()), True, True),
+    (_wrapped(ConnectionClosedError(None, None)), True, True),
+    (RuntimeError("Failed to generate audio. "), True, True),  # nothing wrapped: assume a dropped connection
+    (_wrapped(RuntimeError("Error generating audio: invalid voice id")), False, False),
+    (_wrapped(_handshake_rejected(401)), False, False),
+    (ValueError("bad text"), False, False),
+])
+def test_websocket_tts_retry_classification(monkeypatch, exc, retried, counted):
+    upstream = Upstream("Cartesia", retries=2, timeout=10)
+    monkeypatch.setattr(cartesia_client, "_upstream", upstream)
+    delay = cartesia_client._stream_retry_delay(0, exc, 2)
+    assert (delay is not None) is retried
+    assert upstream.breaker._failures == (1 if counted else 0)
@@ -0,0 +1,112 @@
+"""Persisted runs: resuming, invalidation and turn/audio bookkeeping."""
+import pytest
+
+from src import orchestrator, run_state, schedulers
+
+SETTINGS = {"num_exchanges": 2, "use_web_search": False}
+
+
+@pytest.fixture(autouse=True)
+def run_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(run_state, "RUN_STATE_DIR", str(tmp_path / "runs"))
+    return tmp_path / "runs"
+
+
+def _turn(agent, text):
+    return {"agent": agent, "text": text, "usage": None}
+
+
+def test_run_ids_are_filename_safe():
+    assert run_state.valid_run_id(run_state.new_run_id())
+    assert run_state.valid_run_id("wsj-2026_10")
+    for bad in ("", "../etc/passwd", "a/b", "a.json", "x" * 65, "naïve"):
+        assert not run_state.valid_run_id(bad)
+        with pytest.raises(ValueError):
+            run_state.load_run(bad)
+
+
+def test_open_run_resumes_with_the_same_publication_and_settings():
+    run = run_state.open_run("r1", "wsj", SETTINGS)
+    run_state.record_turn(run, 0, _turn("Insider", "First."))
+
+    resumed = run_state.open_run("r1", "wsj", dict(SETTINGS))
+    assert resumed["turns"] == [_turn("Insider", "First.")]
+    assert resumed["created_at"] == run["created_at"]
+
+
+@pytest.mark.parametrize("pub_id, settings", [
+    ("fox", SETTINGS),
+    ("wsj", {**SETTINGS, "num_exchanges": 3}),
+])
+def test_open_run_starts_over_when_anything_changed(pub_id, settings):
+    run = run_state.open_run("r1", "wsj", SETTINGS)
+    run_state.record_turn(run, 0, _turn("Insider", "First."))
+
+    fresh = run_state.open_run("r1", pub_id, settings)
+    assert fresh["turns"] == [] and fresh["audio"] == {}
+    assert run_state.load_run("r1")["pub_id"] == pub_id
+
+
+def test_rerecorded_turn_drops_everything_after_it(tmp_path):
+    run = run_state.open_run("r1", "wsj", SETTINGS)
+    for index, text in enumerate(["One.", "Two.", "Three."]):
+        run_state.record_turn(run, index, _turn("Insider", text))
+        audio = tmp_path / f"turn_{index}.wav"
+        audio.write_bytes(b"audio")
+        run_state.record_audio(run, index, str(audio), text)
+
+    run_state.record_turn(run, 1, _turn("Insider", "Two, again."))
+    saved = run_state.load_run("r1")
+    assert [t["text"] for t in saved["turns"]] == ["One.", "Two, again."]
+    assert list(saved["audio"]) == ["0"]
+
+
+def test_audio_only_counts_for_the_recorded_text(tmp_path):
+    run = run_state.open_run("r1", "wsj", SETTINGS)
+    audio = tmp_path / "turn_0.wav"
+    audio.write_bytes(b"audio")
+
+    run_state.record_audio(run, 0, str(audio), "Not recorded yet.")
+    assert run_state.completed_audio(run, 0) is None
+
+    run_state.record_turn(run, 0, _turn("Insider", "Recorded."))
+    run_state.record_audio(run, 0, str(audio), "Streamed for an earlier attempt.")
+    assert run_state.completed_audio(run, 0) is None
+    run_state.record_audio(run, 0, str(audio), "Recorded.")
+    assert run_state.completed_audio(run_state.load_run("r1"), 0) == str(audio)
+
+    audio.unlink()
+    assert run_state.completed_audio(run, 0) is None
+
+
+def test_failed_conversation_resumes_after_its_last_completed_turn(monkeypatch):
+    monkeypatch.setattr(schedulers, "CONVERSATION_SCHEDULER", "round_robin")
+    monkeypatch.setattr(orchestrator, "build_briefing", lambda pub, use_web_search=False: "Briefing.")
+    generated = []
+    fail_at = {2}
+
+    async def agenerate_turn(system_prompt, history, context, use_web_search, on_delta=None, use_cache=True):
+        index = len(generated)
+        if index in fail_at:
+            fail_at.clear()
+            raise ConnectionError("upstream dropped")
+        generated.append(index)
+        return f"Turn {index}.", None
+
+    monkeypatch.setattr(orchestrator, "agenerate_turn", agenerate_turn)
+    pub = {"id": "wsj", "name": "The Wall Street Journal"}
+
+    with pytest.raises(ConnectionError):
+        orchestrator.run_conversation(pub, num_exchanges=2, use_cache=False, run_id="r1", speculative=False)
+    assert generated == [0, 1]
+    assert len(run_state.load_run("r1")["turns"]) == 2
+
+    replayed = []
+    turns = orchestrator.run_conversation(
+        pub, num_exchanges=2, use_cache=False, run_id="r1", speculative=False,
+        on_turn=lambda index, turn: replayed.append(index),
+    )
+    agents = len(turns) // 2
+    assert generated == list(range(2 * agents))  # completed turns weren't generated again
+    assert [t["text"] for t in turns] == [f"Turn {i}." for i in range(2 * agents)]
+    assert replayed == list(range(2 * agents))
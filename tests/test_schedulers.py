@@ -0,0 +1,94 @@
+"""Who speaks next under each scheduler."""
+import asyncio
+import re
+
+import pytest
+
+from src import schedulers
+from src.agents import all_agents
+from src.schedulers import Interrupt, Moderator, RoundRobin, get_scheduler
+
+AGENTS = [
+    {"agent": "Host", "interrupts": []},
+    {"agent": "Insider", "interrupts": [r"\bnewsroom\b"]},
+    {"agent": "Reporter", "interrupts": [r"\$\s?\d", r"\bbillion\b"]},
+]
+
+
+def _state(*turns):
+    return {"agents": AGENTS, "turns": [{"agent": agent, "text": text} for agent, text in turns]}
+
+
+def _next(scheduler, state):
+    return asyncio.run(scheduler.next_speaker(state))["agent"]
+
+
+@pytest.mark.parametrize("scheduler", [RoundRobin(), Moderator(), Interrupt()])
+def test_first_agent_opens(scheduler):
+    assert _next(scheduler, _state()) == "Host"
+
+
+def test_round_robin_wraps_around():
+    assert _next(RoundRobin(), _state(("Host", "Hi"))) == "Insider"
+    assert _next(RoundRobin(), _state(("Host", "Hi"), ("Insider", "Hey"), ("Reporter", "Yo"))) == "Host"
+    # A speaker no longer taking part (e.g. a resumed run) restarts the order
+    assert _next(RoundRobin(), _state(("Retired", "Bye"))) == "Host"
+
+
+def test_interrupt_lets_the_matching_agent_jump_in():
+    assert _next(Interrupt(), _state(("Host", "They paid $5 for it"))) == "Reporter"
+    assert _next(Interrupt(), _state(("Host", "The NEWSROOM revolted"))) == "Insider"
+    assert _next(Interrupt(), _state(("Host", "Nothing to see"))) == "Insider"
+    # Nobody interrupts themselves
+    assert _next(Interrupt(), _state(("Host", "Hi"), ("Insider", "Hey"), ("Reporter", "A billion"))) == "Host"
+
+
+@pytest.fixture
+def moderator_replies(monkeypatch):
+    prompts = []
+    replies = []
+
+    async def aget_agent_response(system_prompt, messages, **kwargs):
+        prompts.append(messages[-1]["content"])
+        reply = replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    monkeypatch.setattr(schedulers, "aget_agent_response", aget_agent_response)
+    return replies, prompts
+
+
+def test_moderator_picks_the_named_candidate(moderator_replies):
+    replies, prompts = moderator_replies
+    replies.append("reporter.")
+    assert _next(Moderator(), _state(("Host", "Follow the money"))) == "Reporter"
+    assert "Choose one of: Insider, Reporter." in prompts[0]
+    assert "Follow the money" in prompts[0]
+
+
+@pytest.mark.parametrize("reply", ["The producer", "", RuntimeError("overloaded")])
+def test_moderator_falls_back_to_round_robin(moderator_replies, reply):
+    replies, _ = moderator_replies
+    replies.append(reply)
+    assert _next(Moderator(), _state(("Host", "Hi"))) == "Insider"
+
+
+def test_moderator_skips_the_call_with_one_candidate(moderator_replies):
+    state = {"agents": AGENTS[:2], "turns": [{"agent": "Host", "text": "Hi"}]}
+    assert _next(Moderator(), state) == "Insider"
+    assert moderator_replies[1] == []
+
+
+def test_get_scheduler(monkeypatch):
+    monkeypatch.setattr(schedulers, "CONVERSATION_SCHEDULER", "interrupt")
+    assert isinstance(get_scheduler(), Interrupt)
+    assert isinstance(get_scheduler("moderator"), Moderator)
+    with pytest.raises(ValueError, match="available: round_robin, moderator, interrupt"):
+        get_scheduler("loudest")
+
+
+def test_agent_interrupt_patterns_compile():
+    for agent in all_agents().values():
+        for pattern in agent.get("interrupts", []):
+            re.compile(pattern)
@@ -1,10 +1,13 @@
 // Follow the Money — Frontend Logic
 
 let currentAudio = null;
+let currentTrack = null;  // single-file conversation audio + turn timings, when the server made one
 let playQueue = [];
 let isPlaying = false;
 let currentTurnIndex = -1;
 let revealTimeout = null;
+let liveNextIndex = -1;
+let liveTotal = -1;
 
 const AGENT_IMAGES = {
     'Street Reporter': '/static/assets/reporter.png',
@@ -76,20 +79,16 @@ async function investigate(pubId, name, owner, bias, factuality, category) {
     } catch (e) {}
 
     if (data) {
-        // Simulate investigation delay for pre-baked demos
-        await simulateInvestigation();
+        currentTrack = data.track || null;
         hideInvestigating();
         revealTurnsSequentially(data.turns);
         return;
     }
 
-    // Actual live generation
+    // Actual live generation, streamed turn by turn
+    currentTrack = null;
     try {
-        const res = await fetch(`/api/investigate/${pubId}`, { method: 'POST' });
-        if (!res.ok) throw new Error('Investigation failed');
-        data = await res.json();
-        hideInvestigating();
-        revealTurnsSequentially(data.turns);
+        await investigateLive(pubId);
     } catch (e) {
         hideInvestigating();
         document.getElementById('conversation').innerHTML = `
@@ -102,6 +101,117 @@ async function investigate(pubId, name, owner, bias, factuality, category) {
     }
 }
 
+function investigateLive(pubId) {
+    // Turns arrive over SSE as they are generated; audio plays as soon as it's ready
+    return new Promise((resolve, reject) => {
+        const source = new EventSource(`/api/investigate/${pubId}/stream`);
+        const container = document.getElementById('conversation');
+        playQueue = [];
+        let started = false;
+
+        const start = () => {
+            if (started) return;
+            started = true;
+            hideInvestigating();
+            container.innerHTML = '';
+            startLivePlayback();
+        };
+
+        source.addEventListener('delta', e => {
+            // Partial text while the agent is still talking
+            const delta = JSON.parse(e.data);
+            start();
+            let turnEl = document.getElementById(`turn-${delta.index}`);
+            if (!turnEl) {
+                turnEl = renderTurn({ agent: delta.agent, text: '' }, delta.index);
+                turnEl.classList.remove('collapsed');
+                turnEl.querySelector('.turn-status').textContent = 'writing...';
+                container.appendChild(turnEl);
+                turnEl.scrollIntoView({ behavior: 'smooth', block: 'center' });
+            }
+            turnEl.querySelector('.turn-text').textContent += delta.text;
+        });
+
+        source.addEventListener('turn', e => {
+            const turn = JSON.parse(e.data);
+            start();
+            let turnEl = document.getElementById(`turn-${turn.index}`);
+            if (turnEl) {
+                turnEl.querySelector('.turn-text').textContent = turn.text;
+                turnEl.querySelector('.turn-status').textContent = 'voicing...';
+            } else {
+                turnEl = renderTurn(turn, turn.index);
+                container.appendChild(turnEl);
+                turnEl.scrollIntoView({ behavior: 'smooth', block: 'center' });
+            }
+        });
+
+        source.addEventListener('audio', e => {
+            const audio = JSON.parse(e.data);
+            playQueue.push({ index: audio.index, path: '/' + audio.audio_path });
+            playQueue.sort((a, b) => a.index - b.index);
+            const turnEl = document.getElementById(`turn-${audio.index}`);
+            if (turnEl) {
+                turnEl.querySelector('.turn-status').textContent = 'ready';
+                turnEl.querySelector('.turn-body').insertAdjacentHTML('beforeend',
+                    `<button class="turn-play" onclick="event.stopPropagation(); playSingle(${audio.index})" title="Play">&#9654;</button>`);
+            }
+            playLiveIfReady();
+        });
+
+        source.addEventListener('done', e => {
+            source.close();
+            const result = JSON.parse(e.data);
+            liveTotal = result.turns.length;
+            currentTrack = result.track || null;
+            if (!currentAudio && liveNextIndex >= liveTotal) stopPlayback();
+            resolve();
+        });
+
+        source.addEventListener('error', e => {
+            source.close();
+            // Server-sent "error" events carry a detail; connection errors don't
+            let detail = 'Investigation failed';
+            try { detail = JSON.parse(e.data).detail; } catch (err) {}
+            if (started) {
+                resolve();
+            } else {
+                reject(new Error(detail));
+            }
+        });
+    });
+}
+
+function startLivePlayback() {
+    stopPlayback();
+    isPlaying = true;
+    liveNextIndex = 0;
+    liveTotal = -1;
+    document.getElementById('play-all-btn').classList.add('hidden');
+    document.getElementById('stop-btn').classList.remove('hidden');
+}
+
+function playLiveIfReady() {
+    // Play the next turn in order once its audio has arrived
+    if (!isPlaying || liveNextIndex < 0 || currentAudio) return;
+    const item = playQueue.find(q => q.index === liveNextIndex);
+    if (!item) return;
+
+    expandTurn(item.index);
+    highlightTurn(item.index);
+    currentTurnIndex = item.index;
+
+    currentAudio = new Audio(item.path);
+    currentAudio.onended = () => {
+        unhighlightTurn(item.index);
+        currentAudio = null;
+        liveNextIndex++;
+        if (liveTotal >= 0 && liveNextIndex >= liveTotal) { stopPlayback(); return; }
+        setTimeout(playLiveIfReady, 600);
+    };
+    currentAudio.play();
+}
+
 function showInvestigating() {
     document.getElementById('loading').classList.remove('hidden');
     cycleInvestigatingMessage();
@@ -120,12 +230,6 @@ function cycleInvestigatingMessage() {
     revealTimeout = setTimeout(cycleInvestigatingMessage, 1800);
 }
 
-function simulateInvestigation() {
-    // Random delay between 3-5 seconds to feel real
-    const delay = 3000 + Math.random() * 2000;
-    return new Promise(resolve => setTimeout(resolve, delay));
-}
-
 async function revealTurnsSequentially(turns) {
     const container = document.getElementById('conversation');
     playQueue = [];
@@ -139,7 +243,7 @@ async function revealTurnsSequentially(turns) {
         const label = AGENT_LABELS[turn.agent] || turn.agent;
         const hasAudio = !!turn.audio_path;
 
-        if (hasAudio) playQueue.push({ index: i, path: '/' + turn.audio_path });
+        if (hasAudio) playQueue.push({ index: i, path: audioUrl(turn) });
 
         // Show investigating indicator for this agent
         const loader = document.createElement('div');
@@ -161,26 +265,7 @@ async function revealTurnsSequentially(turns) {
         // Remove loader, add real turn
         loader.remove();
 
-        const turnEl = document.createElement('div');
-        turnEl.className = `turn ${cls} collapsed`;
-        turnEl.id = `turn-${i}`;
-        turnEl.onclick = () => toggleTurn(i);
-        turnEl.innerHTML = `
-            <div class="turn-header">
-                <span class="turn-agent">
-                    <img src="${img}" alt="${label}">
-                    <span class="turn-agent-name">${name}</span>
-                    <span class="turn-agent-role">${label}</span>
-                </span>
-                <span class="turn-status">ready</span>
-                <span class="turn-expand">+</span>
-            </div>
-            <div class="turn-body">
-                <div class="turn-text">${turn.text}</div>
-                ${hasAudio ? `<button class="turn-play" onclick="event.stopPropagation(); playSingle(${i})" title="Play">&#9654;</button>` : ''}
-            </div>
-        `;
-
+        const turnEl = renderTurn(turn, i);
         container.appendChild(turnEl);
         turnEl.scrollIntoView({ behavior: 'smooth', block: 'center' });
 
@@ -196,6 +281,35 @@ async function revealTurnsSequentially(turns) {
     }
 }
 
+function renderTurn(turn, i) {
+    const cls = turn.agent === 'Street Reporter' ? 'reporter' : 'insider';
+    const img = AGENT_IMAGES[turn.agent] || '';
+    const name = AGENT_NAMES[turn.agent] || turn.agent;
+    const label = AGENT_LABELS[turn.agent] || turn.agent;
+    const hasAudio = !!turn.audio_path;
+
+    const turnEl = document.createElement('div');
+    turnEl.className = `turn ${cls} collapsed`;
+    turnEl.id = `turn-${i}`;
+    turnEl.onclick = () => toggleTurn(i);
+    turnEl.innerHTML = `
+        <div class="turn-header">
+            <span class="turn-agent">
+                <img src="${img}" alt="${label}">
+                <span class="turn-agent-name">${name}</span>
+                <span class="turn-agent-role">${label}</span>
+            </span>
+            <span class="turn-status">${hasAudio ? 'ready' : 'voicing...'}</span>
+            <span class="turn-expand">+</span>
+        </div>
+        <div class="turn-body">
+            <div class="turn-text">${turn.text}</div>
+            ${hasAudio ? `<button class="turn-play" onclick="event.stopPropagation(); playSingle(${i})" title="Play">&#9654;</button>` : ''}
+        </div>
+    `;
+    return turnEl;
+}
+
 function renderConversation(turns) {
     // Fallback for direct render (not used in normal flow anymore)
     revealTurnsSequentially(turns);
@@ -218,6 +332,11 @@ function collapseTurn(i) {
 
 function playSingle(turnIndex) {
     stopPlayback();
+    if (currentTrack) {
+        expandTurn(turnIndex);
+        playTrack(turnIndex, true);
+        return;
+    }
     const item = playQueue.find(q => q.index === turnIndex);
     if (!item) return;
 
@@ -229,7 +348,7 @@ function playSingle(turnIndex) {
 }
 
 function playAll() {
-    if (!playQueue.length) return;
+    if (!playQueue.length && !currentTrack) return;
     stopPlayback();
 
     // Collapse all turns first
@@ -238,7 +357,35 @@ function playAll() {
     isPlaying = true;
     document.getElementById('play-all-btn').classList.add('hidden');
     document.getElementById('stop-btn').classList.remove('hidden');
-    playNext(0);
+    if (currentTrack) playTrack(0, false);
+    else playNext(0);
+}
+
+function playTrack(startIndex, singleTurn) {
+    // One audio file for the whole conversation; the manifest says which turn is playing
+    const turns = currentTrack.turns;
+    const stopAt = singleTurn ? turns[startIndex].end : Infinity;
+    const audio = new Audio(`${audioUrl(currentTrack)}#t=${turns[startIndex].start}`);
+    currentAudio = audio;
+
+    audio.ontimeupdate = () => {
+        const t = audio.currentTime;
+        if (t >= stopAt) {
+            audio.pause();
+            if (currentTurnIndex >= 0) { unhighlightTurn(currentTurnIndex); currentTurnIndex = -1; }
+            currentAudio = null;
+            return;
+        }
+        // Between turns (in the gap) nothing is highlighted
+        const turn = turns.find(x => t >= x.start && t < x.end);
+        const index = turn ? turn.index : -1;
+        if (index === currentTurnIndex) return;
+        if (currentTurnIndex >= 0) unhighlightTurn(currentTurnIndex);
+        if (index >= 0) { expandTurn(index); highlightTurn(index); }
+        currentTurnIndex = index;
+    };
+    audio.onended = () => stopPlayback();
+    audio.play();
 }
 
 function playNext(qi) {
@@ -262,6 +409,7 @@ function playNext(qi) {
 
 function stopPlayback() {
     isPlaying = false;
+    liveNextIndex = -1;
     if (currentAudio) { currentAudio.pause(); currentAudio = null; }
     if (currentTurnIndex >= 0) { unhighlightTurn(currentTurnIndex); currentTurnIndex = -1; }
     document.getElementById('play-all-btn').classList.remove('hidden');
@@ -295,4 +443,9 @@ function closeDemo() {
     document.getElementById('demo-modal').classList.add('hidden');
 }
 
+function audioUrl(item) {
+    // Content-hash URL (cached forever) when the server provides one
+    return item.audio_url || '/' + item.audio_path;
+}
+
 function esc(s) { return s.replace(/'/g, "\\'").replace(/"/g, '&quot;'); }